@@ -0,0 +1,233 @@
+"""
+Benchmark pipeline trích xuất (PersonalScheduleAssistant.process)
+
+Chạy:
+    python -m benchmarks.bench_pipeline
+    python -m benchmarks.bench_pipeline --mode full --repeat 20 --output bench.json
+    python -m benchmarks.bench_pipeline --compare bench_old.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+DEFAULT_CORPUS = os.path.join(ROOT_DIR, 'evaluation_results.json')
+
+def load_corpus(path):
+    """
+    Đọc corpus câu đầu vào
+
+    Hỗ trợ: file .txt (mỗi dòng 1 câu), JSON list các câu, hoặc JSON dạng
+    evaluation_results.json ({'results': [{'input': ...}]}).
+
+    Returns:
+        list: Danh sách câu
+    """
+    if path.endswith('.txt'):
+        with open(path, 'r', encoding='utf-8') as f:
+            return [line.strip() for line in f if line.strip()]
+
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    if isinstance(data, dict):
+        data = data.get('results', [])
+    return [item['input'] if isinstance(item, dict) else item for item in data]
+
+
+def percentile(values, pct):
+    """Percentile (nội suy tuyến tính) của danh sách giá trị"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(samples_ms):
+    """Thống kê latency (ms)"""
+    if not samples_ms:
+        return {'count': 0}
+    return {
+        'count': len(samples_ms),
+        'mean_ms': sum(samples_ms) / len(samples_ms),
+        'p50_ms': percentile(samples_ms, 50),
+        'p95_ms': percentile(samples_ms, 95),
+        'p99_ms': percentile(samples_ms, 99),
+        'max_ms': max(samples_ms),
+    }
+
+
+def git_commit():
+    """Commit hiện tại (để so sánh kết quả giữa các commit)"""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=ROOT_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def run_benchmark(corpus, mode='adaptive', repeat=10, use_cache=False):
+    """
+    Chạy benchmark
+
+    Args:
+        corpus (list): Các câu đầu vào
+        mode (str): pipeline_mode của PersonalScheduleAssistant
+        repeat (int): Số lần chạy lại toàn bộ corpus (warm)
+        use_cache (bool): Bật cache kết quả (mặc định tắt để đo pipeline thật)
+
+    Returns:
+        dict: Kết quả benchmark (JSON-serializable)
+    """
+    # Cold start: import + khởi tạo + câu đầu tiên (gồm tải model)
+    start = time.perf_counter()
+    from src.core.scheduler import PersonalScheduleAssistant
+    import_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    assistant = PersonalScheduleAssistant(
+        cache_size=1024 if use_cache else 0,
+        pipeline_mode=mode
+    )
+    init_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    assistant.process(corpus[0])
+    first_call_s = time.perf_counter() - start
+
+    # Model được nạp lười: nạp hết trước khi đo warm (0 nếu câu đầu đã nạp)
+    from src.nlp import model_loader
+    start = time.perf_counter()
+    model_loader.load_models()
+    models_s = time.perf_counter() - start
+
+    # Warm: đo từng câu và từng stage (qua hook của Instrumentation)
+    stage_samples = {}
+    instrumentation = assistant.enable_instrumentation()
+    instrumentation.add_post_hook(
+        lambda stage, duration_ms, error: stage_samples.setdefault(stage, []).append(duration_ms)
+    )
+
+    latencies = []
+    successes = 0
+    warm_start = time.perf_counter()
+    for _ in range(repeat):
+        for text in corpus:
+            start = time.perf_counter()
+            result = assistant.process(text)
+            latencies.append((time.perf_counter() - start) * 1000)
+            successes += bool(result['success'])
+    warm_s = time.perf_counter() - warm_start
+
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'mode': mode,
+            'cache': use_cache,
+            'corpus_size': len(corpus),
+            'repeat': repeat,
+        },
+        'cold': {
+            'import_s': import_s,
+            'init_s': init_s,
+            'first_call_s': first_call_s,
+            'models_s': models_s,
+            'total_s': import_s + init_s + first_call_s + models_s,
+        },
+        'warm': {
+            'latency': summarize(latencies),
+            'throughput_per_s': len(latencies) / warm_s if warm_s else None,
+            'success_rate': successes / len(latencies) if latencies else None,
+        },
+        'stages': {stage: summarize(samples) for stage, samples in stage_samples.items()},
+        'counters': instrumentation.snapshot()['counters'],
+    }
+
+
+def print_report(report, baseline=None):
+    """In kết quả (và chênh lệch so với baseline nếu có)"""
+    def delta(new, old):
+        if old in (None, 0) or new is None:
+            return ''
+        return f" ({(new - old) / old * 100:+.1f}%)"
+
+    meta = report['meta']
+    print(f"📊 Benchmark @ {meta['commit']} - mode={meta['mode']} cache={meta['cache']} "
+          f"corpus={meta['corpus_size']} x{meta['repeat']}")
+
+    cold = report['cold']
+    old_cold = baseline['cold'] if baseline else {}
+    print(f"❄️  Cold: import {cold['import_s']:.3f}s, init {cold['init_s']:.3f}s, "
+          f"first call {cold['first_call_s']:.3f}s, models {cold.get('models_s', 0):.3f}s, "
+          f"total {cold['total_s']:.3f}s"
+          f"{delta(cold['total_s'], old_cold.get('total_s'))}")
+
+    warm = report['warm']
+    old_warm = baseline['warm'] if baseline else {}
+    lat = warm['latency']
+    old_lat = old_warm.get('latency', {})
+    print(f"🔥 Warm: p50 {lat['p50_ms']:.3f}ms{delta(lat['p50_ms'], old_lat.get('p50_ms'))}, "
+          f"p95 {lat['p95_ms']:.3f}ms{delta(lat['p95_ms'], old_lat.get('p95_ms'))}, "
+          f"p99 {lat['p99_ms']:.3f}ms{delta(lat['p99_ms'], old_lat.get('p99_ms'))}, "
+          f"{warm['throughput_per_s']:.1f} câu/s"
+          f"{delta(warm['throughput_per_s'], old_warm.get('throughput_per_s'))}")
+
+    print(f"{'stage':<16}{'calls':>8}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}")
+    old_stages = baseline['stages'] if baseline else {}
+    for stage, stats in report['stages'].items():
+        if not stats['count']:
+            print(f"{stage:<16}{0:>8}")
+            continue
+        old = old_stages.get(stage, {})
+        print(f"{stage:<16}{stats['count']:>8}{stats['mean_ms']:>10.3f}{stats['p50_ms']:>10.3f}"
+              f"{stats['p95_ms']:>10.3f}{stats['p99_ms']:>10.3f}"
+              f"{delta(stats['p50_ms'], old.get('p50_ms'))}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark pipeline trích xuất lịch trình")
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS, help="File corpus (.txt hoặc .json)")
+    parser.add_argument('--mode', default='adaptive', choices=['full', 'adaptive'])
+    parser.add_argument('--repeat', type=int, default=10, help="Số lần chạy lại corpus")
+    parser.add_argument('--cache', action='store_true', help="Bật cache kết quả")
+    parser.add_argument('--output', help="Ghi kết quả JSON ra file")
+    parser.add_argument('--compare', help="File JSON kết quả cũ để so sánh")
+    args = parser.parse_args(argv)
+
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        print("❌ Corpus rỗng")
+        return 1
+
+    report = run_benchmark(corpus, mode=args.mode, repeat=args.repeat, use_cache=args.cache)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"✅ Đã ghi kết quả: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+import tkinter as tk
+from tkinter import ttk
+
+# Chiều cao 1 dòng (pixel) khi style của Treeview không khai báo rowheight
+DEFAULT_ROW_HEIGHT = 20
+
+
+def row_key(schedule):
+    """Key của dòng: id schedule (bản ghi không có id dùng id() của object)"""
+    schedule_id = schedule.get('id')
+    return str(schedule_id) if schedule_id is not None else f"_row{id(schedule)}"
+
+
+class ScheduleTable:
+    """
+    Bảng lịch trình ảo hóa trên ttk.Treeview
+
+    - Giá trị hiển thị của mỗi dòng được cache theo id (chỉ format khi thêm/sửa)
+    - Treeview chỉ chứa cửa sổ [start, end): các dòng đang thấy + buffer hai
+      phía; cuộn gần tới mép cửa sổ thì cửa sổ được dời theo
+    - Scrollbar biểu diễn vị trí trên toàn bộ danh sách
+    - Thêm/sửa/xóa chỉ chạm tới đúng dòng thay đổi (không vẽ lại cả bảng)
+
+    iid của Treeview là key của dòng (id schedule).
+    """
+
+    def __init__(self, tree, scrollbar, format_row, buffer=100):
+        """
+        Args:
+            tree (ttk.Treeview): Bảng hiển thị
+            scrollbar (ttk.Scrollbar): Thanh cuộn dọc của bảng
+            format_row (callable): schedule -> tuple giá trị các cột
+            buffer (int): Số dòng dựng sẵn mỗi phía ngoài vùng đang thấy
+        """
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.format_row = format_row
+        self.buffer = buffer
+
+        self._keys = []  # Thứ tự hiển thị
+        self._rows = {}  # key -> giá trị các cột (cache)
+        self._sources = {}  # key -> schedule đã format ra dòng trong cache
+        self._start = 0  # Cửa sổ [start, end) đang có trong Treeview
+        self._end = 0
+        self._top = 0  # Dòng (toàn cục) đang ở đầu vùng thấy
+
+        self._row_height = None  # Pixel, đọc từ style lần đầu cần
+        self._visible_rows = 0  # Số dòng thấy được lần dựng cửa sổ gần nhất
+
+        tree.configure(yscrollcommand=self._on_tree_scroll)
+        tree.bind('<Configure>', self._on_resize, add='+')
+        scrollbar.configure(command=self._on_scrollbar)
+
+    # ===== DỮ LIỆU =====
+
+    def __len__(self):
+        return len(self._keys)
+
+    def set_rows(self, schedules):
+        """
+        Thay toàn bộ nội dung (chỉ dựng lại cửa sổ đang thấy)
+
+        Schedule nào vẫn là đúng object đã format trước đó thì dùng lại dòng
+        trong cache, không format lại.
+        """
+        rows = {}
+        sources = {}
+        keys = []
+        for schedule in schedules:
+            key = row_key(schedule)
+            if key not in rows:
+                keys.append(key)
+            if self._sources.get(key) is schedule:
+                rows[key] = self._rows[key]
+            else:
+                rows[key] = self.format_row(schedule)
+            sources[key] = schedule
+
+        self._keys = keys
+        self._rows = rows
+        self._sources = sources
+        self._rewindow(min(self._top, max(len(keys) - self._visible(), 0)))
+
+    def insert_row(self, schedule, index=None):
+        """Thêm 1 dòng (mặc định ở cuối); đã có thì cập nhật"""
+        key = row_key(schedule)
+        if key in self._rows:
+            self.update_row(schedule)
+            return
+
+        if index is None:
+            index = len(self._keys)
+        self._keys.insert(index, key)
+        self._rows[key] = self.format_row(schedule)
+        self._sources[key] = schedule
+
+        if index < self._start or (index == self._start and self._start > 0):
+            # Dòng nằm trên cửa sổ: chỉ dịch chỉ số
+            self._start += 1
+            self._end += 1
+            self._top += 1
+        elif index <= self._end and self._end - self._start < self._window_size():
+            self.tree.insert("", index - self._start, iid=key, values=self._rows[key])
+            self._end += 1
+        elif index < self._end:
+            # Cửa sổ đã đủ dòng: đẩy dòng cuối ra ngoài
+            self.tree.delete(self._keys[self._end])
+            self.tree.insert("", index - self._start, iid=key, values=self._rows[key])
+        self._update_scrollbar()
+
+    def update_row(self, schedule):
+        """Cập nhật giá trị 1 dòng (tại chỗ nếu đang hiển thị)"""
+        key = row_key(schedule)
+        if key not in self._rows:
+            self.insert_row(schedule)
+            return
+
+        row = self.format_row(schedule)
+        self._sources[key] = schedule
+        if row == self._rows[key]:
+            return
+        self._rows[key] = row
+        if self.tree.exists(key):
+            self.tree.item(key, values=row)
+
+    def delete_row(self, key):
+        """Xóa 1 dòng theo key (id schedule)"""
+        key = str(key)
+        if self._rows.pop(key, None) is None:
+            return
+        self._sources.pop(key, None)
+
+        index = self._keys.index(key)
+        del self._keys[index]
+
+        if index < self._start:
+            self._start -= 1
+            self._end -= 1
+            self._top = max(self._top - 1, 0)
+        elif index < self._end:
+            self.tree.delete(key)
+            self._end -= 1
+            # Bù 1 dòng ở cuối cửa sổ (nếu còn)
+            if self._end < len(self._keys):
+                next_key = self._keys[self._end]
+                self.tree.insert("", tk.END, iid=next_key, values=self._rows[next_key])
+                self._end += 1
+        self._update_scrollbar()
+
+    # ===== CỬA SỔ HIỂN THỊ =====
+
+    def _visible(self):
+        """
+        Số dòng thấy được theo kích thước thật của Treeview
+
+        Bảng co giãn theo cửa sổ nên option `height` (số dòng lúc tạo) không
+        còn đúng sau khi resize; chưa hiển thị (winfo_height <= 1) thì mới
+        dùng tới option đó.
+        """
+        height = self.tree.winfo_height()
+        if height <= 1:
+            return int(self.tree.cget('height'))
+
+        row_height = self._get_row_height()
+        if 'headings' in str(self.tree.cget('show')):
+            height -= row_height  # Dòng tiêu đề cột (xấp xỉ 1 dòng)
+        # Làm tròn lên: dòng thấy một phần cũng tính
+        return max(1, -(-height // row_height))
+
+    def _get_row_height(self):
+        if self._row_height is None:
+            style = self.tree.cget('style') or 'Treeview'
+            try:
+                self._row_height = int(ttk.Style(self.tree).lookup(style, 'rowheight'))
+            except (ValueError, tk.TclError):
+                self._row_height = 0
+            if self._row_height <= 0:
+                self._row_height = DEFAULT_ROW_HEIGHT
+        return self._row_height
+
+    def _on_resize(self, event):
+        """Bảng đổi kích thước: số dòng thấy được đổi thì dựng lại cửa sổ"""
+        visible = self._visible()
+        if visible != self._visible_rows:
+            # Ghi nhận ngay: kéo resize sinh nhiều <Configure>, chỉ dựng lại 1 lần
+            self._visible_rows = visible
+            self.tree.after_idle(self._rewindow, self._top)
+
+    def _window_size(self):
+        return self._visible() + 2 * self.buffer
+
+    def _rewindow(self, top):
+        """Dựng lại cửa sổ quanh dòng `top` (chỉ ~visible + 2*buffer dòng)"""
+        total = len(self._keys)
+        top = max(0, min(int(top), max(total - 1, 0)))
+        visible = self._visible()
+        start = max(0, top - self.buffer)
+        end = min(total, top + visible + self.buffer)
+
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+        for key in self._keys[start:end]:
+            self.tree.insert("", tk.END, iid=key, values=self._rows[key])
+
+        self._start, self._end, self._top = start, end, top
+        self._visible_rows = visible
+        if end > start:
+            self.tree.yview_moveto((top - start) / (end - start))
+        self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        total = len(self._keys)
+        if not total:
+            self.scrollbar.set(0, 1)
+            return
+        first = self._top / total
+        last = min(self._top + self._visible(), total) / total
+        self.scrollbar.set(first, last)
+
+    def _on_tree_scroll(self, first, last):
+        """Treeview báo vị trí cuộn (trong cửa sổ) -> vị trí toàn cục"""
+        count = self._end - self._start
+        if not count:
+            self._update_scrollbar()
+            return
+
+        top = self._start + round(float(first) * count)
+        bottom = self._start + round(float(last) * count)
+        self._top = top
+        self._update_scrollbar()
+
+        # Gần mép cửa sổ mà ngoài đó còn dòng: dời cửa sổ
+        margin = self.buffer // 2
+        if ((top - self._start < margin and self._start > 0) or
+                (self._end - bottom < margin and self._end < len(self._keys))):
+            self.tree.after_idle(self._rewindow, top)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        """Scrollbar kéo/cuộn -> dòng đầu mới trên toàn danh sách"""
+        total = len(self._keys)
+        visible = self._visible()
+        if action == 'moveto':
+            top = float(amount) * total
+        else:
+            step = visible if unit == 'pages' else 1
+            top = self._top + int(amount) * step
+        top = int(max(0, min(top, total - visible)))
+
+        count = self._end - self._start
+        margin = self.buffer // 2
+        within = (top - self._start >= min(margin, self._start) and
+                  self._end - (top + visible) >= min(margin, len(self._keys) - self._end))
+        if count and within:
+            self.tree.yview_moveto((top - self._start) / count)
+        else:
+            self._rewindow(top)
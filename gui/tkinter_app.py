@@ -3,8 +3,24 @@ from tkinter import ttk, messagebox, scrolledtext, filedialog
 import sys
 import os
 import json
+import threading
+import time
+import queue
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+# Mốc thời gian để đo thời gian khởi động
+_START_TIME = time.perf_counter()
+
+# Chu kỳ (ms) main thread nhận kết quả do worker gửi về
+UI_POLL_MS = 50
+
+# Tìm kiếm khi gõ: chỉ chạy sau khi ngừng gõ khoảng này (ms)
+SEARCH_DEBOUNCE_MS = 150
+
+# Định dạng file cho import/export (JSON Lines đọc/ghi nhanh hơn với file rất lớn)
+FILE_TYPES = [("JSON files", "*.json"), ("JSON Lines", "*.jsonl *.ndjson"), ("All files", "*.*")]
+
 if getattr(sys, 'frozen', False):
     application_path = sys._MEIPASS
     sys.path.insert(0, application_path)
@@ -12,8 +28,12 @@ else:
     sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.core.scheduler import PersonalScheduleAssistant
-from src.storage.json_storage import JSONStorage
+from src.core.schedule import Schedule
+from gui.schedule_table import ScheduleTable, row_key
+from src.storage.journal_storage import JournalStorage, StorageLockedError
+from src.storage.search_index import SearchIndex
 from src.reminder.reminder_service import ReminderService
+from src.nlp import model_loader
 
 class ScheduleAssistantGUI:
     """Giao diện chính của ứng dụng"""
@@ -26,12 +46,49 @@ class ScheduleAssistantGUI:
         
         # Initialize components
         self.assistant = PersonalScheduleAssistant()
-        self.storage = JSONStorage()
-        self.schedules = self.storage.load_all()
+        self.storage = JournalStorage()
+        self.schedules = self._index_schedules(self.storage.load_records())  # key -> Schedule
+        self.search_index = SearchIndex(self.schedules.values(), key=row_key)
+        self._search_query = ''  # Khác rỗng: bảng đang hiện kết quả tìm kiếm
+        self._search_after = None
+        self.storage.subscribe(self._on_storage_change)
+        
+        # Worker xử lý NLP + ghi storage, không chạy trên Tk main thread.
+        # 1 thread: các yêu cầu được xếp hàng và chạy đúng thứ tự gửi
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gui-worker")
+        self._ui_queue = queue.Queue()  # (callback, args) chờ chạy trên main thread
+        self._jobs = 0  # Số yêu cầu đang chạy/chờ
+        self._busy = False
         
         # Setup UI
         self.setup_ui()
         self.load_schedules_to_table()
+        self.root.after(UI_POLL_MS, self._pump_ui_queue)
+        
+        # Tải model NLP trong background, giao diện dùng được ngay (rule-only)
+        self.start_model_warm_up()
+    
+    def start_model_warm_up(self):
+        """Bắt đầu tải model underthesea trong background và báo thời gian khởi động"""
+        self.root.update_idletasks()
+        ui_ready = time.perf_counter() - _START_TIME
+        print(f"⏱️ UI ready in {ui_ready:.2f}s")
+        
+        model_loader.warm_up()
+        self.status_bar.config(text=f"⏳ Đang tải mô hình NLP... (UI sẵn sàng sau {ui_ready:.2f}s)")
+        self.root.after(200, self._check_model_ready)
+    
+    def _check_model_ready(self):
+        """Poll trạng thái tải model (chạy trên main thread)"""
+        if model_loader.is_ready():
+            total = time.perf_counter() - _START_TIME
+            load_time = model_loader.load_timings.get('total', 0)
+            print(f"⏱️ App fully ready in {total:.2f}s (model load {load_time:.2f}s)")
+            self.status_bar.config(text=f"✅ Mô hình NLP sẵn sàng ({load_time:.2f}s) - Tổng: {len(self.schedules)} lịch trình")
+        elif model_loader.is_warming_up():
+            self.root.after(200, self._check_model_ready)
+        else:
+            self.status_bar.config(text="⚠️ Không tải được mô hình NLP - chỉ dùng rule-based")
     
     def setup_ui(self):
         """Thiết lập giao diện"""
@@ -232,6 +289,9 @@ class ScheduleAssistantGUI:
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
+        # Bảng ảo hóa: chỉ dựng các dòng đang thấy, cập nhật từng dòng thay đổi
+        self.table = ScheduleTable(self.tree, scrollbar, self._format_row)
+        
         # ===== STATUS BAR =====
         self.status_bar = tk.Label(
             self.root,
@@ -242,55 +302,137 @@ class ScheduleAssistantGUI:
             font=("Arial", 9)
         )
         self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        
+        # Thanh chờ khi worker đang bận (chỉ hiện khi có yêu cầu)
+        self.busy_bar = ttk.Progressbar(self.status_bar, mode="indeterminate", length=120)
+    
+    # ===== WORKER / HÀNG ĐỢI =====
+    
+    def _post(self, callback, *args):
+        """Chạy callback trên main thread (gọi được từ thread bất kỳ)"""
+        if threading.current_thread() is threading.main_thread():
+            callback(*args)
+        else:
+            # Thread khác không gọi Tk trực tiếp: main thread sẽ lấy ra ở _pump_ui_queue
+            self._ui_queue.put((callback, args))
+    
+    def _pump_ui_queue(self):
+        """Chạy các callback do worker gửi về (main thread, lặp lại bằng root.after)"""
+        while True:
+            try:
+                callback, args = self._ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"⚠️ Lỗi cập nhật giao diện: {e}")
+        self.root.after(UI_POLL_MS, self._pump_ui_queue)
+    
+    def run_in_background(self, func, on_done, *args):
+        """
+        Chạy func(*args) trên worker, sau đó gọi on_done(result, error) trên main thread
+        
+        Returns:
+            concurrent.futures.Future
+        """
+        self._jobs += 1
+        self._update_busy()
+        future = self.executor.submit(func, *args)
+        future.add_done_callback(lambda f: self._post(self._finish_job, f, on_done))
+        return future
+    
+    def _finish_job(self, future, on_done):
+        self._jobs -= 1
+        self._update_busy()
+        error = future.exception()
+        on_done(None if error else future.result(), error)
+    
+    def _update_busy(self):
+        """Hiện/ẩn thanh chờ và số yêu cầu đang xếp hàng"""
+        if self._jobs and not self._busy:
+            self._busy = True
+            self.busy_bar.place(relx=1.0, rely=0.5, anchor=tk.E, x=-5)
+            self.busy_bar.start(15)
+        elif not self._jobs and self._busy:
+            self._busy = False
+            self.busy_bar.stop()
+            self.busy_bar.place_forget()
+        
+        if self._jobs:
+            self.status_bar.config(text=f"⏳ Đang xử lý... ({self._jobs} yêu cầu)")
+    
+    def shutdown(self):
+        """Chờ các yêu cầu đã gửi (ghi storage) chạy xong trước khi đóng"""
+        self.executor.shutdown(wait=True)
+    
+    # ===== THAO TÁC =====
     
     def add_schedule(self):
-        """Thêm sự kiện mới"""
+        """Thêm sự kiện mới (NLP + lưu chạy trên worker, không chặn giao diện)"""
         text = self.input_text.get().strip()
         
         if not text:
             messagebox.showwarning("Cảnh báo", "Vui lòng nhập nội dung!")
             return
         
-        # Process with NLP
-        self.status_bar.config(text="Đang xử lý...")
-        self.root.update()
-        
+        try:
+            # Lấy giá trị reminder_minutes từ drop-down và ép kiểu sang int
+            reminder_minutes = int(self.reminder_var.get())
+        except ValueError:
+            reminder_minutes = None
+        
+        # Xóa ô nhập ngay để nhập câu tiếp theo trong lúc câu này đang xếp hàng
+        self.input_text.delete(0, tk.END)
+        
+        self.run_in_background(
+            self._process_and_save,
+            lambda result, error: self._on_schedule_added(text, result, error),
+            text, reminder_minutes
+        )
+    
+    def _process_and_save(self, text, reminder_minutes):
+        """Xử lý NLP và lưu schedule (chạy trên worker)"""
         result = self.assistant.process(text)
         
         if result['success']:
             schedule = result['schedule']
-            confidence = result.get('confidence', 0)
-            try:
-                # Lấy giá trị reminder_minutes từ drop-down và ép kiểu sang int
-                selected_reminder_minutes = int(self.reminder_var.get())
-                
+            if reminder_minutes is not None:
                 # Ghi đè giá trị reminder_minutes trong schedule object
-                schedule['reminder_minutes'] = selected_reminder_minutes
-                
-            except ValueError:
-                pass   
-            # Save to storage
-            schedule_id = self.storage.save(schedule)
-            self.schedules = self.storage.load_all()
-            
-            # Update table
-            self.load_schedules_to_table()
-            
-            # Clear input
-            self.input_text.delete(0, tk.END)
+                schedule['reminder_minutes'] = reminder_minutes
+            # self.schedules và bảng được cập nhật qua changefeed (_on_storage_change)
+            self.storage.save(schedule)
+        
+        return result
+    
+    def _on_schedule_added(self, text, result, error):
+        """Hiển thị kết quả thêm sự kiện (main thread)"""
+        if error is not None:
+            result = {'success': False, 'errors': [str(error)]}
+        
+        if result['success']:
+            schedule = result['schedule']
+            confidence = result.get('confidence', 0)
             
             # Show success message
             self.status_bar.config(text=f"✅ Đã thêm: {schedule['event']} (Độ tin cậy: {confidence:.0f}%)")
             
-            messagebox.showinfo(
-                "Thành công",
-                f"✅ Đã thêm lịch trình!\n\n"
-                f"Sự kiện: {schedule['event']}\n"
-                f"Thời gian: {self.format_datetime(schedule['start_time'])}\n"
-                f"Địa điểm: {schedule.get('location', 'Không có')}\n"
-                f"Độ tin cậy: {confidence:.0f}%"
-            )
+            # Còn yêu cầu trong hàng đợi thì chỉ báo trên status bar
+            if not self._jobs:
+                messagebox.showinfo(
+                    "Thành công",
+                    f"✅ Đã thêm lịch trình!\n\n"
+                    f"Sự kiện: {schedule['event']}\n"
+                    f"Thời gian: {self.format_datetime(schedule['start_time'])}\n"
+                    f"Địa điểm: {schedule.get('location', 'Không có')}\n"
+                    f"Độ tin cậy: {confidence:.0f}%"
+                )
         else:
+            # Trả câu về ô nhập để sửa (nếu chưa nhập câu khác)
+            if not self.input_text.get().strip():
+                self.input_text.delete(0, tk.END)
+                self.input_text.insert(0, text)
+            
             errors = "\n".join(result['errors'])
             self.status_bar.config(text="❌ Lỗi xử lý")
             messagebox.showerror(
@@ -300,10 +442,49 @@ class ScheduleAssistantGUI:
                 f"Vui lòng thử lại với format khác."
             )
     
+    def _on_storage_change(self, change):
+        """Nhận thay đổi từ storage; chuyển về main thread nếu cần"""
+        if threading.current_thread() is threading.main_thread():
+            self._apply_storage_change(change)
+        else:
+            self._post(self._apply_storage_change, change)
+    
+    @staticmethod
+    def _index_schedules(schedules):
+        """Danh sách schedule -> dict key -> Schedule (giữ thứ tự)"""
+        return {row_key(s): s for s in schedules}
+    
+    def _apply_storage_change(self, change):
+        """Áp dụng thay đổi nhỏ vào self.schedules và bảng thay vì load_all() lại"""
+        change_type = change['type']
+        
+        if change_type == 'reset':
+            self.schedules = self._index_schedules(self.storage.load_records())
+            self.search_index.rebuild(self.schedules.values())
+            self.load_schedules_to_table()
+            return
+        
+        if change_type == 'deleted':
+            self.schedules.pop(change['id'], None)
+            self.search_index.remove(change['id'])
+        elif change['schedule'] is not None:
+            self.schedules[change['id']] = change['schedule']
+            self.search_index.put(change['schedule'])
+        
+        if self._search_query:
+            # Đang xem kết quả tìm kiếm: tìm lại trên index (không đọc storage)
+            self.show_search_results(self._search_query)
+        elif change_type == 'deleted':
+            self.table.delete_row(change['id'])
+        elif change_type == 'inserted':
+            self.table.insert_row(change['schedule'])
+        elif change_type == 'updated':
+            self.table.update_row(change['schedule'])
+    
     def display_notification(self, title, message):
         """Hiển thị messagebox trên thread chính của Tkinter (Thread-Safe)."""
-        # self.root.after(0, ...) ĐẢM BẢO CUỘC GỌI DIỄN RA TRÊN MAIN THREAD
-        self.root.after(0, lambda: messagebox.showinfo(title, message))
+        # _post ĐẢM BẢO CUỘC GỌI DIỄN RA TRÊN MAIN THREAD
+        self._post(messagebox.showinfo, title, message)
 
     def delete_schedule(self):
         """Xóa sự kiện đã chọn"""
@@ -315,20 +496,24 @@ class ScheduleAssistantGUI:
         
         # Confirm
         if messagebox.askyesno("Xác nhận", "Bạn có chắc muốn xóa sự kiện này?"):
-            for item in selected:
-                values = self.tree.item(item)['values']
-                schedule_id = values[0]
-                
-                # Delete from storage
-                self.storage.delete(schedule_id)
-                self.schedules = self.storage.load_all()
+            schedule_ids = [self.tree.item(item)['values'][0] for item in selected]
             
-            # Update table
-            self.load_schedules_to_table()
-            self.status_bar.config(text="🗑️ Đã xóa sự kiện")
+            # Xóa trên worker; bảng được cập nhật qua changefeed
+            self.run_in_background(
+                self._delete_schedules,
+                lambda result, error: self.status_bar.config(
+                    text=f"❌ Lỗi xóa: {error}" if error else "🗑️ Đã xóa sự kiện"
+                ),
+                schedule_ids
+            )
+    
+    def _delete_schedules(self, schedule_ids):
+        """Xóa các schedule khỏi storage (chạy trên worker)"""
+        for schedule_id in schedule_ids:
+            self.storage.delete(schedule_id)
     
     def search_schedule(self):
-        """Tìm kiếm sự kiện"""
+        """Tìm kiếm sự kiện (kết quả cập nhật khi gõ, đóng cửa sổ thì bỏ lọc)"""
         search_window = tk.Toplevel(self.root)
         search_window.title("🔍 Tìm kiếm")
         search_window.geometry("400x150")
@@ -345,24 +530,17 @@ class ScheduleAssistantGUI:
         search_entry.focus()
         
         def do_search():
-            keyword = search_entry.get().strip().lower()
-            if not keyword:
-                return
-            
-            # Clear current selection
-            for item in self.tree.get_children():
-                self.tree.delete(item)
-            
-            # Search
-            found = 0
-            for schedule in self.schedules:
-                if (keyword in schedule.get('event', '').lower() or
-                    keyword in schedule.get('location', '').lower()):
-                    self.insert_schedule_to_tree(schedule)
-                    found += 1
-            
+            # Enter/nút: tìm ngay (không chờ debounce)
+            self._cancel_pending_search()
+            self.show_search_results(search_entry.get())
+        
+        def close():
+            # Bộ lọc chỉ còn hiệu lực khi cửa sổ tìm kiếm còn mở:
+            # đóng cửa sổ (nút X/Escape) thì bảng trở lại toàn bộ danh sách
+            self._cancel_pending_search()
+            if self._search_query:
+                self.load_schedules_to_table()
             search_window.destroy()
-            self.status_bar.config(text=f"🔍 Tìm thấy {found} kết quả")
         
         tk.Button(
             search_window,
@@ -376,31 +554,68 @@ class ScheduleAssistantGUI:
         ).pack(pady=10)
         
         search_entry.bind('<Return>', lambda e: do_search())
+        search_entry.bind('<KeyRelease>', lambda e: self._schedule_search(search_entry.get()))
+        search_window.bind('<Escape>', lambda e: close())
+        search_window.protocol("WM_DELETE_WINDOW", close)
     
-    def load_schedules_to_table(self):
-        """Load tất cả lịch trình vào bảng"""
-        # Clear table
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+    def _schedule_search(self, query):
+        """Debounce: chỉ tìm khi đã ngừng gõ SEARCH_DEBOUNCE_MS"""
+        self._cancel_pending_search()
+        self._search_after = self.root.after(SEARCH_DEBOUNCE_MS, self.show_search_results, query)
+    
+    def _cancel_pending_search(self):
+        if self._search_after is not None:
+            self.root.after_cancel(self._search_after)
+            self._search_after = None
+    
+    def show_search_results(self, query):
+        """
+        Hiển thị kết quả tìm kiếm từ SearchIndex (query rỗng = toàn bộ danh sách)
+        
+        Không phân biệt hoa thường/dấu; mỗi từ của query khớp đầu 1 từ trong
+        event hoặc location.
+        """
+        self._search_after = None
+        query = query.strip()
+        if not query:
+            self.load_schedules_to_table()
+            return
         
-        # Insert schedules
-        for schedule in self.schedules:
-            self.insert_schedule_to_tree(schedule)
+        results = [
+            self.schedules[key] for key in self.search_index.search(query)
+            if key in self.schedules
+        ]
+        self.table.set_rows(results)
+        self._search_query = query
+        self.status_bar.config(text=f"🔍 Tìm thấy {len(results)} kết quả")
+    
+    def load_schedules_to_table(self):
+        """Load tất cả lịch trình vào bảng (dòng đã có trong cache không format lại)"""
+        self.table.set_rows(self.schedules.values())
+        self._search_query = ''
         
         self.status_bar.config(text=f"📊 Tổng: {len(self.schedules)} lịch trình")
     
-    def insert_schedule_to_tree(self, schedule):
-        """Insert một schedule vào tree"""
-        self.tree.insert("", tk.END, values=(
+    def _format_row(self, schedule):
+        """Giá trị các cột của một schedule trong bảng"""
+        return (
             schedule.get('id', ''),
             schedule.get('event', ''),
-            self.format_datetime(schedule.get('start_time', '')),
+            Schedule.coerce(schedule).format_start_time(),
             schedule.get('location', ''),
             schedule.get('reminder_minutes', 15)
-        ))
+        )
+    
     def refresh_schedules(self):
-        # Reload dữ liệu từ storage
-        self.schedules = self.storage.load_all()
+        # Reload dữ liệu từ storage (trên worker)
+        self.run_in_background(self.storage.load_records, self._on_schedules_reloaded)
+    
+    def _on_schedules_reloaded(self, schedules, error):
+        if error is not None:
+            self.status_bar.config(text=f"❌ Lỗi refresh: {error}")
+            return
+        self.schedules = self._index_schedules(schedules)
+        self.search_index.rebuild(self.schedules.values())
         
         # Load lại vào bảng
         self.load_schedules_to_table()
@@ -423,52 +638,81 @@ class ScheduleAssistantGUI:
         # Mở hộp thoại Save As
         file_path = filedialog.asksaveasfilename(
             defaultextension=".json",
-            filetypes=[("JSON files", "*.json")],
+            filetypes=FILE_TYPES,
             initialfile="schedules_export.json",
             title="Chọn nơi lưu file lịch trình"
         )
         
         if file_path:
-            # 1. Load dữ liệu hiện tại
-            data_to_export = self.storage.load_all()
-            
-            # 2. Export dữ liệu
-            success, error = self.storage.export_to_file(data_to_export, file_path)
-            
-            if success:
-                self.status_bar.config(text=f"✅ Đã xuất {len(data_to_export)+1} lịch trình thành công.")
-                messagebox.showinfo("Thành công", f"Đã xuất dữ liệu thành công ra file:\n{file_path}")
-            else:
-                self.status_bar.config(text=f"❌ Lỗi xuất file: {error}")
-                messagebox.showerror("Lỗi", f"Không thể xuất file:\n{error}")
+            # Xuất dần theo batch trên worker, tiến độ hiện ở thanh trạng thái
+            self.run_in_background(
+                self.storage.export_stream,
+                lambda result, error: self._on_exported(file_path, result, error),
+                file_path, None, self._report_progress("Đang xuất")
+            )
+    
+    def _report_progress(self, action):
+        """Callback tiến độ cho import/export (gọi từ worker)"""
+        def progress(count, fraction):
+            percent = f" ({fraction:.0%})" if fraction is not None else ""
+            self._post(self.status_bar.config, {'text': f"⏳ {action} {count} lịch trình...{percent}"})
+        return progress
+    
+    def _on_exported(self, file_path, result, error):
+        count, error = result if error is None else (None, error)
+        
+        if count is not None:
+            self.status_bar.config(text=f"✅ Đã xuất {count} lịch trình thành công.")
+            messagebox.showinfo("Thành công", f"Đã xuất dữ liệu thành công ra file:\n{file_path}")
+        else:
+            self.status_bar.config(text=f"❌ Lỗi xuất file: {error}")
+            messagebox.showerror("Lỗi", f"Không thể xuất file:\n{error}")
 
     def import_schedules(self):
         # Mở hộp thoại Open
         file_path = filedialog.askopenfilename(
             defaultextension=".json",
-            filetypes=[("JSON files", "*.json")],
+            filetypes=FILE_TYPES,
             title="Chọn file lịch trình để nhập"
         )
         
         if file_path:
-            # 1. Import và ghi đè dữ liệu nội bộ
-            imported_data, error = self.storage.import_from_file(file_path)
-            
-            if imported_data is not None:
-                # 2. Cập nhật danh sách schedules trong GUI và load lại bảng
-                self.schedules = imported_data
-                self.load_schedules_to_table()
-                self.status_bar.config(text=f"✅ Đã nhập {len(imported_data)+1} lịch trình thành công.")
-                messagebox.showinfo("Thành công", f"Đã nhập {len(imported_data)+1} lịch trình thành công!")
-            else:
-                self.status_bar.config(text=f"❌ Lỗi nhập file: {error}")
-                messagebox.showerror("Lỗi", f"Không thể nhập file:\n{error}")
+            # 1. Import và ghi đè dữ liệu nội bộ (trên worker, đọc dần từng batch)
+            self.run_in_background(
+                self.storage.import_stream, self._on_imported,
+                file_path, self._report_progress("Đã nhập")
+            )
+    
+    def _on_imported(self, result, error):
+        report, error = result if error is None else (None, error)
+        
+        if report is not None:
+            # 2. self.schedules và bảng đã được cập nhật qua changefeed (reset)
+            message = f"Đã nhập {report['imported']} lịch trình thành công!"
+            if report['skipped']:
+                message += f"\nBỏ qua {report['skipped']} bản ghi không hợp lệ:"
+                for position, reason in report['errors'][:5]:
+                    message += f"\n  - #{position}: {reason}"
+            self.status_bar.config(
+                text=f"✅ Đã nhập {report['imported']} lịch trình, bỏ qua {report['skipped']}."
+            )
+            messagebox.showinfo("Thành công", message)
+        else:
+            self.status_bar.config(text=f"❌ Lỗi nhập file: {error}")
+            messagebox.showerror("Lỗi", f"Không thể nhập file:\n{error}")
 
 
 def main():
     """Main function"""
     root = tk.Tk()
-    app = ScheduleAssistantGUI(root)
+    try:
+        app = ScheduleAssistantGUI(root)
+    except StorageLockedError as e:
+        # Server (main.py --server) hoặc lệnh ingest đang mở cùng dữ liệu
+        root.withdraw()
+        messagebox.showerror("Lỗi", f"Không thể mở dữ liệu lịch trình:\n{e}")
+        root.destroy()
+        return
         
     # === KHỞI TẠO VÀ BẮT ĐẦU REMINDER SERVICE ===
     # Truyền tham chiếu đến hàm display_notification vào ReminderService
@@ -479,6 +723,10 @@ def main():
     def on_closing():
         # Dừng thread nhắc nhở trước khi đóng ứng dụng
         reminder_service.stop()
+        # Chờ các yêu cầu đang xếp hàng ghi xong
+        app.shutdown()
+        # Gộp journal vào file schedules.json
+        app.storage.close()
         root.destroy()
 
     root.protocol("WM_DELETE_WINDOW", on_closing)
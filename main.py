@@ -1,5 +1,6 @@
 import sys
 import os
+import multiprocessing
 
 # Set up paths
 if getattr(sys, 'frozen', False):
@@ -11,8 +12,15 @@ else:
 
 sys.path.insert(0, application_path)
 
-# Import and run GUI
-from gui.tkinter_app import main
-
 if __name__ == "__main__":
+    # Cần cho process pool (process_batch) khi chạy dạng exe đóng gói
+    multiprocessing.freeze_support()
+    
+    if '--server' in sys.argv[1:]:
+        # Chế độ server HTTP/JSON (không mở GUI): python main.py --server [--port ...]
+        from src.server.http_server import main as server_main
+        sys.exit(server_main([arg for arg in sys.argv[1:] if arg != '--server']))
+    
+    # Import and run GUI
+    from gui.tkinter_app import main
     main()
\ No newline at end of file
@@ -0,0 +1,227 @@
+"""
+Nhập hàng loạt lịch trình từ câu tiếng Việt tự nhiên
+
+Các câu được xử lý theo lô (PersonalScheduleAssistant.process_batch), mọi
+schedule hợp lệ được lưu bằng 1 lần ghi storage (storage.save_many) thay vì
+1 lần ghi lại cả file cho mỗi câu.
+
+Chạy:
+    python -m src.core.ingest cau.txt
+    python -m src.core.ingest lich.csv --reminder 30 --report report.json
+    python -m src.core.ingest cau.txt --dry-run
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+
+# Fix import path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+# Số câu mỗi lần gọi process_batch
+BATCH_SIZE = 256
+
+# Tên cột chứa câu trong file CSV (không phân biệt hoa thường)
+TEXT_COLUMNS = ('text', 'input', 'sentence', 'cau', 'câu')
+REMINDER_COLUMN = 'reminder_minutes'
+
+
+def _parse_minutes(value):
+    try:
+        return int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def read_sentences(path):
+    """
+    Đọc câu từ file text (mỗi dòng 1 câu) hoặc CSV
+
+    CSV: cột câu là cột có tên trong TEXT_COLUMNS (không có header thì lấy
+    cột đầu tiên); cột reminder_minutes (nếu có) ghi đè thời gian nhắc.
+    Dòng trống bị bỏ qua.
+
+    Yields:
+        tuple: (số dòng từ 1, câu, reminder_minutes hoặc None)
+    """
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        if os.path.splitext(path)[1].lower() != '.csv':
+            for line_no, line in enumerate(f, 1):
+                text = line.strip()
+                if text:
+                    yield line_no, text, None
+            return
+
+        rows = csv.reader(f)
+        header = next(rows, None)
+        if header is None:
+            return
+
+        names = [name.strip().lower() for name in header]
+        text_index = next((i for i, name in enumerate(names) if name in TEXT_COLUMNS), None)
+        reminder_index = names.index(REMINDER_COLUMN) if REMINDER_COLUMN in names else None
+        if text_index is None:
+            # Không có header: dòng đầu cũng là dữ liệu
+            text_index, reminder_index = 0, None
+            if header and header[0].strip():
+                yield rows.line_num, header[0].strip(), None
+
+        for row in rows:
+            if len(row) <= text_index or not row[text_index].strip():
+                continue
+            minutes = None
+            if reminder_index is not None and len(row) > reminder_index:
+                minutes = _parse_minutes(row[reminder_index])
+            yield rows.line_num, row[text_index].strip(), minutes
+
+
+def _normalize(items):
+    """Chuẩn hóa đầu vào thành (dòng, câu, reminder_minutes)"""
+    for line_no, item in enumerate(items, 1):
+        if isinstance(item, str):
+            yield line_no, item, None
+        elif len(item) == 2:
+            yield item[0], item[1], None
+        else:
+            yield item[0], item[1], item[2]
+
+
+def ingest(assistant, storage, sentences, batch_size=BATCH_SIZE, workers=1,
+           reminder_minutes=None, dry_run=False, progress=None):
+    """
+    Xử lý nhiều câu và lưu các schedule hợp lệ bằng 1 lần ghi storage
+
+    Args:
+        assistant (PersonalScheduleAssistant): Pipeline (đã khởi tạo, dùng lại)
+        storage: JSONStorage/JournalStorage/SQLiteStorage (cần save_many)
+        sentences (iterable): Câu (str), hoặc (dòng, câu) / (dòng, câu, reminder)
+            như read_sentences()
+        batch_size (int): Số câu mỗi lần gọi process_batch
+        workers (int): Số worker process cho process_batch
+        reminder_minutes (int): Thời gian nhắc mặc định (None = giữ của pipeline)
+        dry_run (bool): Chỉ phân tích, không lưu
+        progress (callable): progress(số câu đã xử lý) sau mỗi lô
+
+    Returns:
+        tuple: (report, error_message hoặc None)
+            report: {'total', 'saved', 'failed', 'lines': [{'line', 'text',
+                     'success', 'id', 'confidence', 'errors'}]}
+            Lỗi khi ghi storage: không câu nào được lưu ('saved' = 0, 'id' = None)
+    """
+    # Cả lần nhập dùng chung 1 mốc thời gian ("ngày mai" giống nhau mọi câu)
+    clock = assistant.time_parser.reference_clock()
+    lines = []
+    pending = []  # (dòng trong report, schedule)
+
+    def run(batch):
+        results = assistant.process_batch([text for _, text, _ in batch], workers=workers, clock=clock)
+        for (line_no, text, minutes), result in zip(batch, results):
+            entry = {
+                'line': line_no,
+                'text': text,
+                'success': result['success'],
+                'id': None,
+                'confidence': result.get('confidence', 0),
+                'errors': result['errors']
+            }
+            lines.append(entry)
+            if result['success']:
+                schedule = result['schedule']
+                if minutes is None:
+                    minutes = reminder_minutes
+                if minutes is not None:
+                    schedule['reminder_minutes'] = minutes
+                pending.append((entry, schedule))
+        if progress:
+            progress(len(lines))
+
+    batch = []
+    for item in _normalize(sentences):
+        batch.append(item)
+        if len(batch) >= batch_size:
+            run(batch)
+            batch = []
+    if batch:
+        run(batch)
+
+    report = {'total': len(lines), 'saved': 0, 'failed': len(lines) - len(pending), 'lines': lines}
+    if dry_run or not pending:
+        return report, None
+
+    try:
+        ids = storage.save_many([schedule for _, schedule in pending])
+    except Exception as e:
+        return report, f"Lỗi khi lưu: {e}"
+
+    for (entry, _), schedule_id in zip(pending, ids):
+        entry['id'] = schedule_id
+    report['saved'] = len(ids)
+    return report, None
+
+
+def ingest_file(assistant, storage, path, **kwargs):
+    """ingest() cho file text/CSV; tham số khác như ingest()"""
+    try:
+        sentences = list(read_sentences(path))
+    except FileNotFoundError:
+        return None, "File không tồn tại."
+    except (UnicodeDecodeError, csv.Error) as e:
+        return None, f"Không đọc được file: {e}"
+    return ingest(assistant, storage, sentences, **kwargs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Nhập hàng loạt lịch trình từ file câu tiếng Việt")
+    parser.add_argument('path', help="File .txt (mỗi dòng 1 câu) hoặc .csv")
+    parser.add_argument('--reminder', type=int, help="Thời gian nhắc mặc định (phút)")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--workers', type=int, default=1, help="Số worker process")
+    parser.add_argument('--dry-run', action='store_true', help="Chỉ phân tích, không lưu")
+    parser.add_argument('--report', help="Ghi báo cáo từng dòng ra file JSON")
+    parser.add_argument('--store', help="File dữ liệu (mặc định: dữ liệu của GUI)")
+    args = parser.parse_args(argv)
+
+    from src.core.scheduler import PersonalScheduleAssistant
+    from src.storage.journal_storage import JournalStorage, StorageLockedError
+
+    # Mở storage trước khi nạp model: đang bị GUI/server giữ thì báo lỗi ngay
+    try:
+        storage = JournalStorage(args.store)
+    except StorageLockedError as e:
+        print(f"❌ {e}. Hãy đóng ứng dụng đang mở hoặc dùng --store khác.")
+        return 1
+
+    assistant = PersonalScheduleAssistant()
+    try:
+        report, error = ingest_file(
+            assistant, storage, args.path,
+            batch_size=args.batch_size, workers=args.workers,
+            reminder_minutes=args.reminder, dry_run=args.dry_run,
+            progress=lambda count: print(f"⏳ Đã xử lý {count} câu...")
+        )
+    finally:
+        # Đóng process pool (--workers > 1) dùng chung cho mọi lô
+        assistant.close()
+        storage.close()
+
+    if report is None:
+        print(f"❌ {error}")
+        return 1
+
+    for entry in report['lines']:
+        if not entry['success']:
+            print(f"❌ Dòng {entry['line']}: {'; '.join(entry['errors'])}")
+    if error:
+        print(f"❌ {error}")
+    print(f"✅ {report['total']} câu: lưu {report['saved']}, lỗi {report['failed']}")
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"✅ Đã ghi báo cáo: {args.report}")
+    return 1 if error else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
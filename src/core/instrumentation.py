@@ -0,0 +1,165 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+
+# Biên trên các bucket histogram (ms); bucket cuối là +inf
+DEFAULT_BUCKETS_MS = [0.01, 0.05, 0.1, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000]
+
+
+class Histogram:
+    """Histogram latency với bucket cố định (ms)"""
+
+    def __init__(self, buckets=None):
+        self.buckets = list(buckets or DEFAULT_BUCKETS_MS)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = None
+        self.max_ms = None
+
+    def observe(self, value_ms):
+        """Ghi nhận 1 giá trị"""
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value_ms <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        self.min_ms = value_ms if self.min_ms is None else min(self.min_ms, value_ms)
+        self.max_ms = value_ms if self.max_ms is None else max(self.max_ms, value_ms)
+
+    def quantile(self, q):
+        """Ước lượng quantile (biên trên của bucket chứa quantile)"""
+        if not self.count:
+            return None
+        target = q * self.count
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return self.buckets[i] if i < len(self.buckets) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self):
+        bounds = [str(b) for b in self.buckets] + ['+inf']
+        return {
+            'count': self.count,
+            'sum_ms': self.total_ms,
+            'mean_ms': self.total_ms / self.count if self.count else None,
+            'min_ms': self.min_ms,
+            'max_ms': self.max_ms,
+            'p50_ms': self.quantile(0.50),
+            'p95_ms': self.quantile(0.95),
+            'p99_ms': self.quantile(0.99),
+            'buckets': dict(zip(bounds, self.counts)),
+        }
+
+
+class Instrumentation:
+    """
+    Đo đạc pipeline: hook trước/sau mỗi stage, timing span, counter
+
+    Hook:
+        pre_hook(stage)
+        post_hook(stage, duration_ms, error)  # error là Exception hoặc None
+    """
+
+    def __init__(self, buckets=None):
+        self.buckets = buckets
+        self.counters = {}
+        self.histograms = {}
+        self._pre_hooks = []
+        self._post_hooks = []
+        self._lock = threading.Lock()
+
+    def add_pre_hook(self, callback):
+        """Đăng ký hàm gọi trước mỗi stage"""
+        self._pre_hooks.append(callback)
+
+    def add_post_hook(self, callback):
+        """Đăng ký hàm gọi sau mỗi stage (kèm thời gian chạy)"""
+        self._post_hooks.append(callback)
+
+    def increment(self, name, amount=1):
+        """Tăng counter"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, stage, duration_ms):
+        """Ghi nhận thời gian của stage vào histogram"""
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram(self.buckets)
+            histogram.observe(duration_ms)
+
+    @contextmanager
+    def span(self, stage):
+        """
+        Đo thời gian 1 stage (đồng hồ monotonic)
+
+        Usage:
+            with instrumentation.span('ner'):
+                ...
+        """
+        for hook in self._pre_hooks:
+            hook(stage)
+
+        error = None
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            self.observe(stage, duration_ms)
+            for hook in self._post_hooks:
+                hook(stage, duration_ms, error)
+
+    def snapshot(self):
+        """
+        Số liệu tổng hợp hiện tại
+
+        Returns:
+            dict: {'generated_at', 'counters', 'histograms'}
+        """
+        with self._lock:
+            return {
+                'generated_at': datetime.now().isoformat(),
+                'counters': dict(self.counters),
+                'histograms': {
+                    stage: histogram.to_dict()
+                    for stage, histogram in self.histograms.items()
+                },
+            }
+
+    def export(self, file_path):
+        """
+        Ghi số liệu tổng hợp ra file JSON
+
+        Returns:
+            tuple: (success: bool, error_message: str hoặc None)
+        """
+        try:
+            directory = os.path.dirname(file_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(file_path, 'w', encoding='utf-8') as f:
+                json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+            return True, None
+        except Exception as e:
+            return False, f"Lỗi khi xuất số liệu: {e}"
+
+    def reset(self):
+        """Xóa toàn bộ counter và histogram"""
+        with self._lock:
+            self.counters = {}
+            self.histograms = {}
@@ -7,22 +7,59 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 from src.utils.time_utils import (
-    get_current_datetime,
-    get_weekday_offset,
-    get_relative_day_offset,
     parse_period_to_hour,
     is_valid_time,
-    format_datetime_iso
+    format_datetime_iso,
+    ReferenceClock,
+    VN_TZ
 )
 
+# NumPy (tùy chọn) cho parse_many; không có thì parse từng dòng
+HAS_NUMPY = False
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+
+
+# Nhóm buổi cho việc đổi giờ trong _parse_time
+PERIOD_PM = ('chiều', 'buổi chiều', 'tối', 'buổi tối', 'tối muộn')
+PERIOD_NIGHT = ('đêm', 'khuya', 'nửa đêm')
+PERIOD_MORNING = ('sáng', 'buổi sáng', 'sáng sớm')
+TODAY_TERMS = ('hôm nay', 'ngày hôm nay', 'nay')
+
+# Mã nhóm buổi dùng trong parse_many
+_PERIOD_NONE, _PERIOD_OTHER, _PERIOD_PM, _PERIOD_NIGHT, _PERIOD_MORNING = range(5)
+
+# Ngày cụ thể hợp lệ cho _parse_specific_date: dd/mm, dd/mm/yy, dd/mm/yyyy
+_SPECIFIC_DATE = re.compile(r'(\d{1,2})/(\d{1,2})(?:/(\d{4}|\d{2}))?')
+
+# Giá trị int nằm ngoài khoảng này được parse bằng đường scalar
+_INT_LIMIT = 10 ** 9
+
 
 class TimeParser:
     """Parse các thành phần thời gian thành datetime object"""
     
-    def __init__(self):
-        self.current_time = get_current_datetime()
+    def __init__(self, current_time=None):
+        """
+        Args:
+            current_time (datetime): Cố định thời điểm tham chiếu (None = giờ
+                hệ thống tại mỗi request)
+        """
+        self.current_time = current_time
     
-    def parse_time_components(self, time_components):
+    def reference_clock(self):
+        """
+        Mốc thời gian cho 1 request / 1 lô
+        
+        Returns:
+            ReferenceClock: Theo current_time nếu đã cố định, ngược lại giờ hiện tại
+        """
+        return ReferenceClock(self.current_time)
+    
+    def parse_time_components(self, time_components, clock=None):
         """
         Chuyển đổi time_components thành datetime
         
@@ -36,15 +73,18 @@ class TimeParser:
                     'relative_day': str,
                     'date': str
                 }
+            clock (ReferenceClock): Mốc thời gian (None = reference_clock())
         
         Returns:
             datetime: Datetime object hoàn chỉnh hoặc None
         """
+        clock = clock or self.reference_clock()
+        
         # Bắt đầu với ngày hiện tại
-        base_date = self.current_time.replace(hour=0, minute=0, second=0, microsecond=0)
+        base_date = clock.today
         
         # 1. Xử lý ngày (date, weekday, relative_day)
-        target_date = self._parse_date(time_components, base_date)
+        target_date = self._parse_date(time_components, base_date, clock)
         
         # 2. Xử lý giờ và phút
         hour, minute = self._parse_time(time_components)
@@ -56,16 +96,16 @@ class TimeParser:
             # CHỈ tự động +1 ngày khi:
             relative_day = time_components.get('relative_day', '').lower() if time_components.get('relative_day') else ''
             has_explicit_date = time_components.get('date') is not None
-            is_today = relative_day in ['hôm nay', 'ngày hôm nay', 'nay']  # THÊM 'nay'
+            is_today = relative_day in TODAY_TERMS  # THÊM 'nay'
             
-            if result < self.current_time and not has_explicit_date and not is_today:
+            if result < clock.now and not has_explicit_date and not is_today:
                 result = result + timedelta(days=1)
             
             return result
         
         return None
     
-    def _parse_date(self, time_components, base_date):
+    def _parse_date(self, time_components, base_date, clock):
         """
         Parse ngày từ các thành phần
         
@@ -74,13 +114,13 @@ class TimeParser:
         """
         # Priority 1: Date cụ thể (01/12, 01/12/2025)
         if time_components.get('date'):
-            parsed_date = self._parse_specific_date(time_components['date'])
+            parsed_date = self._parse_specific_date(time_components['date'], clock)
             if parsed_date:
                 return parsed_date
         
         # Priority 2: Weekday (thứ 2, thứ 6) - CHÚ Ý: Phải xử lý trước relative_day
         if time_components.get('weekday'):
-            offset = get_weekday_offset(time_components['weekday'])
+            offset = clock.weekday_offset(time_components['weekday'])
             result = base_date + timedelta(days=offset)
             
             # Nếu có "tuần sau", cộng thêm 7 ngày
@@ -91,22 +131,25 @@ class TimeParser:
         
         # Priority 3: Relative day (mai, tuần sau)
         if time_components.get('relative_day'):
-            offset = get_relative_day_offset(time_components['relative_day'])
+            offset = clock.relative_day_offset(time_components['relative_day'])
             return base_date + timedelta(days=offset)
         
         # Default: hôm nay
         return base_date
     
-    def _parse_specific_date(self, date_str):
+    def _parse_specific_date(self, date_str, clock=None):
         """
         Parse ngày cụ thể từ string (01/12, 01/12/2025)
         
         Args:
             date_str (str): String ngày
+            clock (ReferenceClock): Mốc thời gian (None = reference_clock())
             
         Returns:
             datetime hoặc None
         """
+        clock = clock or self.reference_clock()
+        
         # Pattern: dd/mm hoặc dd/mm/yyyy
         patterns = [
             (r'(\d{1,2})/(\d{1,2})/(\d{4})', '%d/%m/%Y'),  # 01/12/2025
@@ -122,18 +165,17 @@ class TimeParser:
                         result = datetime.strptime(date_str, format_str)
                     else:
                         # Không có năm, dùng năm hiện tại
-                        current_year = self.current_time.year
+                        current_year = clock.now.year
                         date_with_year = f"{date_str}/{current_year}"
                         result = datetime.strptime(date_with_year, '%d/%m/%Y')
                         
                         # Nếu ngày đã qua trong năm, lấy năm sau
                         # Convert to timezone-aware for comparison
-                        current_naive = self.current_time.replace(tzinfo=None)
+                        current_naive = clock.now.replace(tzinfo=None)
                         if result < current_naive:
                             result = result.replace(year=current_year + 1)
                     
                     # Add timezone info
-                    from src.utils.time_utils import VN_TZ
                     result = VN_TZ.localize(result)
                     return result
                 except ValueError:
@@ -163,21 +205,21 @@ class TimeParser:
                 period_lower = period.lower()
                 
                 # CHIỀU/TỐI: Giờ từ 1-11 -> cộng 12
-                if period_lower in ['chiều', 'buổi chiều', 'tối', 'buổi tối', 'tối muộn']:
+                if period_lower in PERIOD_PM:
                     if 1 <= hour <= 11:
                         hour += 12
                     # 12h chiều = 12h (noon), không đổi
                     # 13h-23h giữ nguyên
                 
                 # ĐÊM/KHUYA: Giữ nguyên (0-5h) hoặc convert nếu > 12
-                elif period_lower in ['đêm', 'khuya', 'nửa đêm']:
+                elif period_lower in PERIOD_NIGHT:
                     if hour >= 12:
                         hour = hour - 12  # 12h đêm = 0h
                     # 0-5h giữ nguyên
                 
                 # SÁNG: Giữ nguyên 0-11h
                 # 12h sáng = 0h (midnight)
-                elif period_lower in ['sáng', 'buổi sáng', 'sáng sớm']:
+                elif period_lower in PERIOD_MORNING:
                     if hour == 12:
                         hour = 0
                     # 1-11h giữ nguyên
@@ -199,15 +241,223 @@ class TimeParser:
         # Case 3: Không có gì cả - return None
         return None, None
     
-    def parse(self, time_components):
+    def parse(self, time_components, clock=None):
         """
         Public method để parse time components
         
         Args:
             time_components (dict): Time components từ RuleExtractor
+            clock (ReferenceClock): Mốc thời gian (None = reference_clock())
             
         Returns:
             str: ISO format datetime string hoặc None
         """
-        dt = self.parse_time_components(time_components)
+        dt = self.parse_time_components(time_components, clock)
         return format_datetime_iso(dt) if dt else None
+
+    
+    def parse_many(self, time_components_list, clock=None):
+        """
+        Parse nhiều time_components cùng lúc (kết quả giống hệt parse())
+        
+        Các dict được chuyển thành cột (giờ, phút, nhóm buổi, offset ngày,
+        ngày cụ thể) rồi tính bằng phép toán datetime64/timedelta64 của NumPy
+        và xuất chuỗi ISO hàng loạt. Dòng có kiểu dữ liệu bất thường được
+        parse bằng parse(). Không có NumPy thì gọi parse() cho từng dòng.
+        
+        Args:
+            time_components_list (list): Các time_components từ RuleExtractor
+            clock (ReferenceClock): Mốc thời gian cho cả lô (None = reference_clock())
+            
+        Returns:
+            list: ISO datetime string hoặc None, đúng thứ tự đầu vào
+        """
+        items = list(time_components_list)
+        clock = clock or self.reference_clock()
+        if not HAS_NUMPY:
+            return [self.parse(tc, clock) for tc in items]
+        
+        n = len(items)
+        results = [None] * n
+        if not n:
+            return results
+        
+        now = clock.now.replace(tzinfo=None)
+        
+        rows = []          # index các dòng tính bằng NumPy
+        hours = []
+        has_hour = []
+        minutes = []
+        period_codes = []
+        period_hours = []
+        day_offsets = []
+        explicit = []      # có key 'date' (không tự +1 ngày)
+        is_today = []
+        date_parts = []    # (d, m, y, có năm) hoặc None
+        
+        for i, tc in enumerate(items):
+            columns = self._to_columns(tc, clock)
+            if columns is None:
+                # Kiểu dữ liệu bất thường: dùng đường scalar (kể cả lỗi)
+                results[i] = self.parse(tc, clock)
+                continue
+            
+            hour, minute, period_code, period_hour, offset, has_date, today, date_part = columns
+            rows.append(i)
+            has_hour.append(hour is not None)
+            hours.append(hour if hour is not None else 0)
+            minutes.append(minute)
+            period_codes.append(period_code)
+            period_hours.append(period_hour)
+            day_offsets.append(offset)
+            explicit.append(has_date)
+            is_today.append(today)
+            date_parts.append(date_part)
+        
+        if not rows:
+            return results
+        
+        hour = np.array(hours, dtype=np.int64)
+        has_hour = np.array(has_hour, dtype=bool)
+        minute = np.array(minutes, dtype=np.int64)
+        period_code = np.array(period_codes, dtype=np.int8)
+        
+        # Giờ + phút (như _parse_time)
+        hour = np.where((period_code == _PERIOD_PM) & (hour >= 1) & (hour <= 11), hour + 12, hour)
+        hour = np.where((period_code == _PERIOD_NIGHT) & (hour >= 12), hour - 12, hour)
+        hour = np.where((period_code == _PERIOD_MORNING) & (hour == 12), 0, hour)
+        valid_time = has_hour & (hour >= 0) & (hour <= 23) & (minute >= 0) & (minute <= 59)
+        from_period = ~has_hour & (period_code != _PERIOD_NONE)
+        hour = np.where(from_period, np.array(period_hours, dtype=np.int64), hour)
+        minute = np.where(from_period, 0, minute)
+        has_time = valid_time | from_period
+        
+        # Ngày: ngày cụ thể nếu parse được, ngược lại hôm nay + offset
+        today_day = np.datetime64(now.date(), 'D')
+        day = today_day + np.array(day_offsets, dtype='timedelta64[D]')
+        specific_day, has_specific = self._resolve_specific_dates(date_parts, now)
+        day = np.where(has_specific, specific_day, day)
+        
+        result = (day.astype('datetime64[m]')
+                  + hour.astype('timedelta64[h]')
+                  + minute.astype('timedelta64[m]'))
+        
+        # Tự động +1 ngày khi giờ đã qua (trừ ngày cụ thể / "hôm nay")
+        rollover = (~np.array(explicit, dtype=bool) & ~np.array(is_today, dtype=bool)
+                    & (result < np.datetime64(now, 'us')))
+        result = result + rollover.astype('timedelta64[D]')
+        
+        iso = np.datetime_as_string(result.astype('datetime64[s]'))
+        years = result.astype('datetime64[Y]').astype(np.int64) + 1970
+        for k, i in enumerate(rows):
+            if not has_time[k]:
+                continue
+            if years[k] < 1000:
+                # strftime không thêm số 0 ở đầu năm < 1000
+                results[i] = format_datetime_iso(result[k].astype(datetime))
+            else:
+                results[i] = str(iso[k])
+        return results
+    
+    def _to_columns(self, time_components, clock):
+        """
+        Chuyển 1 time_components thành giá trị các cột của parse_many
+        
+        Returns:
+            tuple hoặc None (None = kiểu dữ liệu bất thường, dùng parse())
+        """
+        hour = time_components.get('hour')
+        minute = time_components.get('minute')
+        period = time_components.get('period')
+        weekday = time_components.get('weekday')
+        relative_day = time_components.get('relative_day')
+        date = time_components.get('date')
+        
+        for value in (hour, minute):
+            if value is not None and (type(value) not in (int, bool) or abs(value) > _INT_LIMIT):
+                return None
+        for value in (period, weekday, relative_day, date):
+            if value is not None and type(value) is not str:
+                return None
+        
+        # Nhóm buổi
+        period_code, period_hour = _PERIOD_NONE, 0
+        if period:
+            period_lower = period.lower()
+            if period_lower in PERIOD_PM:
+                period_code = _PERIOD_PM
+            elif period_lower in PERIOD_NIGHT:
+                period_code = _PERIOD_NIGHT
+            elif period_lower in PERIOD_MORNING:
+                period_code = _PERIOD_MORNING
+            else:
+                period_code = _PERIOD_OTHER
+            period_hour = parse_period_to_hour(period)
+        
+        # Offset ngày (như _parse_date khi không có ngày cụ thể)
+        if weekday:
+            offset = clock.weekday_offset(weekday)
+            if relative_day and 'tuần sau' in relative_day:
+                offset += 7
+        elif relative_day:
+            offset = clock.relative_day_offset(relative_day)
+        else:
+            offset = 0
+        
+        # Ngày cụ thể
+        date_part = None
+        if date:
+            match = _SPECIFIC_DATE.fullmatch(date)
+            if match:
+                day, month, year = match.groups()
+                if year is None:
+                    date_part = (int(day), int(month), 0, False)
+                elif len(year) == 2:
+                    # Quy tắc %y của strptime: 69-99 -> 19xx, 00-68 -> 20xx
+                    year = int(year)
+                    date_part = (int(day), int(month), year + (1900 if year >= 69 else 2000), True)
+                else:
+                    date_part = (int(day), int(month), int(year), True)
+        
+        today = bool(relative_day) and relative_day.lower() in TODAY_TERMS
+        
+        return (
+            hour, minute if minute is not None else 0,
+            period_code, period_hour,
+            offset, date is not None, today, date_part
+        )
+    
+    def _resolve_specific_dates(self, date_parts, now):
+        """
+        Tính ngày cụ thể (như _parse_specific_date) cho cả cột
+        
+        Returns:
+            tuple: (mảng datetime64[D], mảng bool parse được)
+        """
+        n = len(date_parts)
+        present = np.array([part is not None for part in date_parts], dtype=bool)
+        parts = [part if part is not None else (1, 1, 1970, True) for part in date_parts]
+        day = np.array([part[0] for part in parts], dtype=np.int64)
+        month = np.array([part[1] for part in parts], dtype=np.int64)
+        year = np.array([part[2] for part in parts], dtype=np.int64)
+        has_year = np.array([part[3] for part in parts], dtype=bool)
+        
+        def build(year):
+            ok = (day >= 1) & (day <= 31) & (month >= 1) & (month <= 12) & (year >= 1) & (year <= 9999)
+            months = np.where(ok, (year - 1970) * 12 + month - 1, 0).astype('datetime64[M]')
+            dates = months.astype('datetime64[D]') + np.where(ok, day - 1, 0).astype('timedelta64[D]')
+            # Ngày vượt quá số ngày của tháng (VD: 31/2) -> không hợp lệ
+            ok &= dates.astype('datetime64[M]') == months
+            return dates, ok
+        
+        # Không có năm: dùng năm hiện tại, nếu ngày đã qua thì lấy năm sau
+        current_year = np.full(n, now.year, dtype=np.int64)
+        year = np.where(has_year, year, current_year)
+        dates, ok = build(year)
+        passed = ~has_year & ok & (dates.astype('datetime64[us]') < np.datetime64(now, 'us'))
+        if passed.any():
+            next_dates, next_ok = build(np.where(passed, current_year + 1, year))
+            dates = np.where(passed, next_dates, dates)
+            ok = np.where(passed, next_ok, ok)
+        
+        return dates, present & ok
@@ -0,0 +1,190 @@
+from collections.abc import MutableMapping
+from datetime import datetime, timedelta
+
+
+# Các field cố định của schedule, theo thứ tự trong schedules.json
+FIELDS = ('event', 'start_time', 'end_time', 'location', 'reminder_minutes',
+          'id', 'created_at', 'updated_at')
+_FIELD_SET = frozenset(FIELDS)
+
+# Mốc epoch cho giờ "tường" (naive, không múi giờ)
+_EPOCH = datetime(1970, 1, 1)
+_SECOND = timedelta(seconds=1)
+_UNPARSED = object()
+
+DISPLAY_FORMAT = "%d/%m/%Y %H:%M"
+
+
+def to_epoch(value):
+    """
+    Chuyển thời điểm ISO thành số giây kể từ 1970-01-01 theo giờ tường
+
+    Múi giờ (nếu có) bị bỏ qua, giữ nguyên giờ tường như ReminderService/GUI
+    vẫn làm; phần lẻ dưới 1 giây bị cắt.
+
+    Args:
+        value (str hoặc datetime): VD "2025-12-01T09:00:00"
+
+    Returns:
+        int hoặc None nếu rỗng/không hợp lệ
+    """
+    if not value:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    elif not isinstance(value, datetime):
+        return None
+    if value.tzinfo is not None:
+        value = value.replace(tzinfo=None)
+    return (value - _EPOCH) // _SECOND
+
+
+def from_epoch(epoch):
+    """Số giây (giờ tường) -> datetime naive"""
+    return _EPOCH + timedelta(seconds=epoch)
+
+
+class Schedule(MutableMapping):
+    """
+    Bản ghi schedule gọn (__slots__) thay cho dict
+
+    Dùng được như dict (schedule['event'], schedule.get(...), dict(schedule))
+    nên code cũ vẫn chạy; field không có trong FIELDS nằm trong `extra`.
+    Field chưa gán = key không tồn tại, nên to_dict() cho lại đúng dạng JSON cũ.
+
+    start_time vẫn giữ dạng chuỗi ISO (để ghi file), còn start_epoch được parse
+    1 lần và cache lại cho tới khi start_time bị gán lại.
+    """
+
+    __slots__ = FIELDS + ('extra', '_start_epoch')
+
+    def __init__(self, data=None, **fields):
+        self.extra = None
+        self._start_epoch = _UNPARSED
+        if data:
+            self.update(data)
+        if fields:
+            self.update(fields)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Tạo Schedule từ dict (dạng trong schedules.json)"""
+        return cls(data)
+
+    @classmethod
+    def coerce(cls, value):
+        """Trả về chính value nếu đã là Schedule, ngược lại chuyển từ dict"""
+        return value if isinstance(value, cls) else cls(value)
+
+    def to_dict(self):
+        """Chuyển về dict (JSON-serializable, cùng thứ tự key như trước)"""
+        data = {}
+        for name in FIELDS:
+            try:
+                data[name] = getattr(self, name)
+            except AttributeError:
+                pass
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def copy(self):
+        """Bản sao nông (giữ cả start_epoch đã cache)"""
+        clone = Schedule.__new__(Schedule)
+        for name in FIELDS:
+            try:
+                setattr(clone, name, getattr(self, name))
+            except AttributeError:
+                pass
+        clone.extra = dict(self.extra) if self.extra else None
+        clone._start_epoch = self._start_epoch
+        return clone
+
+    # ===== THỜI GIAN =====
+
+    @property
+    def start_epoch(self):
+        """start_time dạng số giây (giờ tường), None nếu không hợp lệ"""
+        epoch = self._start_epoch
+        if epoch is _UNPARSED:
+            epoch = self._start_epoch = to_epoch(self.get('start_time'))
+        return epoch
+
+    @property
+    def start_datetime(self):
+        """start_time dạng datetime naive, None nếu không hợp lệ"""
+        epoch = self.start_epoch
+        return None if epoch is None else from_epoch(epoch)
+
+    def format_start_time(self, fmt=DISPLAY_FORMAT):
+        """Format start_time để hiển thị (giữ chuỗi gốc nếu không parse được)"""
+        epoch = self.start_epoch
+        if epoch is None:
+            return self.get('start_time') or ''
+        return from_epoch(epoch).strftime(fmt)
+
+    # ===== GIAO DIỆN MAPPING =====
+
+    def __getitem__(self, key):
+        if key in _FIELD_SET:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self.extra is None:
+            raise KeyError(key)
+        return self.extra[key]
+
+    def __setitem__(self, key, value):
+        if key in _FIELD_SET:
+            setattr(self, key, value)
+            if key == 'start_time':
+                self._start_epoch = _UNPARSED
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __delitem__(self, key):
+        if key in _FIELD_SET:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+            if key == 'start_time':
+                self._start_epoch = _UNPARSED
+        elif self.extra and key in self.extra:
+            del self.extra[key]
+            if not self.extra:
+                self.extra = None
+        else:
+            raise KeyError(key)
+
+    def __iter__(self):
+        for name in FIELDS:
+            if hasattr(self, name):
+                yield name
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self):
+        count = sum(1 for name in FIELDS if hasattr(self, name))
+        return count + (len(self.extra) if self.extra else 0)
+
+    def __contains__(self, key):
+        if key in _FIELD_SET:
+            return hasattr(self, key)
+        return bool(self.extra) and key in self.extra
+
+    def get(self, key, default=None):
+        if key in _FIELD_SET:
+            return getattr(self, key, default)
+        if self.extra:
+            return self.extra.get(key, default)
+        return default
+
+    def __repr__(self):
+        return f"Schedule({self.to_dict()!r})"
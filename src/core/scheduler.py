@@ -1,14 +1,233 @@
 import sys
 import os
+import copy
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import nullcontext
 
 # Fix import path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
+from src.nlp import model_loader
 from src.nlp.preprocessor import Preprocessor
 from src.nlp.ner_extractor import NERExtractor
 from src.nlp.rule_extractor import RuleExtractor
 from src.core.parser import TimeParser
 from src.core.validator import ScheduleValidator
+from src.core.instrumentation import Instrumentation
+
+
+def _error_result(error):
+    """Kết quả lỗi chuẩn của process()"""
+    return {
+        'success': False,
+        'schedule': None,
+        'errors': [f"Lỗi xử lý: {str(error)}"],
+        'confidence': 0,
+        'quality': 'poor',
+        'debug_info': None
+    }
+
+
+# Assistant riêng của mỗi worker process (khởi tạo 1 lần trong _init_worker)
+_worker_assistant = None
+
+
+def _init_worker(pipeline_mode='adaptive'):
+    """Initializer cho ProcessPoolExecutor: dựng pipeline 1 lần mỗi worker"""
+    global _worker_assistant
+    # Cache nằm ở process cha (process_batch tra/ghi cache trước khi gửi cho worker)
+    _worker_assistant = PersonalScheduleAssistant(cache_size=0, pipeline_mode=pipeline_mode)
+    model_loader.load_models()
+
+
+def _process_chunk(texts, clock):
+    """
+    Xử lý một chunk câu trong worker process
+
+    Args:
+        texts (list): Các câu thuộc chunk
+        clock (ReferenceClock): Mốc thời gian chung của cả lô
+
+    Returns:
+        list: Kết quả theo đúng thứ tự đầu vào
+    """
+    return _worker_assistant.process_batch(texts, clock=clock)
+
+
+class ResultCache:
+    """
+    Cache LRU (có TTL): key (str) -> value (dict, lưu được ra JSON)
+    
+    PersonalScheduleAssistant dùng key là văn bản đã chuẩn hóa, value là phần
+    pipeline không phụ thuộc đồng hồ (preprocess, rule, NER).
+    """
+    
+    def __init__(self, max_size=1024, ttl=None, file_path=None):
+        """
+        Args:
+            max_size (int): Số entry tối đa (LRU bị loại khi vượt quá)
+            ttl (float): Thời gian sống của entry tính bằng giây (None = không hết hạn)
+            file_path (str): File JSON để lưu/đọc cache (None = chỉ trong bộ nhớ)
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.file_path = file_path
+        self._entries = OrderedDict()  # key -> (thời điểm lưu, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        if self.file_path:
+            self.load()
+    
+    def _is_expired(self, stored_at, now):
+        return self.ttl is not None and now - stored_at > self.ttl
+    
+    def get(self, key):
+        """
+        Lấy value đã cache (không copy: người gọi không được sửa)
+        
+        Returns:
+            dict: Value hoặc None nếu không có / đã hết hạn
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._is_expired(entry[0], time.time()):
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+    
+    def put(self, key, value):
+        """Lưu value vào cache (người gọi không được sửa value sau đó)"""
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        """Xóa toàn bộ cache (giữ nguyên thống kê)"""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self):
+        """
+        Thống kê cache
+        
+        Returns:
+            dict: {'hits', 'misses', 'evictions', 'size', 'hit_rate'}
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'hit_rate': self.hits / total if total else 0.0
+            }
+    
+    def save(self, file_path=None):
+        """
+        Ghi cache ra file JSON (bỏ qua entry đã hết hạn)
+        
+        Ghi ra file tạm rồi os.replace: dừng giữa chừng không để lại file
+        cache ghi dở.
+        
+        Returns:
+            tuple: (success: bool, error_message: str hoặc None)
+        """
+        file_path = file_path or self.file_path
+        if not file_path:
+            return False, "Chưa chỉ định file cache"
+        
+        with self._lock:
+            now = time.time()
+            data = [
+                [key, stored_at, value]
+                for key, (stored_at, value) in self._entries.items()
+                if not self._is_expired(stored_at, now)
+            ]
+        
+        tmp_path = file_path + '.tmp'
+        try:
+            directory = os.path.dirname(file_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, file_path)
+            return True, None
+        except Exception as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False, f"Lỗi khi lưu cache: {e}"
+    
+    def load(self, file_path=None):
+        """
+        Đọc cache từ file JSON
+        
+        File không tồn tại/không đọc được thì bỏ qua; entry sai dạng (file
+        của phiên bản cũ, bị sửa tay...) bị bỏ qua từng entry.
+        
+        Returns:
+            int: Số entry đã nạp
+        """
+        file_path = file_path or self.file_path
+        if not file_path or not os.path.exists(file_path):
+            return 0
+        
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"Lỗi load cache: {e}")
+            return 0
+        
+        if not isinstance(data, list):
+            print("Lỗi load cache: file không đúng định dạng")
+            return 0
+        
+        loaded = 0
+        skipped = 0
+        with self._lock:
+            now = time.time()
+            for entry in data:
+                if not self._is_valid_entry(entry):
+                    skipped += 1
+                    continue
+                key, stored_at, value = entry
+                if self._is_expired(stored_at, now):
+                    continue
+                self._entries[key] = (stored_at, value)
+                loaded += 1
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        if skipped:
+            print(f"Lỗi load cache: bỏ qua {skipped} entry sai định dạng")
+        return loaded
+    
+    @staticmethod
+    def _is_valid_entry(entry):
+        """Entry trong file: [key (str), thời điểm lưu (số), value (dict)]"""
+        return (
+            isinstance(entry, list) and len(entry) == 3 and
+            isinstance(entry[0], str) and
+            isinstance(entry[1], (int, float)) and not isinstance(entry[1], bool) and
+            isinstance(entry[2], dict)
+        )
 
 
 class PersonalScheduleAssistant:
@@ -17,13 +236,63 @@ class PersonalScheduleAssistant:
     Pipeline: Input → Preprocessor → NER → Rule → Parser → Validator → Output
     """
     
-    def __init__(self):
+    # Chế độ pipeline:
+    #   'full'     - luôn chạy NER
+    #   'adaptive' - chạy rule trước, chỉ gọi NER khi rule chưa tìm được địa điểm
+    #                (validator chỉ dùng NER cho location, không dùng NER time)
+    PIPELINE_MODES = ('full', 'adaptive')
+    
+    def __init__(self, cache_size=1024, cache_ttl=None, cache_path=None, pipeline_mode='adaptive',
+                 instrumentation=None):
+        """
+        Args:
+            cache_size (int): Số kết quả tối đa trong cache (0 = tắt cache)
+            cache_ttl (float): Thời gian sống của kết quả cache (giây)
+            cache_path (str): File để lưu cache giữa các lần chạy (tùy chọn)
+            pipeline_mode (str): 'full' hoặc 'adaptive' (xem PIPELINE_MODES)
+            instrumentation (Instrumentation): Đo thời gian từng stage, hook,
+                counter (None = không đo, không tốn chi phí)
+        """
+        if pipeline_mode not in self.PIPELINE_MODES:
+            raise ValueError(f"pipeline_mode không hợp lệ: {pipeline_mode}")
+        self.pipeline_mode = pipeline_mode
+        
         # Khởi tạo tất cả components
         self.preprocessor = Preprocessor()
         self.ner_extractor = NERExtractor()
         self.rule_extractor = RuleExtractor()
         self.time_parser = TimeParser()
         self.validator = ScheduleValidator()
+        
+        # Cache phần phân tích không phụ thuộc đồng hồ, theo normalized text
+        self.cache = ResultCache(cache_size, cache_ttl, cache_path) if cache_size else None
+        
+        self.instrumentation = instrumentation
+        
+        # Process pool của process_batch(workers > 1): tạo lười, giữ đến close()
+        self._pool = None
+        self._pool_workers = 0
+        self._pool_lock = threading.Lock()
+    
+    def enable_instrumentation(self, instrumentation=None):
+        """
+        Bật đo đạc pipeline
+        
+        Returns:
+            Instrumentation: Đối tượng đang dùng (để thêm hook / export)
+        """
+        self.instrumentation = instrumentation or Instrumentation()
+        return self.instrumentation
+    
+    def _span(self, stage):
+        """Timing span của stage (không làm gì nếu chưa bật instrumentation)"""
+        if self.instrumentation is None:
+            return nullcontext()
+        return self.instrumentation.span(stage)
+    
+    def _count(self, name):
+        if self.instrumentation is not None:
+            self.instrumentation.increment(name)
     
     def calculate_confidence(self, schedule, debug_info):
         """
@@ -69,12 +338,49 @@ class PersonalScheduleAssistant:
         
         return score, quality
     
-    def process(self, text):
+    def _cache_key(self, text):
+        """Key cache: văn bản đã chuẩn hóa"""
+        return self.preprocessor.normalize_terms(self.preprocessor.clean_text(text))
+    
+    @staticmethod
+    def _cache_value(result):
+        """
+        Phần kết quả được cache: preprocess, rule, NER (không đọc đồng hồ)
+        
+        Parse thời gian (giờ đã qua thì dời sang hôm sau) và validate (không
+        cho thời gian trong quá khứ) phụ thuộc clock.now nên luôn chạy lại
+        với clock của từng request.
+        """
+        debug_info = result['debug_info']
+        return copy.deepcopy({
+            'preprocessed': debug_info['preprocessed'],
+            'rule_result': debug_info['rule_result'],
+            'ner_result': debug_info['ner_result']
+        })
+    
+    def _from_cache(self, text, cached):
+        """
+        Dựng lại phần đầu pipeline từ cache
+        
+        Returns:
+            tuple: (stages, preprocessed, rule_result, ner_result) như sau NER
+        """
+        cached = copy.deepcopy(cached)
+        preprocessed = cached['preprocessed']
+        preprocessed['original'] = text
+        return ['cache'], preprocessed, cached['rule_result'], cached['ner_result']
+    
+    def process(self, text, clock=None):
         """
         Xử lý câu tiếng Việt tự nhiên thành schedule object
         
+        Các câu có cùng văn bản chuẩn hóa dùng lại phần phân tích trong cache
+        (preprocess, rule, NER); parse thời gian và validate luôn chạy với
+        clock của request (stages: ['cache', 'parse', 'validate', 'confidence']).
+        
         Args:
             text (str): Câu tiếng Việt (VD: "Họp nhóm 10 giờ sáng mai ở phòng 302")
+            clock (ReferenceClock): Mốc thời gian (None = lấy 1 lần cho request này)
             
         Returns:
             dict: {
@@ -86,67 +392,370 @@ class PersonalScheduleAssistant:
                 'debug_info': dict (optional)
             }
         """
+        clock = clock or self.time_parser.reference_clock()
+        with self._span('process'):
+            result = self._process_cached(text, clock)
+        
+        if result['debug_info'] is None:
+            self._count('pipeline_error')
+        return result
+    
+    def _process_cached(self, text, clock):
+        """process() qua cache (nếu bật)"""
+        if self.cache is None:
+            return self._run_pipeline(text, clock)
+        
         try:
-            # Component 1: Preprocessing
-            preprocessed = self.preprocessor.process(text)
-            normalized_text = preprocessed['normalized']
-            
-            # Component 2: NER Extraction
-            ner_result = self.ner_extractor.extract(normalized_text)
+            key = self._cache_key(text)
+        except Exception as e:
+            return _error_result(e)
+        
+        cached = self.cache.get(key)
+        if cached is None:
+            self._count('cache_miss')
+            rule_only = model_loader.is_warming_up()
+            result = self._run_pipeline(text, clock)
+            if result['debug_info'] is None or rule_only:
+                # Lỗi bất ngờ hoặc kết quả rule-only khi model chưa tải xong: không cache
+                return result
+            self.cache.put(key, self._cache_value(result))
+            return result
+        
+        self._count('cache_hit')
+        try:
+            return self._parse_and_complete(*self._from_cache(text, cached), clock)
+        except Exception as e:
+            return _error_result(e)
+    
+    def _process_batch_cached(self, texts, clock, run=None):
+        """
+        process() cho nhiều câu: lấy từ cache, phần còn lại chạy theo lô
+        
+        Args:
+            run (callable): run(texts) -> kết quả cho các câu chưa có trong cache
+                (mặc định chạy pipeline trong process này)
+        """
+        run = run or (lambda pending: self._run_pipeline_batch(pending, clock))
+        if self.cache is None:
+            return run(texts)
+        
+        results = [None] * len(texts)
+        keys = {}  # index -> cache key của các câu chưa có trong cache
+        hits = {}  # index -> (stages, preprocessed, rule_result, ner_result) từ cache
+        for i, text in enumerate(texts):
+            try:
+                key = self._cache_key(text)
+                cached = self.cache.get(key)
+                if cached is not None:
+                    hits[i] = self._from_cache(text, cached)
+            except Exception as e:
+                results[i] = _error_result(e)
+                continue
             
-            # Component 3: Rule-based Extraction
-            rule_result = self.rule_extractor.extract_all(normalized_text)
+            if cached is None:
+                self._count('cache_miss')
+                keys[i] = key
+            else:
+                self._count('cache_hit')
+        
+        if hits:
+            # Phần phụ thuộc đồng hồ chạy lại với clock của lô
+            for i, result in self._complete_batch(hits, clock).items():
+                results[i] = result
+        
+        if keys:
+            rule_only = model_loader.is_warming_up()
+            computed = run([texts[i] for i in keys])
+            for (i, key), result in zip(keys.items(), computed):
+                results[i] = result
+                if result['debug_info'] is not None and not rule_only:
+                    self.cache.put(key, self._cache_value(result))
+        
+        return results
+    
+    def cache_stats(self):
+        """
+        Thống kê cache kết quả
+        
+        Returns:
+            dict: Xem ResultCache.stats() (None nếu cache bị tắt)
+        """
+        return self.cache.stats() if self.cache else None
+    
+    def save_cache(self):
+        """Lưu cache kết quả ra file đã cấu hình (cache_path)"""
+        if self.cache is None:
+            return False, "Cache đang tắt"
+        return self.cache.save()
+    
+    def _needs_ner(self, rule_result):
+        """
+        Có cần chạy NER không (theo pipeline_mode)
+        
+        NER chỉ bổ sung location khi rule không tìm được full_location.
+        """
+        if self.pipeline_mode == 'full':
+            return True
+        location_components = rule_result.get('location_components') or {}
+        return not location_components.get('full_location')
+    
+    def _run_pipeline(self, text, clock):
+        """Chạy toàn bộ pipeline (không qua cache)"""
+        try:
+            stages, preprocessed, rule_result = self._analyze(text)
             
-            # Component 4: Time Parsing
-            time_components = rule_result.get('time_components', {})
-            parsed_time = self.time_parser.parse(time_components)
+            # Component 2: NER Extraction (chỉ khi còn thiếu thông tin)
+            if self._needs_ner(rule_result):
+                if model_loader.is_warming_up():
+                    # Model đang tải: NER chỉ dùng keyword matching
+                    self._count('ner_keyword_only')
+                with self._span('ner'):
+                    ner_result = self.ner_extractor.extract(preprocessed['normalized'])
+                stages.append('ner')
+                self._count('ner_run')
+            else:
+                ner_result = {'time': [], 'location': [], 'ner_result': []}
+                self._count('ner_skipped')
             
-            # Component 5: Validation & Merging
+            return self._parse_and_complete(stages, preprocessed, rule_result, ner_result, clock)
+        
+        except Exception as e:
+            return _error_result(e)
+    
+    def _run_pipeline_batch(self, texts, clock):
+        """
+        Chạy pipeline cho nhiều câu (không qua cache), NER chạy theo lô
+        
+        Returns:
+            list: Kết quả đúng thứ tự đầu vào
+        """
+        results = [None] * len(texts)
+        analyzed = {}  # index -> (stages, preprocessed, rule_result)
+        for i, text in enumerate(texts):
+            try:
+                analyzed[i] = self._analyze(text)
+            except Exception as e:
+                results[i] = _error_result(e)
+        
+        # Component 2: NER Extraction cho tất cả câu cần NER trong 1 lần gọi
+        ner_indexes = [i for i, (_, _, rule_result) in analyzed.items() if self._needs_ner(rule_result)]
+        ner_results = {}
+        if ner_indexes:
+            if model_loader.is_warming_up():
+                self._count('ner_keyword_only')
+            try:
+                with self._span('ner_batch'):
+                    batch = self.ner_extractor.extract_batch(
+                        [analyzed[i][1]['normalized'] for i in ner_indexes]
+                    )
+                ner_results = dict(zip(ner_indexes, batch))
+            except Exception as e:
+                for i in ner_indexes:
+                    results[i] = _error_result(e)
+                    del analyzed[i]
+        
+        entries = {}  # index -> (stages, preprocessed, rule_result, ner_result)
+        for i, (stages, preprocessed, rule_result) in analyzed.items():
+            if i in ner_results:
+                ner_result = ner_results[i]
+                stages.append('ner')
+                self._count('ner_run')
+            else:
+                ner_result = {'time': [], 'location': [], 'ner_result': []}
+                self._count('ner_skipped')
+            entries[i] = (stages, preprocessed, rule_result, ner_result)
+        
+        for i, result in self._complete_batch(entries, clock).items():
+            results[i] = result
+        return results
+    
+    def _complete_batch(self, entries, clock):
+        """
+        Parse thời gian (cả lô, xem TimeParser.parse_many) + validate
+        
+        Args:
+            entries (dict): index -> (stages, preprocessed, rule_result, ner_result)
+        
+        Returns:
+            dict: index -> kết quả
+        """
+        parsed_times = {}
+        try:
+            with self._span('parse_batch'):
+                parsed = self.time_parser.parse_many(
+                    [rule_result.get('time_components', {}) for _, _, rule_result, _ in entries.values()],
+                    clock
+                )
+            parsed_times = dict(zip(entries, parsed))
+        except Exception:
+            # Có dòng lỗi: parse từng câu bên dưới để chỉ câu đó bị lỗi
+            pass
+        
+        results = {}
+        for i, (stages, preprocessed, rule_result, ner_result) in entries.items():
+            try:
+                if i in parsed_times:
+                    stages.append('parse')
+                    results[i] = self._complete(stages, preprocessed, rule_result, ner_result,
+                                                parsed_times[i], clock)
+                else:
+                    results[i] = self._parse_and_complete(stages, preprocessed, rule_result,
+                                                          ner_result, clock)
+            except Exception as e:
+                results[i] = _error_result(e)
+        return results
+    
+    def _analyze(self, text):
+        """
+        Tiền xử lý + trích xuất rule (phần pipeline trước NER)
+        
+        Returns:
+            tuple: (stages, preprocessed, rule_result)
+        """
+        stages = []
+        
+        # Component 1: Preprocessing
+        with self._span('preprocess'):
+            preprocessed = self.preprocessor.process(text)
+        stages.append('preprocess')
+        
+        # Component 3: Rule-based Extraction (chạy trước để quyết định có cần NER)
+        with self._span('rule'):
+            rule_result = self.rule_extractor.extract_all(preprocessed['normalized'])
+        stages.append('rule')
+        
+        return stages, preprocessed, rule_result
+    
+    def _parse_and_complete(self, stages, preprocessed, rule_result, ner_result, clock):
+        """Phần pipeline phụ thuộc đồng hồ: parse thời gian, validate, confidence"""
+        # Component 4: Time Parsing
+        time_components = rule_result.get('time_components', {})
+        with self._span('parse'):
+            parsed_time = self.time_parser.parse(time_components, clock)
+        stages.append('parse')
+        
+        return self._complete(stages, preprocessed, rule_result, ner_result, parsed_time, clock)
+    
+    def _complete(self, stages, preprocessed, rule_result, ner_result, parsed_time, clock):
+        """Phần pipeline sau parse: validate, confidence"""
+        # Component 5: Validation & Merging
+        with self._span('validate'):
             schedule, is_valid, errors = self.validator.create_schedule(
-                preprocessed, ner_result, rule_result, parsed_time
+                preprocessed, ner_result, rule_result, parsed_time, clock
             )
-            
-            # Calculate confidence
-            debug_info = {
-                'preprocessed': preprocessed,
-                'ner_result': ner_result,
-                'rule_result': rule_result,
-                'parsed_time': parsed_time
-            }
+        stages.append('validate')
+        
+        # Calculate confidence
+        debug_info = {
+            'preprocessed': preprocessed,
+            'ner_result': ner_result,
+            'rule_result': rule_result,
+            'parsed_time': parsed_time,
+            'stages': stages
+        }
+        with self._span('confidence'):
             confidence, quality = self.calculate_confidence(schedule, debug_info)
-            
-            # Return result
-            return {
-                'success': is_valid,
-                'schedule': schedule if is_valid else None,
-                'errors': errors,
-                'confidence': confidence,
-                'quality': quality,
-                'debug_info': debug_info
-            }
+        stages.append('confidence')
         
-        except Exception as e:
-            return {
-                'success': False,
-                'schedule': None,
-                'errors': [f"Lỗi xử lý: {str(e)}"],
-                'confidence': 0,
-                'quality': 'poor',
-                'debug_info': None
-            }
+        # Return result
+        return {
+            'success': is_valid,
+            'schedule': schedule if is_valid else None,
+            'errors': errors,
+            'confidence': confidence,
+            'quality': quality,
+            'debug_info': debug_info
+        }
     
-    def process_batch(self, texts):
+    def process_batch(self, texts, workers=1, chunk_size=None, clock=None):
         """
         Xử lý nhiều câu cùng lúc
         
+        NER được gọi theo lô cho các câu cần NER (NERExtractor.extract_batch).
+        Với workers > 1 (hoặc None = số CPU), các câu chưa có trong cache được
+        chia thành chunk và xử lý song song trên process pool. Pool được tạo
+        lần đầu cần dùng và giữ lại cho các lần gọi sau (mỗi worker dựng
+        pipeline + nạp model 1 lần), đóng bằng close(). Kết quả giữ đúng thứ
+        tự đầu vào, lỗi của một chunk không làm hỏng các chunk khác.
+        
+        Cache kết quả và counter (cache_hit/cache_miss/pipeline_error) dùng
+        chung ở process này cho cả 2 chế độ; riêng thời gian từng stage chạy
+        trong worker không được gộp về instrumentation (chỉ có span
+        'process_batch' của cả lô).
+        
         Args:
             texts (list): Danh sách các câu
+            workers (int): Số worker process (1 = chạy tuần tự, None = số CPU)
+            chunk_size (int): Số câu mỗi lần gửi cho worker (None = tự tính)
+            clock (ReferenceClock): Mốc thời gian chung cho cả lô (None = lấy 1 lần)
             
         Returns:
             list: Danh sách kết quả
         """
+        texts = list(texts)
+        clock = clock or self.time_parser.reference_clock()
+        if workers is None:
+            workers = os.cpu_count() or 1
+        
+        run = None
+        if min(workers, len(texts)) > 1:
+            run = lambda pending: self._run_parallel(pending, clock, workers, chunk_size)
+        
+        with self._span('process_batch'):
+            results = self._process_batch_cached(texts, clock, run)
+        for result in results:
+            if result['debug_info'] is None:
+                self._count('pipeline_error')
+        return results
+    
+    def _get_pool(self, workers):
+        """Process pool dùng lại giữa các lần gọi (tạo lại nếu đổi số worker/bị hỏng)"""
+        with self._pool_lock:
+            if self._pool is not None and self._pool_workers != workers:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=workers, initializer=_init_worker,
+                    initargs=(self.pipeline_mode,)
+                )
+                self._pool_workers = workers
+            return self._pool
+    
+    def _run_parallel(self, texts, clock, workers, chunk_size=None):
+        """Chạy pipeline cho các câu trên process pool"""
+        if len(texts) <= 1:
+            return self._run_pipeline_batch(texts, clock)
+        
+        if not chunk_size or chunk_size < 1:
+            # ~4 chunk mỗi worker để cân bằng tải
+            chunk_size = max(1, -(-len(texts) // (workers * 4)))
+        
+        chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+        executor = self._get_pool(workers)
         results = []
-        for text in texts:
-            result = self.process(text)
-            results.append(result)
-        return results
\ No newline at end of file
+        broken = False
+        
+        futures = [executor.submit(_process_chunk, chunk, clock) for chunk in chunks]
+        for chunk, future in zip(chunks, futures):
+            try:
+                results.extend(future.result())
+            except Exception as e:
+                # Worker chết hoặc lỗi truyền dữ liệu: chỉ đánh lỗi chunk này
+                broken = broken or isinstance(e, BrokenProcessPool)
+                results.extend(_error_result(e) for _ in chunk)
+        
+        if broken:
+            # Pool hỏng không dùng lại được: lần sau tạo pool mới
+            with self._pool_lock:
+                if self._pool is executor:
+                    self._pool = None
+            executor.shutdown(wait=False)
+        return results
+    
+    def close(self):
+        """Đóng process pool của process_batch (nếu đã tạo)"""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
\ No newline at end of file
@@ -5,7 +5,7 @@ import os
 # Fix import path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from src.utils.time_utils import get_current_datetime
+from src.utils.time_utils import get_current_datetime, VN_TZ
 
 
 class ScheduleValidator:
@@ -33,12 +33,13 @@ class ScheduleValidator:
         
         return True, None
     
-    def validate_start_time(self, start_time):
+    def validate_start_time(self, start_time, clock=None):
         """
         Kiểm tra start_time hợp lệ
         
         Args:
             start_time (str): ISO format datetime string
+            clock (ReferenceClock): Mốc thời gian của request (None = giờ hiện tại)
             
         Returns:
             tuple: (is_valid, error_message)
@@ -51,12 +52,10 @@ class ScheduleValidator:
             dt = datetime.fromisoformat(start_time)
             
             # Kiểm tra không được là thời điểm quá khứ (trừ trong hôm nay)
-            from src.utils.time_utils import get_current_datetime
-            current = get_current_datetime()
+            current = clock.now if clock else get_current_datetime()
             
             # Make both timezone-aware or both naive for comparison
             if dt.tzinfo is None and current.tzinfo is not None:
-                from src.utils.time_utils import VN_TZ
                 dt = VN_TZ.localize(dt)
             elif dt.tzinfo is not None and current.tzinfo is None:
                 current = current.replace(tzinfo=dt.tzinfo)
@@ -166,12 +165,13 @@ class ScheduleValidator:
         
         return schedule
     
-    def validate_schedule(self, schedule):
+    def validate_schedule(self, schedule, clock=None):
         """
         Validate toàn bộ schedule object
         
         Args:
             schedule (dict): Schedule object cần validate
+            clock (ReferenceClock): Mốc thời gian của request (None = giờ hiện tại)
             
         Returns:
             tuple: (is_valid, errors)
@@ -186,7 +186,7 @@ class ScheduleValidator:
             errors.append(error)
         
         # Validate start_time
-        is_valid, error = self.validate_start_time(schedule.get('start_time'))
+        is_valid, error = self.validate_start_time(schedule.get('start_time'), clock)
         if not is_valid:
             errors.append(error)
         
@@ -202,10 +202,13 @@ class ScheduleValidator:
         
         return len(errors) == 0, errors
     
-    def create_schedule(self, preprocessed, ner_result, rule_result, parsed_time):
+    def create_schedule(self, preprocessed, ner_result, rule_result, parsed_time, clock=None):
         """
         Pipeline chính: Merge + Validate
         
+        Args:
+            clock (ReferenceClock): Mốc thời gian của request (None = giờ hiện tại)
+        
         Returns:
             tuple: (schedule, is_valid, errors)
         """
@@ -213,6 +216,6 @@ class ScheduleValidator:
         schedule = self.merge_results(preprocessed, ner_result, rule_result, parsed_time)
         
         # Step 2: Validate
-        is_valid, errors = self.validate_schedule(schedule)
+        is_valid, errors = self.validate_schedule(schedule, clock)
         
         return schedule, is_valid, errors
\ No newline at end of file
@@ -0,0 +1,161 @@
+import re
+
+
+def _first_char_class(pattern):
+    """
+    Lấy tập ký tự đầu tiên bắt buộc của pattern (dạng nội dung của [...])
+
+    Chỉ nhận diện các dạng đơn giản: chữ/số literal hoặc \\d, có thể nằm
+    trong group "(" hoặc sau "\\b". Trả về None nếu không chắc chắn.
+    """
+    if '|' in pattern:
+        return None
+
+    rest = pattern
+    while True:
+        if rest.startswith('(') and not rest.startswith('(?'):
+            rest = rest[1:]
+        elif rest.startswith(r'\b'):
+            rest = rest[2:]
+        else:
+            break
+
+    if rest.startswith(r'\d'):
+        head, tail = r'\d', rest[2:]
+    elif rest[:1].isalnum():
+        head, tail = rest[0], rest[1:]
+    else:
+        return None
+
+    # Ký tự đầu có thể không xuất hiện -> không dùng làm guard được
+    if tail[:1] in ('?', '*') or tail.startswith('{0'):
+        return None
+    return head
+
+
+class PriorityMatcher:
+    """
+    Gộp một danh sách regex (theo thứ tự ưu tiên) thành 1 regex đã compile
+
+    Kết quả giống hệt vòng lặp:
+        for pattern in patterns:
+            match = re.search(pattern, text)
+            if match: break
+    nhưng chỉ quét văn bản 1 lần thay vì 1 lần cho mỗi pattern.
+    """
+
+    def __init__(self, patterns, flags=0):
+        self.patterns = list(patterns)
+
+        parts = []
+        self._slots = {}  # group bao ngoài -> (vị trí ưu tiên, số group con)
+        group = 1
+        for priority, pattern in enumerate(self.patterns):
+            inner_groups = re.compile(pattern, flags).groups
+            parts.append(f'({pattern})')
+            self._slots[group] = (priority, inner_groups)
+            group += inner_groups + 1
+
+        # Lookahead: thử mọi pattern tại mỗi vị trí mà không tiêu thụ ký tự,
+        # nên các match chồng lấn nhau vẫn được tìm thấy
+        combined = '(?=' + '|'.join(parts) + ')'
+
+        # Guard ký tự đầu: bỏ qua nhanh các vị trí không thể bắt đầu match
+        first_chars = [_first_char_class(pattern) for pattern in self.patterns]
+        if first_chars and None not in first_chars:
+            combined = '(?=[' + ''.join(sorted(set(first_chars))) + '])' + combined
+
+        self.regex = re.compile(combined, flags)
+
+    def search(self, text):
+        """
+        Tìm match của pattern có ưu tiên cao nhất (match trái nhất của nó)
+
+        Args:
+            text (str): Văn bản đầu vào
+
+        Returns:
+            tuple: (priority, matched_text, groups) hoặc None
+        """
+        best = None
+        for match in self.regex.finditer(text):
+            # Group bao ngoài đóng sau cùng nên lastindex chính là nó
+            group = match.lastindex
+            priority, inner_groups = self._slots[group]
+            if best is None or priority < best[0]:
+                best = (
+                    priority,
+                    match.group(group),
+                    match.groups()[group:group + inner_groups]
+                )
+                if priority == 0:
+                    break
+        return best
+
+
+class KeywordAutomaton:
+    """
+    Automaton Aho-Corasick cho danh sách từ khóa (chuỗi literal)
+
+    Tìm tất cả vị trí xuất hiện của mọi từ khóa (kể cả chồng lấn) trong 1
+    lần quét văn bản, chi phí gần như không đổi khi danh sách từ khóa tăng.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+
+        # Trie: _goto[state] = {ký tự: state}, _out[state] = từ khóa kết thúc tại state
+        self._goto = [{}]
+        self._out = [[]]
+        for keyword in self.keywords:
+            if not keyword:
+                continue
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._out.append([])
+                state = next_state
+            if keyword not in self._out[state]:
+                self._out[state].append(keyword)
+
+        # Fail link (BFS), gộp output của fail state vào state hiện tại, đồng
+        # thời điền sẵn chuyển trạng thái qua fail link (DFA đầy đủ) để lúc quét
+        # mỗi ký tự chỉ cần 1 lần tra dict
+        fail = [0] * len(self._goto)
+        self._delta = [dict(self._goto[0])] + [None] * (len(self._goto) - 1)
+        queue = list(self._goto[0].values())
+        for state in queue:
+            transitions = dict(self._delta[fail[state]])
+            transitions.update(self._goto[state])
+            self._delta[state] = transitions
+            for char, next_state in self._goto[state].items():
+                if state:
+                    fail[next_state] = self._delta[fail[state]].get(char, 0)
+                self._out[next_state] = self._out[next_state] + self._out[fail[next_state]]
+                queue.append(next_state)
+
+    def find_all(self, text):
+        """
+        Tìm mọi lần xuất hiện của các từ khóa
+
+        Args:
+            text (str): Văn bản đầu vào
+
+        Returns:
+            dict: {từ khóa: [vị trí bắt đầu, ...]} (tăng dần), chỉ gồm từ khóa có xuất hiện
+        """
+        delta = self._delta
+        out = self._out
+
+        hits = {}
+        state = 0
+        for i, char in enumerate(text):
+            state = delta[state].get(char, 0)
+            if out[state]:
+                for keyword in out[state]:
+                    hits.setdefault(keyword, []).append(i - len(keyword) + 1)
+        return hits
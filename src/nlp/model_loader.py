@@ -0,0 +1,96 @@
+import threading
+import time
+
+
+# Trạng thái model underthesea (dùng chung cho cả process)
+_lock = threading.Lock()
+_ready = threading.Event()
+_warm_up_thread = None
+_models = {}
+
+# Thời gian tải (giây), để đo hiệu quả khởi động
+load_timings = {}
+
+
+def load_models():
+    """
+    Import underthesea và nạp model NER/tokenizer (chỉ làm 1 lần)
+
+    Hàm chặn cho đến khi model sẵn sàng; an toàn khi gọi từ nhiều thread.
+
+    Returns:
+        dict: {'ner': function, 'word_tokenize': function}
+    """
+    if _ready.is_set():
+        return _models
+
+    with _lock:
+        if _ready.is_set():
+            return _models
+
+        start = time.perf_counter()
+        from underthesea import ner, word_tokenize
+        load_timings['import'] = time.perf_counter() - start
+
+        # Gọi thử 1 lần để model thực sự được nạp vào bộ nhớ
+        model_start = time.perf_counter()
+        ner('họp nhóm')
+        word_tokenize('họp nhóm', format="text")
+        load_timings['model'] = time.perf_counter() - model_start
+        load_timings['total'] = time.perf_counter() - start
+
+        _models['ner'] = ner
+        _models['word_tokenize'] = word_tokenize
+        _ready.set()
+
+    print(f"✅ NLP models loaded in {load_timings['total']:.2f}s")
+    return _models
+
+
+def _warm_up_target():
+    try:
+        load_models()
+    except Exception as e:
+        print(f"⚠️ Lỗi tải model NLP: {e}")
+
+
+def warm_up():
+    """
+    Tải model trong background thread (không chặn thread gọi)
+
+    Returns:
+        threading.Thread: Thread đang tải model
+    """
+    global _warm_up_thread
+    with _lock:
+        if _warm_up_thread is None:
+            _warm_up_thread = threading.Thread(target=_warm_up_target, daemon=True)
+            _warm_up_thread.start()
+    return _warm_up_thread
+
+
+def is_ready():
+    """Model đã được nạp xong chưa"""
+    return _ready.is_set()
+
+
+def is_warming_up():
+    """Model đang được tải trong background"""
+    return _warm_up_thread is not None and _warm_up_thread.is_alive() and not _ready.is_set()
+
+
+def get_model(name):
+    """
+    Lấy model theo tên ('ner' hoặc 'word_tokenize')
+
+    Nếu model đang được tải trong background thì trả về None ngay (để
+    pipeline chạy nhánh rule-only), ngược lại tải đồng bộ khi cần.
+
+    Returns:
+        function hoặc None
+    """
+    if _ready.is_set():
+        return _models[name]
+    if is_warming_up():
+        return None
+    return load_models()[name]
@@ -1,5 +1,22 @@
-from underthesea import ner
 import re
+import sys
+import os
+
+# underthesea được nạp lười qua model_loader (không chặn lúc import)
+try:
+    from . import model_loader
+    from .matcher import KeywordAutomaton
+except ImportError:
+    # Nếu chạy trực tiếp file này
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+    from src.nlp import model_loader
+    from src.nlp.matcher import KeywordAutomaton
+
+
+# Dùng cho ngữ cảnh quanh từ khóa (match tại vị trí cho trước)
+_SPACES = re.compile(r'\s*')
+_WORD = re.compile(r'\S*')
+_WORD_SPACES_END = re.compile(r'\S*\s*\Z')
 
 
 class NERExtractor:
@@ -18,6 +35,26 @@ class NERExtractor:
             'công ty', 'cơ quan', 'trụ sở', 'chi nhánh',
             'quán', 'nhà hàng', 'cafe', 'khách sạn'
         ]
+        
+        # Pattern giờ cụ thể (10h, 10 giờ, 10:30)
+        self._time_regexes = [
+            re.compile(r'\d{1,2}:\d{2}'),  # 10:30, 14:00
+            re.compile(r'\d{1,2}\s*giờ\s*\d{0,2}\s*phút?'),  # 10 giờ 30 phút
+            re.compile(r'\d{1,2}h\d{0,2}'),  # 10h30
+        ]
+        
+        # Pattern: "phòng 302", "tầng 5", "tòa A"
+        self._location_regexes = [
+            re.compile(r'phòng\s+\w+'),
+            re.compile(r'tầng\s+\w+'),
+            re.compile(r'tòa\s+\w+'),
+            re.compile(r'văn phòng\s+\w+'),
+        ]
+        
+        # Tìm mọi từ khóa thời gian + địa điểm trong 1 lần quét
+        self._keyword_automaton = KeywordAutomaton(self.time_keywords + self.location_keywords)
+        self._time_keyword_set = set(self.time_keywords)
+        self._location_keyword_set = set(self.location_keywords)
     
     def extract_with_ner(self, text):
         """
@@ -33,46 +70,41 @@ class NERExtractor:
                 'all_entities': [...]
             }
         """
-        try:
-            # Chạy NER
-            entities = ner(text)
-            
-            time_entities = []
-            location_entities = []
-            all_entities = []
-            
-            # Phân loại entities - xử lý cả tuple và list format
-            for item in entities:
-                # underthesea có thể trả về (word, tag) hoặc [word, tag] hoặc (word, pos, tag)
-                if isinstance(item, (tuple, list)):
-                    if len(item) == 2:
-                        word, tag = item
-                    elif len(item) >= 3:
-                        word, _, tag = item[0], item[1], item[2]
-                    else:
-                        continue
-                else:
-                    continue
-                
-                entity_info = {
-                    'word': word,
-                    'tag': tag
-                }
-                all_entities.append(entity_info)
-                
-                # Lọc TIME entities
-                if tag and ('TIME' in str(tag) or tag == 'B-TIME' or tag == 'I-TIME'):
-                    time_entities.append(word)
-                
-                # Lọc LOCATION entities
-                if tag and ('LOC' in str(tag) or tag == 'B-LOC' or tag == 'I-LOC'):
-                    location_entities.append(word)
+        return self._run_ner(self._get_ner(), text)
+    
+    def extract_with_ner_batch(self, texts):
+        """
+        NER cho nhiều câu (dùng khi import / xử lý hàng loạt)
+        
+        Model chỉ được lấy 1 lần cho cả lô và mỗi câu trùng lặp chỉ chạy NER
+        1 lần. Lỗi của một câu không ảnh hưởng các câu khác.
+        
+        Args:
+            texts (list): Danh sách văn bản
             
-            return {
-                'time_entities': time_entities,
-                'location_entities': location_entities,
-                'all_entities': all_entities
-            }
+        Returns:
+            list: Kết quả như extract_with_ner(), đúng thứ tự đầu vào
+        """
+        ner = self._get_ner()
+        results = {}
+        for text in texts:
+            if text not in results:
+                results[text] = self._run_ner(ner, text)
+        return [results[text] for text in texts]
+    
+    def _get_ner(self):
+        """Model NER (None nếu đang tải trong background hoặc tải lỗi)"""
+        try:
+            return model_loader.get_model('ner')
+        except Exception as e:
+            print(f"Lỗi NER extraction: {e}")
+            return None
+    
+    def _run_ner(self, ner, text):
+        """Chạy NER (ner = None khi model đang tải -> không có entity)"""
+        try:
+            entities = ner(text) if ner else []
+            return self._classify_entities(entities)
         
         except Exception as e:
             print(f"Lỗi NER extraction: {e}")
@@ -82,13 +114,53 @@ class NERExtractor:
                 'all_entities': []
             }
     
-    def extract_time_phrases(self, text):
+    def _classify_entities(self, entities):
+        """Phân loại entities của underthesea thành TIME / LOCATION"""
+        time_entities = []
+        location_entities = []
+        all_entities = []
+        
+        # Phân loại entities - xử lý cả tuple và list format
+        for item in entities:
+            # underthesea có thể trả về (word, tag) hoặc [word, tag] hoặc (word, pos, tag)
+            if isinstance(item, (tuple, list)):
+                if len(item) == 2:
+                    word, tag = item
+                elif len(item) >= 3:
+                    word, _, tag = item[0], item[1], item[2]
+                else:
+                    continue
+            else:
+                continue
+            
+            entity_info = {
+                'word': word,
+                'tag': tag
+            }
+            all_entities.append(entity_info)
+            
+            # Lọc TIME entities
+            if tag and ('TIME' in str(tag) or tag == 'B-TIME' or tag == 'I-TIME'):
+                time_entities.append(word)
+            
+            # Lọc LOCATION entities
+            if tag and ('LOC' in str(tag) or tag == 'B-LOC' or tag == 'I-LOC'):
+                location_entities.append(word)
+        
+        return {
+            'time_entities': time_entities,
+            'location_entities': location_entities,
+            'all_entities': all_entities
+        }
+    
+    def extract_time_phrases(self, text, keyword_hits=None):
         """
         Trích xuất cụm từ thời gian bằng keyword matching
         (Backup method khi NER không hoạt động tốt)
         
         Args:
             text (str): Văn bản đầu vào
+            keyword_hits (dict): Kết quả KeywordAutomaton.find_all(text) nếu đã có
             
         Returns:
             list: Danh sách cụm từ thời gian
@@ -96,32 +168,41 @@ class NERExtractor:
         time_phrases = []
         
         # Pattern 1: Giờ cụ thể (10h, 10 giờ, 10:30)
-        patterns = [
-            r'\d{1,2}:\d{2}',  # 10:30, 14:00
-            r'\d{1,2}\s*giờ\s*\d{0,2}\s*phút?',  # 10 giờ 30 phút
-            r'\d{1,2}h\d{0,2}',  # 10h30
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, text)
-            time_phrases.extend(matches)
+        for regex in self._time_regexes:
+            time_phrases.extend(regex.findall(text))
         
-        # Pattern 2: Từ khóa thời gian
-        for keyword in self.time_keywords:
-            if keyword in text:
-                # Lấy ngữ cảnh xung quanh
-                match = re.search(rf'\S*\s*{keyword}\s*\S*', text)
-                if match:
-                    time_phrases.append(match.group())
+        # Pattern 2: Từ khóa thời gian + ngữ cảnh xung quanh (\S*\s*keyword\s*\S*)
+        if keyword_hits is None:
+            keyword_hits = self._keyword_automaton.find_all(text)
+        for keyword, starts in keyword_hits.items():
+            if keyword in self._time_keyword_set:
+                time_phrases.append(self._time_context(text, keyword, starts))
         
         return list(set(time_phrases))  # Loại trùng
     
-    def extract_location_phrases(self, text):
+    def _time_context(self, text, keyword, starts):
+        """
+        Match đầu tiên của \\S*\\s*keyword\\s*\\S* (cùng kết quả với re.search)
+        
+        Match bắt đầu từ đầu cụm "từ + khoảng trắng" đứng trước lần xuất hiện
+        đầu tiên; regex greedy chọn lần xuất hiện xa nhất còn nằm trong cụm đó.
+        """
+        # Điểm bắt đầu trái nhất sao cho text[begin:starts[0]] có dạng \\S*\\s*
+        begin = _WORD_SPACES_END.search(text, 0, starts[0]).start()
+        
+        limit = _SPACES.match(text, _WORD.match(text, begin).end()).end()
+        start = max(s for s in starts if s <= limit)
+        
+        end = _WORD.match(text, _SPACES.match(text, start + len(keyword)).end()).end()
+        return text[begin:end]
+    
+    def extract_location_phrases(self, text, keyword_hits=None):
         """
         Trích xuất cụm từ địa điểm bằng keyword matching
         
         Args:
             text (str): Văn bản đầu vào
+            keyword_hits (dict): Kết quả KeywordAutomaton.find_all(text) nếu đã có
             
         Returns:
             list: Danh sách cụm từ địa điểm
@@ -129,23 +210,20 @@ class NERExtractor:
         location_phrases = []
         
         # Pattern: "phòng 302", "tầng 5", "tòa A"
-        patterns = [
-            r'phòng\s+\w+',
-            r'tầng\s+\w+',
-            r'tòa\s+\w+',
-            r'văn phòng\s+\w+',
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, text)
-            location_phrases.extend(matches)
+        for regex in self._location_regexes:
+            location_phrases.extend(regex.findall(text))
         
-        # Từ khóa địa điểm
-        for keyword in self.location_keywords:
-            if keyword in text:
-                match = re.search(rf'{keyword}\s+\S+', text)
-                if match:
-                    location_phrases.append(match.group())
+        # Từ khóa địa điểm + từ tiếp theo (keyword\s+\S+)
+        if keyword_hits is None:
+            keyword_hits = self._keyword_automaton.find_all(text)
+        for keyword, starts in keyword_hits.items():
+            if keyword not in self._location_keyword_set:
+                continue
+            for start in starts:
+                word_start = _SPACES.match(text, start + len(keyword)).end()
+                if word_start > start + len(keyword) and word_start < len(text):
+                    location_phrases.append(text[start:_WORD.match(text, word_start).end()])
+                    break
         
         return list(set(location_phrases))
     
@@ -159,12 +237,27 @@ class NERExtractor:
         Returns:
             dict: Kết quả trích xuất TIME và LOCATION
         """
-        # Method 1: NER
-        ner_result = self.extract_with_ner(text)
+        return self._merge(text, self.extract_with_ner(text))
+    
+    def extract_batch(self, texts):
+        """
+        extract() cho nhiều câu, NER chạy theo lô (xem extract_with_ner_batch)
         
+        Args:
+            texts (list): Danh sách văn bản
+            
+        Returns:
+            list: Kết quả như extract(), đúng thứ tự đầu vào
+        """
+        ner_results = self.extract_with_ner_batch(texts)
+        return [self._merge(text, ner_result) for text, ner_result in zip(texts, ner_results)]
+    
+    def _merge(self, text, ner_result):
+        """Kết hợp kết quả NER với keyword matching"""
         # Method 2: Keyword matching (backup)
-        time_phrases = self.extract_time_phrases(text)
-        location_phrases = self.extract_location_phrases(text)
+        keyword_hits = self._keyword_automaton.find_all(text)
+        time_phrases = self.extract_time_phrases(text, keyword_hits)
+        location_phrases = self.extract_location_phrases(text, keyword_hits)
         
         # Merge results
         all_time = list(set(ner_result['time_entities'] + time_phrases))
@@ -174,4 +267,4 @@ class NERExtractor:
             'time': all_time,
             'location': all_location,
             'ner_result': ner_result['all_entities']
-        }
\ No newline at end of file
+        }
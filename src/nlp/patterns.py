@@ -1,3 +1,14 @@
+import sys
+import os
+
+try:
+    from ..utils.time_utils import WEEKDAY_NUMBERS, PERIOD_HOUR_RANGES, RELATIVE_DAY_OFFSETS
+except ImportError:
+    # Nếu chạy trực tiếp file này
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+    from src.utils.time_utils import WEEKDAY_NUMBERS, PERIOD_HOUR_RANGES, RELATIVE_DAY_OFFSETS
+
+
 TIME_PATTERNS = {
     # Giờ cụ thể: 10h, 10 giờ, 10:30, 14h30, 10g, 10g30
     'hour_minute': [
@@ -53,6 +64,33 @@ LOCATION_PATTERNS = {
     'venue': r'(khách sạn|hotel|cafe|cà phê|nhà hàng|quán|công ty|trường|trung tâm|center)\s+([^\s,]+(?:\s+[^\s,]+)*)',
 }
 
+# Pattern STRICT dùng khi trích xuất (chỉ match với số hoặc chữ cái đằng sau),
+# mỗi danh sách theo thứ tự ưu tiên
+STRICT_LOCATION_PATTERNS = {
+    'room': [
+        r'phòng\s+(\d+)',              # phòng 302, phòng 101
+        r'phòng\s+([A-Z]\d*)',         # phòng A, phòng B1
+        r'phòng\s+họp',                # phòng họp
+        r'p\.\s*(\d+)',                # p.302
+        r'\broom\s+(\d+)',             # room 302
+    ],
+    'floor': [
+        r'tầng\s+(\d+)',               # tầng 5
+        r'lầu\s+(\d+)',                # lầu 2
+        r'floor\s+(\d+)',              # floor 5
+    ],
+    'building': [
+        r'tòa\s+([A-Z]\d*)',           # tòa A, tòa B
+        r'toà\s+([A-Z]\d*)',           # toà A
+        r'tòa nhà\s+([A-Z]\d*)',       # tòa nhà A
+        r'building\s+([A-Z]\d*)',      # building A
+    ],
+    'office': [
+        r'văn\s*phòng\s+([A-Z]\d*)',   # văn phòng A
+        r'vp\s+([A-Z]\d*)',            # vp A
+    ],
+}
+
 # ============= EVENT PATTERNS (MỞ RỘNG) =============
 
 EVENT_PATTERNS = {
@@ -81,51 +119,12 @@ REMINDER_PATTERNS = {
 
 # ============= HELPER DICTIONARIES (MỞ RỘNG) =============
 
-WEEKDAY_MAP = {
-    'thứ hai': 0, 'thứ 2': 0, 't2': 0, 'thu 2': 0,
-    'thứ ba': 1, 'thứ 3': 1, 't3': 1, 'thu 3': 1,
-    'thứ tư': 2, 'thứ 4': 2, 't4': 2, 'thứ bốn': 2, 'thu 4': 2,
-    'thứ năm': 3, 'thứ 5': 3, 't5': 3, 'thu 5': 3,
-    'thứ sáu': 4, 'thứ 6': 4, 't6': 4, 'thu 6': 4,
-    'thứ bảy': 5, 'thứ 7': 5, 't7': 5, 'thu 7': 5,
-    'chủ nhật': 6, 'chủ nhật': 6, 'cn': 6, 'sunday': 6,
-}
+# Bảng tra cứu thời gian dùng chung với src/utils/time_utils (1 nguồn duy nhất)
+WEEKDAY_MAP = WEEKDAY_NUMBERS
 
-PERIOD_HOUR_MAP = {
-    'sáng': (6, 11),
-    'buổi sáng': (6, 11),
-    'sáng sớm': (6, 8),
-    'trưa': (11, 13),
-    'buổi trưa': (11, 13),
-    'chiều': (13, 18),
-    'buổi chiều': (13, 18),
-    'tối': (18, 22),
-    'buổi tối': (18, 22),
-    'tối muộn': (20, 23),
-    'đêm': (22, 6),
-    'nửa đêm': (0, 2),
-    'khuya': (22, 2),
-}
+PERIOD_HOUR_MAP = PERIOD_HOUR_RANGES
 
-RELATIVE_DAY_MAP = {
-    'hôm nay': 0,
-    'ngày hôm nay': 0,
-    'hôm qua': -1,
-    'hqua': -1,
-    'mai': 1,
-    'ngày mai': 1,
-    'mốt': 2,
-    'ngày mốt': 2,
-    'ngày kia': 2,
-    'tuần này': 0,
-    'tuần sau': 7,
-    'tuần tới': 7,
-    'tháng này': 0,
-    'tháng sau': 30,
-    'tháng tới': 30,
-    'năm sau': 365,
-    'năm tới': 365,
-}
+RELATIVE_DAY_MAP = RELATIVE_DAY_OFFSETS
 
 # ============= SPECIAL TIME PHRASES =============
 
@@ -1,11 +1,36 @@
-from underthesea import word_tokenize
 import re
+import sys
+import os
+import threading
+from collections import OrderedDict
+
+# underthesea được nạp lười qua model_loader (không chặn lúc import)
+try:
+    from . import model_loader
+except ImportError:
+    # Nếu chạy trực tiếp file này
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+    from src.nlp import model_loader
 
 
 class Preprocessor:
     """Xử lý và chuẩn hóa văn bản tiếng Việt đầu vào"""
     
-    def __init__(self):
+    # Ngữ cảnh áp dụng của mỗi bảng chuẩn hóa:
+    #   'after_number'  - đơn vị đứng sau số: "10h" -> "10 giờ", "15p" -> "15 phút"
+    #   'before_number' - tiền tố đứng trước số: "p.302" -> "phòng 302"
+    #   'word'          - từ đứng riêng: "t2" -> "thứ hai"
+    NORMALIZE_CONTEXTS = ('after_number', 'before_number', 'word')
+    
+    def __init__(self, token_cache_size=1024):
+        """
+        Args:
+            token_cache_size (int): Số kết quả tokenize được nhớ (theo văn bản đã chuẩn hóa)
+        """
+        self.token_cache_size = token_cache_size
+        self._token_cache = OrderedDict()  # normalized text -> tokens (LRU)
+        self._token_lock = threading.Lock()
+        
         # Từ điển chuẩn hóa các biến thể
         self.time_normalize = {
             'h': 'giờ',
@@ -35,9 +60,10 @@ class Preprocessor:
             'thu 7': 'thứ bảy',
         }
         
-        # Chuẩn hóa các từ viết tắt địa điểm
+        # Chuẩn hóa các từ viết tắt địa điểm (chỉ khi có số theo sau: "p302").
+        # Không có 'vp': "vp 5" -> "văn phòng 5" làm pattern phòng bắt nhầm
+        # "phòng 5"; "vp A" đã được pattern office nhận trực tiếp
         self.location_normalize = {
-            'vp': 'văn phòng',
             'p.': 'phòng',
             'p': 'phòng',
         }
@@ -47,6 +73,74 @@ class Preprocessor:
             'mtg': 'meeting',
             'meet': 'meeting',
         }
+        
+        # (ngữ cảnh, bảng) theo thứ tự ưu tiên; thêm bảng bằng add_normalize_table()
+        self.normalize_tables = [
+            ('after_number', self.time_normalize),
+            ('word', self.day_normalize),
+            ('before_number', self.location_normalize),
+            ('word', self.event_normalize),
+        ]
+        self.compile_normalizer()
+    
+    def add_normalize_table(self, context, table):
+        """
+        Thêm bảng chuẩn hóa (VD: từ file cấu hình)
+        
+        Args:
+            context (str): Một trong NORMALIZE_CONTEXTS
+            table (dict): {viết tắt: dạng đầy đủ}
+        """
+        if context not in self.NORMALIZE_CONTEXTS:
+            raise ValueError(f"Ngữ cảnh chuẩn hóa không hợp lệ: {context}")
+        self.normalize_tables.append((context, table))
+        self.compile_normalizer()
+    
+    def compile_normalizer(self):
+        """
+        Gộp tất cả bảng chuẩn hóa thành 1 regex (alternation) + dict tra cứu
+        
+        Gọi lại sau khi sửa trực tiếp các bảng. Khi cùng 1 từ xuất hiện ở
+        nhiều bảng cùng ngữ cảnh, bảng đứng trước được ưu tiên.
+        """
+        lookup = {context: {} for context in self.NORMALIZE_CONTEXTS}
+        for context, table in self.normalize_tables:
+            for abbr, full in table.items():
+                lookup[context].setdefault(abbr, full)
+        self._normalize_lookup = lookup
+        
+        def alternation(keys):
+            # Từ dài trước để "mins" không bị "min" match mất
+            return '|'.join(re.escape(key) for key in sorted(keys, key=len, reverse=True))
+        
+        # Đơn vị trùng với tiền tố trước số (VD: "p"): chỉ là đơn vị khi
+        # không có số theo sau ("15p" = 15 phút, "tầng 3 p 302" = phòng 302)
+        units = lookup['after_number']
+        ambiguous = [key for key in units if key in lookup['before_number']]
+        unit_parts = []
+        if len(ambiguous) < len(units):
+            unit_parts.append(rf'(?:{alternation(k for k in units if k not in ambiguous)})\b')
+        if ambiguous:
+            unit_parts.append(rf'(?:{alternation(ambiguous)})\b(?!\s*\d)')
+        
+        branches = []
+        if unit_parts:
+            branches.append(rf'\b(?P<number>\d+)\s*(?P<unit>{"|".join(unit_parts)})')
+        if lookup['before_number']:
+            branches.append(rf'\b(?P<prefix>{alternation(lookup["before_number"])})\s*(?=\d)')
+        if lookup['word']:
+            branches.append(rf'\b(?P<word>{alternation(lookup["word"])})\b')
+        
+        self._normalize_regex = re.compile('|'.join(branches)) if branches else None
+    
+    def _normalize_match(self, match):
+        """Callback của re.sub: tra dạng đầy đủ theo nhánh đã match"""
+        lookup = self._normalize_lookup
+        if match.group('unit') is not None:
+            return f"{match.group('number')} {lookup['after_number'][match.group('unit')]}"
+        if match.group('prefix') is not None:
+            return lookup['before_number'][match.group('prefix')] + ' '
+        return lookup['word'][match.group('word')]
     
     def clean_text(self, text):
         """
@@ -82,14 +176,9 @@ class Preprocessor:
         Returns:
             str: Văn bản đã chuẩn hóa
         """
-        # IMPORTANT: Bảo vệ "phòng" khỏi bị chuẩn hóa thành "p"
-        # Chuẩn hóa thời gian (CHỈ khi đứng riêng hoặc có số đằng sau)
-        text = re.sub(r'\b(\d+)\s*h\b', r'\1 giờ', text)  # 10h -> 10 giờ
-        text = re.sub(r'\b(\d+)\s*g\b', r'\1 giờ', text)  # 10g -> 10 giờ
-        
-        # Chuẩn hóa ngày trong tuần
-        for abbr, full in self.day_normalize.items():
-            text = re.sub(r'\b' + abbr + r'\b', full, text)
+        # Áp dụng mọi bảng chuẩn hóa trong 1 lần quét (xem compile_normalizer)
+        if self._normalize_regex is not None:
+            text = self._normalize_regex.sub(self._normalize_match, text)
         
         return text
     
@@ -103,26 +192,65 @@ class Preprocessor:
         Returns:
             list: Danh sách tokens
         """
+        return self._tokenize(text)[0]
+    
+    def _tokenize(self, text):
+        """
+        Returns:
+            tuple: (tokens, tokenized) - tokenized = False khi phải dùng text gốc
+        """
         try:
+            word_tokenize = model_loader.get_model('word_tokenize')
+            if word_tokenize is None:
+                # Model đang tải trong background
+                return text, False
             tokens = word_tokenize(text, format="text")
-            return tokens
+            return tokens, True
         except Exception as e:
             print(f"Lỗi tokenize: {e}")
-            return text  # Fallback: trả về text gốc
+            return text, False  # Fallback: trả về text gốc
     
-    def process(self, text):
+    def get_tokens(self, normalized):
+        """
+        Tokens của văn bản đã chuẩn hóa (có nhớ kết quả, LRU)
+        
+        Args:
+            normalized (str): Văn bản đã chuẩn hóa (preprocessed['normalized'])
+            
+        Returns:
+            Tokens như tokenize()
+        """
+        with self._token_lock:
+            if normalized in self._token_cache:
+                self._token_cache.move_to_end(normalized)
+                return self._token_cache[normalized]
+        
+        tokens, tokenized = self._tokenize(normalized)
+        if tokenized and self.token_cache_size:
+            # Không nhớ kết quả fallback (model chưa sẵn sàng)
+            with self._token_lock:
+                self._token_cache[normalized] = tokens
+                while len(self._token_cache) > self.token_cache_size:
+                    self._token_cache.popitem(last=False)
+        return tokens
+    
+    def process(self, text, tokenize=False):
         """
         Xử lý toàn bộ pipeline preprocessing
         
+        Các bước sau (rule, parser, validator) chỉ dùng 'normalized', nên mặc
+        định không tokenize; gọi get_tokens(result['normalized']) khi cần.
+        
         Args:
             text (str): Câu tiếng Việt tự nhiên
+            tokenize (bool): Tokenize luôn (kết quả có thêm key 'tokens')
             
         Returns:
             dict: {
                 'original': văn bản gốc,
                 'cleaned': văn bản đã làm sạch,
                 'normalized': văn bản đã chuẩn hóa,
-                'tokens': tokens đã phân đoạn
+                'tokens': tokens đã phân đoạn (chỉ khi tokenize=True)
             }
         """
         # Step 1: Làm sạch
@@ -131,12 +259,14 @@ class Preprocessor:
         # Step 2: Chuẩn hóa
         normalized = self.normalize_terms(cleaned)
         
-        # Step 3: Tokenize
-        tokens = self.tokenize(normalized)
-        
-        return {
+        result = {
             'original': text,
             'cleaned': cleaned,
-            'normalized': normalized,
-            'tokens': tokens
-        }
\ No newline at end of file
+            'normalized': normalized
+        }
+        
+        # Step 3: Tokenize (chỉ khi được yêu cầu)
+        if tokenize:
+            result['tokens'] = self.get_tokens(normalized)
+        
+        return result
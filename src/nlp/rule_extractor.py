@@ -6,15 +6,23 @@ import os
 try:
     from .patterns import (
         TIME_PATTERNS, LOCATION_PATTERNS, EVENT_PATTERNS,
-        REMINDER_PATTERNS, WEEKDAY_MAP, PERIOD_HOUR_MAP
+        REMINDER_PATTERNS, WEEKDAY_MAP, PERIOD_HOUR_MAP,
+        STRICT_LOCATION_PATTERNS
     )
+    from .matcher import PriorityMatcher
 except ImportError:
     # Nếu chạy trực tiếp file này
     sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
     from src.nlp.patterns import (
         TIME_PATTERNS, LOCATION_PATTERNS, EVENT_PATTERNS,
-        REMINDER_PATTERNS, WEEKDAY_MAP, PERIOD_HOUR_MAP
+        REMINDER_PATTERNS, WEEKDAY_MAP, PERIOD_HOUR_MAP,
+        STRICT_LOCATION_PATTERNS
     )
+    from src.nlp.matcher import PriorityMatcher
+
+
+# Các thành phần địa điểm, theo thứ tự ghép thành full_location
+LOCATION_KEYS = ['room', 'floor', 'building', 'office']
 
 
 class RuleExtractor:
@@ -25,6 +33,23 @@ class RuleExtractor:
         self.location_patterns = LOCATION_PATTERNS
         self.event_patterns = EVENT_PATTERNS
         self.reminder_patterns = REMINDER_PATTERNS
+        
+        # Compile 1 lần tất cả pattern dùng khi trích xuất
+        self._action_regex = re.compile(self.event_patterns['action_verb'], re.IGNORECASE)
+        self._object_regex = re.compile(self.event_patterns['object'], re.IGNORECASE)
+        
+        self._hour_minute_matcher = PriorityMatcher(self.time_patterns['hour_minute'])
+        self._period_regex = re.compile(self.time_patterns['period'])
+        self._relative_day_regex = re.compile(self.time_patterns['relative_day'])
+        self._weekday_regex = re.compile(self.time_patterns['weekday'])
+        self._date_regex = re.compile(self.time_patterns['date'])
+        
+        self._location_matchers = {
+            key: PriorityMatcher(STRICT_LOCATION_PATTERNS[key], re.IGNORECASE)
+            for key in LOCATION_KEYS
+        }
+        
+        self._remind_regex = re.compile(self.reminder_patterns['remind_before'])
     
     def extract_event(self, text):
         """
@@ -37,11 +62,8 @@ class RuleExtractor:
             str: Tên sự kiện
         """
         # Tìm động từ sự kiện
-        action_pattern = self.event_patterns['action_verb']
-        object_pattern = self.event_patterns['object']
-        
-        action_match = re.search(action_pattern, text, re.IGNORECASE)
-        object_match = re.search(object_pattern, text, re.IGNORECASE)
+        action_match = self._action_regex.search(text)
+        object_match = self._object_regex.search(text)
         
         # Strategy 1: Có cả action và object
         if action_match and object_match:
@@ -99,51 +121,46 @@ class RuleExtractor:
             'raw_matches': []
         }
         
-        # Extract hour:minute - TRY ALL PATTERNS
-        for pattern in self.time_patterns['hour_minute']:
-            match = re.search(pattern, text)
-            if match:
-                groups = match.groups()
-                result['raw_matches'].append(match.group())
-                
-                # Parse based on pattern
-                if len(groups) >= 1 and groups[0]:
-                    try:
-                        result['hour'] = int(groups[0])
-                    except (ValueError, TypeError):
-                        pass
-                
-                if len(groups) >= 2 and groups[1]:
-                    try:
-                        result['minute'] = int(groups[1])
-                    except (ValueError, TypeError):
-                        result['minute'] = 0
-                
-                # If found, break
-                if result['hour'] is not None:
-                    break
+        # Extract hour:minute - pattern ưu tiên cao nhất có match (1 lần quét)
+        hour_minute = self._hour_minute_matcher.search(text)
+        if hour_minute:
+            _, matched, groups = hour_minute
+            result['raw_matches'].append(matched)
+            
+            # Parse based on pattern
+            if len(groups) >= 1 and groups[0]:
+                try:
+                    result['hour'] = int(groups[0])
+                except (ValueError, TypeError):
+                    pass
+            
+            if len(groups) >= 2 and groups[1]:
+                try:
+                    result['minute'] = int(groups[1])
+                except (ValueError, TypeError):
+                    result['minute'] = 0
         
         # Special case: "giờ rưỡi" -> :30
         if 'rưỡi' in text and result['hour'] is not None:
             result['minute'] = 30
         
         # Extract period (sáng/chiều/tối)
-        period_match = re.search(self.time_patterns['period'], text)
+        period_match = self._period_regex.search(text)
         if period_match:
             result['period'] = period_match.group()
         
         # Extract relative day
-        relative_match = re.search(self.time_patterns['relative_day'], text)
+        relative_match = self._relative_day_regex.search(text)
         if relative_match:
             result['relative_day'] = relative_match.group()
         
         # Extract weekday
-        weekday_match = re.search(self.time_patterns['weekday'], text)
+        weekday_match = self._weekday_regex.search(text)
         if weekday_match:
             result['weekday'] = weekday_match.group()
         
         # Extract date
-        date_match = re.search(self.time_patterns['date'], text)
+        date_match = self._date_regex.search(text)
         if date_match:
             result['date'] = date_match.group()
         
@@ -171,63 +188,16 @@ class RuleExtractor:
             'raw_matches': []
         }
         
-        # Extract room - STRICT PATTERNS (chỉ match với số hoặc chữ cái đằng sau)
-        room_patterns = [
-            r'phòng\s+(\d+)',              # phòng 302, phòng 101
-            r'phòng\s+([A-Z]\d*)',         # phòng A, phòng B1
-            r'phòng\s+họp',                # phòng họp
-            r'p\.\s*(\d+)',                # p.302
-            r'\broom\s+(\d+)',             # room 302
-        ]
-        for pattern in room_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                result['room'] = match.group()
-                result['raw_matches'].append(match.group())
-                break
-        
-        # Extract floor - STRICT
-        floor_patterns = [
-            r'tầng\s+(\d+)',               # tầng 5
-            r'lầu\s+(\d+)',                # lầu 2
-            r'floor\s+(\d+)',              # floor 5
-        ]
-        for pattern in floor_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                result['floor'] = match.group()
-                result['raw_matches'].append(match.group())
-                break
-        
-        # Extract building - STRICT
-        building_patterns = [
-            r'tòa\s+([A-Z]\d*)',           # tòa A, tòa B
-            r'toà\s+([A-Z]\d*)',           # toà A
-            r'tòa nhà\s+([A-Z]\d*)',       # tòa nhà A
-            r'building\s+([A-Z]\d*)',      # building A
-        ]
-        for pattern in building_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                result['building'] = match.group()
-                result['raw_matches'].append(match.group())
-                break
-        
-        # Extract office - STRICT
-        office_patterns = [
-            r'văn\s*phòng\s+([A-Z]\d*)',   # văn phòng A
-            r'vp\s+([A-Z]\d*)',            # vp A
-        ]
-        for pattern in office_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                result['office'] = match.group()
-                result['raw_matches'].append(match.group())
-                break
+        # Mỗi thành phần: pattern STRICT ưu tiên cao nhất có match
+        for key in LOCATION_KEYS:
+            found = self._location_matchers[key].search(text)
+            if found:
+                result[key] = found[1]
+                result['raw_matches'].append(found[1])
         
         # Combine full location
         location_parts = []
-        for key in ['room', 'floor', 'building', 'office']:
+        for key in LOCATION_KEYS:
             if result[key]:
                 location_parts.append(result[key])
         
@@ -242,7 +212,7 @@ class RuleExtractor:
         Returns:
             int: Số phút nhắc trước (mặc định 15)
         """
-        remind_match = re.search(self.reminder_patterns['remind_before'], text)
+        remind_match = self._remind_regex.search(text)
         
         if remind_match:
             groups = remind_match.groups()
@@ -1,7 +1,17 @@
+import heapq
+import itertools
+import os
+import sys
 import threading
-import time
+from collections import deque
 from datetime import datetime, timedelta
 
+try:
+    from ..core.schedule import Schedule
+except ImportError:
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+    from src.core.schedule import Schedule
+
 # Safe import plyer
 HAS_PLYER = False
 try:
@@ -14,14 +24,38 @@ except Exception as e:
 
 
 class ReminderService:
-    """Service để hiển thị pop-up nhắc nhở"""
+    """
+    Service để hiển thị pop-up nhắc nhở
     
-    def __init__(self, storage, notification_callback=None):
+    Các thời điểm nhắc được giữ trong heap; thread chỉ ngủ đến thời điểm nhắc
+    gần nhất. Nếu storage có changefeed (subscribe), các thay đổi được áp dụng
+    dần vào heap; ngược lại chỉ đọc lại storage khi gọi refresh().
+    """
+    
+    def __init__(self, storage, notification_callback=None, late_tolerance=60, max_sleep=60):
+        """
+        Args:
+            storage: Storage có load_records() hoặc load_all()
+            notification_callback (callable): Hàm hiển thị (title, message) trên GUI
+            late_tolerance (float): Vẫn nhắc nếu trễ không quá số giây này
+                (VD: máy vừa thức dậy từ sleep)
+            max_sleep (float): Thời gian ngủ tối đa mỗi lần, để bắt kịp khi
+                đồng hồ hệ thống thay đổi (không đọc lại storage)
+        """
         self.storage = storage
         self.running = False
         self.thread = None
         self.notified = set()  # Track đã nhắc nhở
         self.notification_callback = notification_callback
+        self.late_tolerance = late_tolerance
+        self.max_sleep = max_sleep
+        
+        self._heap = []  # (thời điểm nhắc, seq, id, Schedule)
+        self._active = {}  # id -> seq của entry hiện hành (entry heap khác là cũ)
+        self._seq = itertools.count()  # Phá hòa khi trùng thời điểm, không so sánh Schedule
+        self._pending = deque()  # Thay đổi từ storage chưa áp dụng
+        self._dirty = True  # Cần đọc lại storage
+        self._wakeup = threading.Event()
 
     def start(self):
         """Bắt đầu service"""
@@ -29,6 +63,10 @@ class ReminderService:
             return
         
         self.running = True
+        self._dirty = True
+        self._wakeup.clear()
+        if hasattr(self.storage, 'subscribe'):
+            self.storage.subscribe(self._on_storage_change)
         self.thread = threading.Thread(target=self._check_reminders, daemon=True)
         self.thread.start()
         print("✅ Reminder service started")
@@ -36,61 +74,134 @@ class ReminderService:
     def stop(self):
         """Dừng service"""
         self.running = False
+        if hasattr(self.storage, 'unsubscribe'):
+            self.storage.unsubscribe(self._on_storage_change)
+        self._wakeup.set()
         print("⏹️ Reminder service stopped")
     
+    def refresh(self):
+        """Báo storage đã thay đổi: xây lại heap và tính lại thời điểm ngủ"""
+        self._dirty = True
+        self._wakeup.set()
+    
+    def _on_storage_change(self, change):
+        """Nhận thay đổi từ storage (chạy trên thread thay đổi storage)"""
+        if change['type'] == 'reset':
+            self.refresh()
+            return
+        self._pending.append(change)
+        self._wakeup.set()
+    
+    def _reminder_time(self, schedule):
+        """
+        Tính thời điểm nhắc (naive, giờ máy) của một schedule
+        
+        Args:
+            schedule (Schedule): start_time đã parse sẵn (start_epoch được cache)
+        
+        Returns:
+            datetime hoặc None nếu không hợp lệ
+        """
+        start_time = schedule.start_datetime
+        if start_time is None:
+            return None
+        
+        reminder_minutes = schedule.get('reminder_minutes', 15)
+        return start_time - timedelta(minutes=reminder_minutes)
+    
+    def _push(self, schedule, current_time):
+        """Thêm (hoặc thay thế) lần nhắc của một schedule vào heap"""
+        schedule = Schedule.coerce(schedule)
+        schedule_id = schedule.get('id')
+        if not schedule_id or schedule_id in self.notified:
+            return
+        
+        try:
+            reminder_time = self._reminder_time(schedule)
+        except Exception as e:
+            print(f"⚠️ Lỗi xử lý schedule {schedule_id}: {e}")
+            return
+        if reminder_time is None:
+            return
+        
+        # Bỏ qua các lần nhắc đã quá hạn từ lâu
+        if (current_time - reminder_time).total_seconds() > self.late_tolerance:
+            return
+        
+        seq = next(self._seq)
+        heapq.heappush(self._heap, (reminder_time, seq, schedule_id, schedule))
+        self._active[schedule_id] = seq
+    
+    def _rebuild_heap(self):
+        """Đọc lại storage và xây heap các lần nhắc chưa đến hạn"""
+        # Thay đổi đến trước load_records() đã nằm trong dữ liệu đọc được
+        self._pending.clear()
+        load = getattr(self.storage, 'load_records', self.storage.load_all)
+        schedules = load()
+        current_time = datetime.now()
+        self._heap = []
+        self._active = {}
+        
+        for schedule in schedules:
+            self._push(schedule, current_time)
+    
+    def _apply_pending(self):
+        """Áp dụng các thay đổi nhỏ từ changefeed vào heap"""
+        current_time = datetime.now()
+        while self._pending:
+            change = self._pending.popleft()
+            if change['type'] == 'deleted':
+                # Entry trong heap thành cũ, bị bỏ qua khi pop
+                self._active.pop(change['id'], None)
+            elif change['schedule'] is not None:
+                self._active.pop(change['id'], None)
+                self._push(change['schedule'], current_time)
+    
+    def _fire_due(self, current_time):
+        """Nhắc tất cả các lần đã đến hạn (bỏ qua entry cũ đã xóa/cập nhật)"""
+        while self._heap and self._heap[0][0] <= current_time:
+            reminder_time, seq, schedule_id, schedule = heapq.heappop(self._heap)
+            if self._active.get(schedule_id) != seq:
+                continue  # Entry cũ (đã xóa/cập nhật)
+            del self._active[schedule_id]
+            if schedule_id in self.notified:
+                continue
+            
+            lateness = (current_time - reminder_time).total_seconds()
+            if lateness <= self.late_tolerance:
+                self._show_notification(schedule)
+            self.notified.add(schedule_id)
+    
     def _check_reminders(self):
         """Kiểm tra và hiển thị nhắc nhở"""
-        print("🔔 Reminder service is checking every 60 seconds...")
+        print("🔔 Reminder service is waiting for the next reminder...")
         
         while self.running:
+            timeout = self.max_sleep
             try:
-                schedules = self.storage.load_all()
+                if self._dirty:
+                    self._dirty = False
+                    self._rebuild_heap()
+                self._apply_pending()
+                
                 current_time = datetime.now()
+                self._fire_due(current_time)
                 
-                for schedule in schedules:
-                    schedule_id = schedule.get('id')
-                    start_time_str = schedule.get('start_time')
-                    
-                    if not start_time_str or not schedule_id:
-                        continue
-                    
-                    # Skip if already notified
-                    if schedule_id in self.notified:
-                        continue
-                    
-                    try:
-                        # Parse start time
-                        start_time = datetime.fromisoformat(start_time_str.replace('Z', '+00:00'))
-                        
-                        # Make timezone-naive for comparison
-                        if start_time.tzinfo is not None:
-                            start_time = start_time.replace(tzinfo=None)
-                        
-                        reminder_minutes = schedule.get('reminder_minutes', 15)
-                        
-                        # Tính thời gian nhắc nhở
-                        reminder_time = start_time - timedelta(minutes=reminder_minutes)
-                        time_diff = (reminder_time - current_time).total_seconds()
-                        
-                        # Nhắc nhở khi đến giờ (trong khoảng 60 giây)
-                        if -60 <= time_diff <= 60:
-                            self._show_notification(schedule)
-                            self.notified.add(schedule_id)
-                            print(f"🔔 Notified: {schedule['event']}")
-                    
-                    except Exception as e:
-                        print(f"⚠️ Lỗi xử lý schedule {schedule_id}: {e}")
+                # Ngủ đến lần nhắc kế tiếp
+                if self._heap:
+                    until_next = (self._heap[0][0] - current_time).total_seconds()
+                    timeout = min(max(until_next, 0), self.max_sleep)
             
             except Exception as e:
                 print(f"⚠️ Lỗi reminder loop: {e}")
             
-            # Check mỗi 60 giây
-            time.sleep(60)
+            self._wakeup.wait(timeout)
+            self._wakeup.clear()
     
     def _show_notification(self, schedule):
         """Hiển thị pop-up"""
         title = f"⏰ Nhắc nhở: {schedule['event']}"
-        message = f"Thời gian: {self.format_time(schedule['start_time'])}\n"
+        message = f"Thời gian: {schedule.format_start_time()}\n"
         
         if schedule.get('location'):
             message += f"Địa điểm: {schedule['location']}"
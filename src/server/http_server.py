@@ -0,0 +1,416 @@
+"""
+Server HTTP/JSON cục bộ cho pipeline trích xuất lịch trình
+
+Giữ 1 PersonalScheduleAssistant đã nạp model suốt vòng đời process, nên các
+công cụ khác gọi parser qua HTTP mà không phải chờ tải underthesea mỗi lần.
+
+Endpoint:
+    GET    /health                  Trạng thái server/model
+    POST   /parse                   {"text": "..."} -> kết quả process()
+    POST   /parse_batch             {"texts": ["...", ...]} -> {"results": [...]}
+    GET    /schedules[?q=từ khóa]   Danh sách (hoặc tìm kiếm) schedule
+    POST   /schedules               {"text": "..."} (phân tích rồi lưu) hoặc 1 schedule object
+    GET    /schedules/<id>
+    PUT    /schedules/<id>          Schedule object
+    DELETE /schedules/<id>
+
+Thêm ?debug=1 vào /parse, /parse_batch để nhận cả debug_info.
+
+Chạy:
+    python main.py --server
+    python -m src.server.http_server --port 8765 --workers 8
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# Fix import path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.nlp import model_loader
+from src.storage.search_index import SearchIndex
+from src.storage.streaming import validate_record
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 8
+
+# Kết nối chờ worker tối đa (mỗi worker); vượt quá thì trả 503 ngay
+MAX_PENDING_PER_WORKER = 4
+
+# Kết nối keep-alive không có request mới trong khoảng này (giây) thì đóng, trả worker
+KEEP_ALIVE_TIMEOUT = 15
+
+MAX_BODY_BYTES = 10 * 1024 * 1024
+MAX_BATCH_SIZE = 1000
+
+
+class ApiError(Exception):
+    """Lỗi trả về cho client với HTTP status tương ứng"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class ScheduleAPI:
+    """
+    Xử lý các endpoint (không phụ thuộc HTTP)
+
+    Pipeline được gọi tuần tự qua 1 lock: model underthesea không đảm bảo an
+    toàn khi gọi song song, và phần NLP chạy bằng Python nên có chạy song song
+    cũng không nhanh hơn (GIL). Các thao tác storage, đọc/ghi socket và kết nối
+    keep-alive vẫn được phục vụ đồng thời trên worker pool.
+
+    ?q= tìm qua SearchIndex (không phân biệt dấu: "hop" tìm được "họp"), giữ
+    đồng bộ với storage qua changefeed.
+    """
+
+    def __init__(self, assistant, storage):
+        self.assistant = assistant
+        self.storage = storage
+        self._pipeline_lock = threading.Lock()
+        self.started_at = time.time()
+
+        self.search_index = SearchIndex()
+        if hasattr(storage, 'subscribe'):
+            storage.subscribe(self._on_storage_change)
+        self.search_index.rebuild(storage.load_all())
+
+    def _on_storage_change(self, change):
+        """Cập nhật index theo thay đổi của storage"""
+        if change['type'] == 'reset':
+            self.search_index.rebuild(self.storage.load_all())
+        elif change['type'] == 'deleted':
+            self.search_index.remove(change['id'])
+        elif change['schedule'] is not None:
+            self.search_index.put(change['schedule'])
+
+    # ===== PARSE =====
+
+    @staticmethod
+    def _public_result(result, debug=False):
+        if debug:
+            return result
+        return {key: value for key, value in result.items() if key != 'debug_info'}
+
+    def parse(self, body, query):
+        text = body.get('text') if isinstance(body, dict) else None
+        if not isinstance(text, str) or not text.strip():
+            raise ApiError(400, "Cần 'text' (chuỗi khác rỗng)")
+
+        with self._pipeline_lock:
+            result = self.assistant.process(text.strip())
+        return 200, self._public_result(result, _flag(query, 'debug'))
+
+    def parse_batch(self, body, query):
+        texts = body.get('texts') if isinstance(body, dict) else None
+        if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+            raise ApiError(400, "Cần 'texts' (danh sách chuỗi)")
+        if len(texts) > MAX_BATCH_SIZE:
+            raise ApiError(413, f"Tối đa {MAX_BATCH_SIZE} câu mỗi lần")
+
+        with self._pipeline_lock:
+            results = self.assistant.process_batch([t.strip() for t in texts])
+        debug = _flag(query, 'debug')
+        return 200, {'results': [self._public_result(r, debug) for r in results]}
+
+    # ===== SCHEDULE CRUD =====
+
+    def list_schedules(self, body, query):
+        keyword = query.get('q', [''])[0].strip()
+        if not keyword:
+            return 200, self.storage.load_all()
+        schedules = (self.storage.get(key) for key in self.search_index.search(keyword))
+        return 200, [schedule for schedule in schedules if schedule is not None]
+
+    def get_schedule(self, schedule_id):
+        schedule = self.storage.get(schedule_id)
+        if schedule is None:
+            raise ApiError(404, f"Không có lịch trình id={schedule_id}")
+        return 200, schedule
+
+    def create_schedule(self, body, query):
+        if isinstance(body, dict) and 'text' in body:
+            # Câu tự nhiên: phân tích rồi lưu (giống thêm trên GUI)
+            _, result = self.parse(body, query)
+            if not result['success']:
+                return 422, result
+            schedule = result['schedule']
+            if body.get('reminder_minutes') is not None:
+                schedule['reminder_minutes'] = body['reminder_minutes']
+            _check_schedule(schedule)
+            self.storage.save(schedule)
+            return 201, result
+
+        _check_schedule(body)
+        schedule = {key: value for key, value in body.items()
+                    if key not in ('id', 'created_at', 'updated_at')}
+        self.storage.save(schedule)
+        return 201, schedule
+
+    def update_schedule(self, schedule_id, body):
+        _check_schedule(body)
+        current = self.storage.get(schedule_id)
+        if current is None:
+            raise ApiError(404, f"Không có lịch trình id={schedule_id}")
+
+        schedule = dict(body)
+        if current.get('created_at') is not None:
+            schedule['created_at'] = current['created_at']
+        self.storage.update(schedule_id, schedule)
+        return 200, schedule
+
+    def delete_schedule(self, schedule_id):
+        if self.storage.get(schedule_id) is None:
+            raise ApiError(404, f"Không có lịch trình id={schedule_id}")
+        self.storage.delete(schedule_id)
+        return 200, {'deleted': str(schedule_id)}
+
+    # ===== KHÁC =====
+
+    def health(self, body, query):
+        return 200, {
+            'status': 'ok',
+            'models_ready': model_loader.is_ready(),
+            'uptime_s': round(time.time() - self.started_at, 3),
+            'cache': self.assistant.cache_stats(),
+        }
+
+    def dispatch(self, method, path, query, body):
+        """
+        Chọn endpoint theo method + path
+
+        Returns:
+            tuple: (HTTP status, payload JSON-serializable)
+        """
+        routes = {
+            ('GET', '/health'): self.health,
+            ('POST', '/parse'): self.parse,
+            ('POST', '/parse_batch'): self.parse_batch,
+            ('GET', '/schedules'): self.list_schedules,
+            ('POST', '/schedules'): self.create_schedule,
+        }
+        path = path.rstrip('/') or '/'
+        handler = routes.get((method, path))
+        if handler is not None:
+            return handler(body, query)
+
+        if path.startswith('/schedules/'):
+            schedule_id = path[len('/schedules/'):]
+            if '/' not in schedule_id:
+                if method == 'GET':
+                    return self.get_schedule(schedule_id)
+                if method == 'PUT':
+                    return self.update_schedule(schedule_id, body)
+                if method == 'DELETE':
+                    return self.delete_schedule(schedule_id)
+                raise ApiError(405, f"Không hỗ trợ {method} {path}")
+
+        if any(route_path == path for _, route_path in routes):
+            raise ApiError(405, f"Không hỗ trợ {method} {path}")
+        raise ApiError(404, f"Không có endpoint {path}")
+
+
+def _flag(query, name):
+    return query.get(name, ['0'])[0].lower() in ('1', 'true', 'yes')
+
+
+def _check_schedule(schedule):
+    error = validate_record(schedule)
+    if error:
+        raise ApiError(400, error)
+    if not isinstance(schedule.get('event'), str) or not schedule['event'].strip():
+        raise ApiError(400, "Cần 'event' (chuỗi khác rỗng)")
+    if not schedule.get('start_time'):
+        raise ApiError(400, "Cần 'start_time' (thời gian ISO)")
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """Nhận request HTTP/1.1 (keep-alive), chuyển cho ScheduleAPI, trả JSON"""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'ScheduleAssistant/1.0'
+    timeout = KEEP_ALIVE_TIMEOUT
+    # Header và body được ghi 2 lần: tắt Nagle để keep-alive không bị trễ ~40ms (delayed ACK)
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_PUT(self):
+        self._handle('PUT')
+
+    def do_DELETE(self):
+        self._handle('DELETE')
+
+    def _handle(self, method):
+        url = urlsplit(self.path)
+        try:
+            body = self._read_body() if method in ('POST', 'PUT') else None
+            status, payload = self.server.api.dispatch(
+                method, url.path, parse_qs(url.query), body
+            )
+        except ApiError as e:
+            status, payload = e.status, {'error': e.message}
+        except Exception as e:
+            status, payload = 500, {'error': f"Lỗi server: {e}"}
+            self.log_error("%s %s: %r", method, url.path, e)
+        self._send_json(status, payload)
+
+    def _read_body(self):
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            raise ApiError(400, "Content-Length không hợp lệ")
+        if length > MAX_BODY_BYTES:
+            # Không đọc hết body thì không dùng lại kết nối được
+            self.close_connection = True
+            raise ApiError(413, f"Body tối đa {MAX_BODY_BYTES} byte")
+        if length <= 0:
+            raise ApiError(400, "Cần body JSON")
+        try:
+            return json.loads(self.rfile.read(length).decode('utf-8'))
+        except ValueError as e:
+            raise ApiError(400, f"JSON không hợp lệ: {e}")
+
+    def _send_json(self, status, payload):
+        data = json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+class PooledHTTPServer(HTTPServer):
+    """
+    HTTPServer phục vụ mỗi kết nối trên 1 worker của thread pool cố định
+
+    Khác ThreadingHTTPServer (1 thread/kết nối, không giới hạn): tối đa
+    `workers` kết nối được xử lý cùng lúc, số kết nối chờ bị giới hạn, vượt
+    quá thì trả 503 thay vì tạo thêm thread.
+    """
+
+    allow_reuse_address = True
+
+    def __init__(self, address, api, workers=DEFAULT_WORKERS, quiet=False):
+        super().__init__(address, RequestHandler)
+        self.api = api
+        self.quiet = quiet
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='http-worker')
+        self._slots = threading.BoundedSemaphore(workers * (1 + MAX_PENDING_PER_WORKER))
+
+    def process_request(self, request, client_address):
+        if not self._slots.acquire(blocking=False):
+            self._reject(request)
+            return
+        self.executor.submit(self._process_request_worker, request, client_address)
+
+    def _process_request_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+
+    def _reject(self, request):
+        body = json.dumps({'error': "Server đang quá tải, thử lại sau"}).encode('utf-8')
+        try:
+            request.sendall(
+                b"HTTP/1.1 503 Service Unavailable\r\n"
+                b"Content-Type: application/json; charset=utf-8\r\n"
+                b"Retry-After: 1\r\nConnection: close\r\n"
+                b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body
+            )
+        except OSError:
+            pass
+        self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=True)
+
+
+def create_server(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=DEFAULT_WORKERS,
+                  assistant=None, storage=None, quiet=False):
+    """
+    Tạo server (chưa chạy); nạp model trước để request đầu tiên cũng nhanh
+
+    Args:
+        assistant (PersonalScheduleAssistant): None = tạo mới
+        storage: None = JournalStorage mặc định (file dữ liệu của GUI; bị khóa
+            nên không chạy cùng lúc với GUI được)
+
+    Returns:
+        PooledHTTPServer: Gọi serve_forever() để chạy
+
+    Raises:
+        StorageLockedError: Dữ liệu đang được GUI/process khác mở
+    """
+    if storage is None:
+        # Mở storage trước khi nạp model: đang bị khóa thì báo lỗi ngay
+        from src.storage.journal_storage import JournalStorage
+        storage = JournalStorage()
+    if assistant is None:
+        from src.core.scheduler import PersonalScheduleAssistant
+        assistant = PersonalScheduleAssistant()
+
+    model_loader.load_models()
+    return PooledHTTPServer((host, port), ScheduleAPI(assistant, storage), workers, quiet)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Server HTTP/JSON cho trợ lý lịch trình")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help="Số kết nối xử lý đồng thời")
+    parser.add_argument('--quiet', action='store_true', help="Không log từng request")
+    parser.add_argument('--store', help="File dữ liệu (mặc định: dữ liệu của GUI)")
+    args = parser.parse_args(argv)
+
+    from src.storage.journal_storage import JournalStorage, StorageLockedError
+    try:
+        storage = JournalStorage(args.store)
+    except StorageLockedError as e:
+        print(f"❌ {e}. Hãy đóng ứng dụng đang mở hoặc dùng --store khác.")
+        return 1
+
+    try:
+        server = create_server(args.host, args.port, args.workers, storage=storage, quiet=args.quiet)
+    except BaseException:
+        storage.close()
+        raise
+    print(f"✅ Server đang chạy: http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⏹️ Đang dừng server...")
+    finally:
+        server.server_close()
+        # Gộp journal vào file schedules.json
+        server.api.storage.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
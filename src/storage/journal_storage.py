@@ -0,0 +1,444 @@
+import json
+import os
+import sys
+import threading
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+try:
+    from .json_storage import JSONStorage, CHANGE_INSERTED, CHANGE_UPDATED, CHANGE_DELETED
+    from ..core.schedule import Schedule
+    from .streaming import BATCH_SIZE, RecordReader, write_json_array
+except ImportError:
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+    from src.storage.json_storage import JSONStorage, CHANGE_INSERTED, CHANGE_UPDATED, CHANGE_DELETED
+    from src.core.schedule import Schedule
+    from src.storage.streaming import BATCH_SIZE, RecordReader, write_json_array
+
+
+class StorageLockedError(RuntimeError):
+    """Dữ liệu đang được 1 process khác (GUI, server, ingest) mở để ghi"""
+
+
+class JournalStorage(JSONStorage):
+    """
+    Lưu trữ schedule dạng snapshot JSON + journal ghi nối (append-only)
+
+    Cùng interface với JSONStorage, nhưng:
+    - Toàn bộ schedule nằm trong bộ nhớ dạng Schedule (__slots__), đánh index
+      theo id; load_all() vẫn trả về dict như JSONStorage
+    - save/update/delete chỉ ghi nối 1 dòng vào journal (O(1))
+    - Snapshot (schedules.json, cùng định dạng cũ) được ghi lại bằng file tạm
+      + os.replace, chạy ở background khi journal đủ dài (compaction)
+    - Khi mở lại, snapshot + journal được replay; dòng journal ghi dở do
+      crash bị bỏ qua
+    - id cấp tăng dần, không dùng lại kể cả khi id lớn nhất đã bị xóa và
+      compaction: id lớn nhất được ghi vào đầu journal mới (op 'seq')
+    - Mỗi file dữ liệu chỉ 1 process được mở (khóa file .lock), process thứ
+      hai bị từ chối ngay bằng StorageLockedError thay vì ghi đè lẫn nhau
+    """
+
+    def __init__(self, file_path=None, compact_threshold=500, fsync=True):
+        """
+        Args:
+            file_path (str): Đường dẫn snapshot (None = thư mục data mặc định)
+            compact_threshold (int): Số dòng journal để kích hoạt compaction
+            fsync (bool): fsync sau mỗi lần ghi journal (an toàn khi mất điện)
+
+        Raises:
+            StorageLockedError: File đang được process khác mở
+        """
+        if file_path is None:
+            # Dùng đường dẫn mặc định giống JSONStorage
+            self.ensure_file_exists()
+        else:
+            self.file_path = file_path
+            self._ensure_snapshot()
+
+        self._lock_file = None
+        self._acquire_file_lock()
+
+        self.journal_path = self.file_path + '.journal'
+        self.compact_threshold = compact_threshold
+        self.fsync = fsync
+
+        self._lock = threading.RLock()
+        self._compact_lock = threading.Lock()
+        self._compact_thread = None
+
+        self._records = {}  # id -> Schedule (giữ thứ tự chèn)
+        self._max_id = 0
+        self._journal_ops = 0
+        self._journal = None
+
+        self._init_changefeed()
+        self._recover()
+
+    # ===== KHỞI TẠO / PHỤC HỒI =====
+
+    def _ensure_snapshot(self):
+        """Đảm bảo file snapshot tồn tại"""
+        directory = os.path.dirname(self.file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if not os.path.exists(self.file_path):
+            with open(self.file_path, 'w', encoding='utf-8') as f:
+                json.dump([], f, ensure_ascii=False, indent=2)
+
+    def _acquire_file_lock(self):
+        """Khóa độc quyền file .lock cạnh snapshot (không chờ nếu đã bị khóa)"""
+        lock_path = self.file_path + '.lock'
+        lock_file = open(lock_path, 'a+b')
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            lock_file.close()
+            raise StorageLockedError(
+                f"Dữ liệu đang được ứng dụng khác sử dụng ({lock_path})"
+            ) from None
+        self._lock_file = lock_file
+
+    def _release_file_lock(self):
+        if self._lock_file is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._lock_file.seek(0)
+                msvcrt.locking(self._lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        except OSError:
+            pass
+        self._lock_file.close()
+        self._lock_file = None
+
+    def _recover(self):
+        """Nạp snapshot rồi replay journal (kể cả journal đang compaction dở)"""
+        try:
+            for _, schedule, _ in RecordReader(self.file_path):
+                self._apply_put(schedule)
+        except Exception as e:
+            print(f"Lỗi load: {e}")
+
+        compacting_path = self.journal_path + '.compacting'
+        if os.path.exists(compacting_path):
+            self._replay(compacting_path)
+        self._journal_ops = self._replay(self.journal_path)
+
+        self._journal = open(self.journal_path, 'a', encoding='utf-8')
+
+    def _replay(self, path):
+        """
+        Áp dụng các thao tác trong journal
+
+        Returns:
+            int: Số thao tác hợp lệ đã áp dụng
+        """
+        if not os.path.exists(path):
+            return 0
+
+        applied = 0
+        good_offset = 0
+        with open(path, 'rb') as f:
+            for raw_line in f:
+                try:
+                    entry = json.loads(raw_line.decode('utf-8'))
+                    if not raw_line.endswith(b'\n'):
+                        raise ValueError("Dòng journal chưa ghi xong")
+                except ValueError:
+                    # Dòng cuối ghi dở do crash: cắt bỏ từ đây
+                    break
+                self._apply_entry(entry)
+                good_offset += len(raw_line)
+                applied += 1
+
+        if good_offset != os.path.getsize(path):
+            with open(path, 'r+b') as f:
+                f.truncate(good_offset)
+
+        return applied
+
+    def _apply_entry(self, entry):
+        if entry.get('op') == 'put':
+            self._apply_put(entry['schedule'])
+        elif entry.get('op') == 'delete':
+            self._records.pop(str(entry.get('id')), None)
+        elif entry.get('op') == 'seq':
+            self._max_id = max(self._max_id, int(entry.get('max_id', 0)))
+
+    def _apply_put(self, schedule):
+        schedule = Schedule.coerce(schedule)
+        if schedule.get('id') is None:
+            # Bản ghi không có id (VD: file import tay): giữ nguyên, khóa nội bộ
+            self._records[f"\0{len(self._records)}"] = schedule
+            return
+
+        schedule_id = str(schedule['id'])
+        self._records[schedule_id] = schedule
+        try:
+            self._max_id = max(self._max_id, int(schedule_id))
+        except ValueError:
+            pass
+
+    # ===== GHI JOURNAL / COMPACTION =====
+
+    def _append(self, entry):
+        """Ghi nối 1 thao tác vào journal (gọi khi đang giữ self._lock)"""
+        self._append_many([entry])
+
+    def _append_many(self, entries):
+        """Ghi nối nhiều thao tác với 1 lần write + fsync (gọi khi đang giữ self._lock)"""
+        self._journal.write(''.join(json.dumps(entry, ensure_ascii=False) + '\n' for entry in entries))
+        self._journal.flush()
+        if self.fsync:
+            os.fsync(self._journal.fileno())
+
+        self._journal_ops += len(entries)
+        if self._journal_ops >= self.compact_threshold:
+            self._start_compaction()
+
+    def _write_snapshot(self, data, batch_size=BATCH_SIZE):
+        """
+        Ghi snapshot an toàn: file tạm + fsync + os.replace
+
+        data có thể là iterable (ghi dần theo batch); lỗi giữa chừng thì
+        snapshot cũ giữ nguyên.
+        """
+        tmp_path = self.file_path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                write_json_array(f, data, batch_size)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.file_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _start_compaction(self):
+        if self._compact_thread is not None and self._compact_thread.is_alive():
+            return
+        self._compact_thread = threading.Thread(target=self.compact, daemon=True)
+        self._compact_thread.start()
+
+    def compact(self):
+        """
+        Gộp journal vào snapshot
+
+        Journal hiện tại được đổi tên thành .compacting và thay bằng journal
+        mới, nên các thao tác ghi vẫn tiếp tục trong lúc ghi snapshot.
+        """
+        with self._compact_lock:
+            compacting_path = self.journal_path + '.compacting'
+
+            with self._lock:
+                if self._journal_ops == 0:
+                    return
+                # Bản ghi không bị sửa tại chỗ (update thay object mới), nên chỉ
+                # cần chụp danh sách tham chiếu; to_dict() chạy dần khi ghi
+                records = list(self._records.values())
+                self._journal.close()
+                if os.path.exists(compacting_path):
+                    # Lần compaction trước lỗi: nối journal vào, không ghi đè
+                    with open(self.journal_path, 'rb') as src, open(compacting_path, 'ab') as dst:
+                        dst.write(src.read())
+                    os.remove(self.journal_path)
+                else:
+                    os.replace(self.journal_path, compacting_path)
+                self._journal = open(self.journal_path, 'a', encoding='utf-8')
+                self._write_seq()
+                self._journal_ops = 0
+
+            try:
+                self._write_snapshot(s.to_dict() for s in records)
+                os.remove(compacting_path)
+            except Exception as e:
+                # Giữ lại .compacting để replay ở lần mở sau
+                print(f"⚠️ Lỗi compaction: {e}")
+
+    def _write_seq(self):
+        """
+        Ghi id lớn nhất đã cấp vào journal (gọi khi đang giữ self._lock)
+
+        Snapshot chỉ chứa bản ghi còn lại, nên nếu id lớn nhất đã bị xóa thì
+        chỉ dòng này giữ cho id không bị cấp lại. Không tính vào _journal_ops
+        (không tự kích hoạt compaction).
+        """
+        if not self._max_id:
+            return
+        self._journal.write(json.dumps({'op': 'seq', 'max_id': self._max_id}) + '\n')
+        self._journal.flush()
+        if self.fsync:
+            os.fsync(self._journal.fileno())
+
+    def close(self):
+        """Compaction lần cuối, đóng journal và nhả khóa file"""
+        if self._compact_thread is not None:
+            self._compact_thread.join()
+        try:
+            self.compact()
+            with self._lock:
+                self._journal.close()
+        finally:
+            self._release_file_lock()
+
+    def _overwrite_stream(self, records, batch_size=BATCH_SIZE):
+        """Ghi đè toàn bộ dữ liệu từ 1 iterable (dùng khi import)"""
+        with self._compact_lock, self._lock:
+            old_records, old_max_id = self._records, self._max_id
+            self._records = {}
+            self._max_id = 0
+
+            def applying():
+                for schedule in records:
+                    self._apply_put(schedule)
+                    yield schedule
+
+            try:
+                self._write_snapshot(applying(), batch_size)
+            except BaseException:
+                self._records, self._max_id = old_records, old_max_id
+                raise
+
+            # Không cấp lại id đã dùng trước khi import
+            self._max_id = max(self._max_id, old_max_id)
+            self._journal.close()
+            self._journal = open(self.journal_path, 'w', encoding='utf-8')
+            self._write_seq()
+            self._journal_ops = 0
+            compacting_path = self.journal_path + '.compacting'
+            if os.path.exists(compacting_path):
+                os.remove(compacting_path)
+
+    # ===== API GIỐNG JSONSTORAGE =====
+
+    def load_all(self):
+        """Load tất cả schedules (từ bộ nhớ, không đọc file)"""
+        with self._lock:
+            return [s.to_dict() for s in self._records.values()]
+
+    def iter_all(self):
+        """Duyệt lần lượt các schedule dạng dict (chụp danh sách tại thời điểm gọi)"""
+        with self._lock:
+            records = list(self._records.values())
+        for schedule in records:
+            yield schedule.to_dict()
+
+    def load_records(self):
+        """Load tất cả schedules dạng Schedule (bản sao, không parse lại start_time)"""
+        with self._lock:
+            return [s.copy() for s in self._records.values()]
+
+    def get(self, schedule_id):
+        """Lấy schedule theo ID (None nếu không có)"""
+        with self._lock:
+            schedule = self._records.get(str(schedule_id))
+            return schedule.to_dict() if schedule else None
+
+    def save(self, schedule):
+        """
+        Lưu schedule mới
+
+        Args:
+            schedule (dict): Schedule object
+
+        Returns:
+            str: ID của schedule
+        """
+        with self._lock:
+            # Generate ID
+            self._max_id += 1
+            schedule['id'] = str(self._max_id)
+
+            # Add created timestamp
+            schedule['created_at'] = datetime.now().isoformat()
+
+            record = Schedule(schedule)
+            self._append({'op': 'put', 'schedule': record.to_dict()})
+            self._records[record['id']] = record
+
+        self._emit(CHANGE_INSERTED, record['id'], record)
+        return schedule['id']
+
+    def save_many(self, schedules):
+        """
+        Lưu nhiều schedule mới với 1 lần ghi journal (1 fsync)
+
+        Args:
+            schedules (list): Các schedule object (được gán id/created_at tại chỗ)
+
+        Returns:
+            list: ID của các schedule, theo thứ tự
+        """
+        schedules = list(schedules)
+        if not schedules:
+            return []
+
+        with self._lock:
+            created_at = datetime.now().isoformat()
+            records = []
+            for schedule in schedules:
+                self._max_id += 1
+                schedule['id'] = str(self._max_id)
+                schedule['created_at'] = created_at
+                records.append(Schedule(schedule))
+
+            self._append_many([{'op': 'put', 'schedule': r.to_dict()} for r in records])
+            for record in records:
+                self._records[record['id']] = record
+
+        for record in records:
+            self._emit(CHANGE_INSERTED, record['id'], record)
+        return [record['id'] for record in records]
+
+    def delete(self, schedule_id):
+        """Xóa schedule theo ID"""
+        schedule_id = str(schedule_id)
+        with self._lock:
+            if schedule_id not in self._records:
+                return
+            self._append({'op': 'delete', 'id': schedule_id})
+            del self._records[schedule_id]
+
+        self._emit(CHANGE_DELETED, schedule_id)
+
+    def update(self, schedule_id, updated_schedule):
+        """
+        Cập nhật schedule (thay toàn bộ bản ghi, xem JSONStorage.update)
+
+        updated_schedule phải là bản ghi đầy đủ: field không có trong đó sẽ
+        không còn sau khi cập nhật.
+        """
+        schedule_id = str(schedule_id)
+        with self._lock:
+            if schedule_id not in self._records:
+                return
+            updated_schedule['id'] = schedule_id
+            updated_schedule['updated_at'] = datetime.now().isoformat()
+
+            record = Schedule(updated_schedule)
+            self._append({'op': 'put', 'schedule': record.to_dict()})
+            self._records[schedule_id] = record
+
+        self._emit(CHANGE_UPDATED, schedule_id, record)
+
+    def search(self, keyword):
+        """Tìm kiếm schedule"""
+        keyword = keyword.lower()
+        with self._lock:
+            return [
+                s.to_dict() for s in self._records.values()
+                if keyword in (s.get('event') or '').lower() or
+                   keyword in (s.get('location') or '').lower()
+            ]
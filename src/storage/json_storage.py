@@ -1,8 +1,34 @@
 import json
 import os
 import sys
+import threading
+from collections import deque
 from datetime import datetime
 
+try:
+    from ..core.schedule import Schedule
+    from .streaming import (
+        BATCH_SIZE, RecordReader, is_jsonl_path, validate_record,
+        write_json_array, write_json_lines
+    )
+except ImportError:
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+    from src.core.schedule import Schedule
+    from src.storage.streaming import (
+        BATCH_SIZE, RecordReader, is_jsonl_path, validate_record,
+        write_json_array, write_json_lines
+    )
+
+
+# Các loại thay đổi phát ra cho subscriber
+CHANGE_INSERTED = 'inserted'
+CHANGE_UPDATED = 'updated'
+CHANGE_DELETED = 'deleted'
+CHANGE_RESET = 'reset'  # Toàn bộ dữ liệu bị thay (import): cần load_all() lại
+
+# Số lỗi tối đa giữ lại trong báo cáo import
+MAX_REPORTED_ERRORS = 100
+
 
 class JSONStorage:
     """Quản lý lưu trữ schedule bằng JSON"""
@@ -10,6 +36,75 @@ class JSONStorage:
     def __init__(self, file_path='data/schedules.json'):
         self.file_path = file_path
         self.ensure_file_exists()
+        self._init_changefeed()
+    
+    # ===== CHANGEFEED =====
+    
+    def _init_changefeed(self, history_size=1000):
+        """Khởi tạo danh sách subscriber và lịch sử thay đổi gần đây"""
+        self.version = 0
+        self._subscribers = []
+        self._change_history = deque(maxlen=history_size)
+        self._change_lock = threading.Lock()
+    
+    def subscribe(self, callback):
+        """
+        Đăng ký nhận thay đổi
+        
+        Args:
+            callback (callable): Nhận 1 dict {'type', 'id', 'schedule', 'version'}
+                ('schedule' là bản sao Schedule); được gọi trên thread thực hiện
+                thay đổi
+        """
+        with self._change_lock:
+            if callback not in self._subscribers:
+                self._subscribers.append(callback)
+    
+    def unsubscribe(self, callback):
+        """Hủy đăng ký nhận thay đổi"""
+        with self._change_lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+    
+    def changes_since(self, version):
+        """
+        Lấy các thay đổi sau một version
+        
+        Returns:
+            list: Các change theo thứ tự, hoặc None nếu lịch sử không còn đủ
+                (khi đó cần load_all() lại)
+        """
+        with self._change_lock:
+            if version >= self.version:
+                return []
+            changes = [c for c in self._change_history if c['version'] > version]
+            if not changes or changes[0]['version'] != version + 1:
+                return None
+            return changes
+    
+    def _emit(self, change_type, schedule_id=None, schedule=None):
+        """Tăng version và báo thay đổi cho các subscriber"""
+        if isinstance(schedule, Schedule):
+            schedule = schedule.copy()  # Giữ start_epoch đã parse
+        elif schedule is not None:
+            schedule = Schedule(schedule)
+        
+        with self._change_lock:
+            self.version += 1
+            change = {
+                'type': change_type,
+                'id': str(schedule_id) if schedule_id is not None else None,
+                'schedule': schedule,
+                'version': self.version
+            }
+            self._change_history.append(change)
+            subscribers = list(self._subscribers)
+        
+        for callback in subscribers:
+            try:
+                callback(change)
+            except Exception as e:
+                print(f"⚠️ Lỗi subscriber: {e}")
    
     def ensure_file_exists(self):
         """Đảm bảo file tồn tại"""
@@ -21,56 +116,152 @@ class JSONStorage:
 
     def _overwrite_internal(self, data):
         """Ghi đè dữ liệu vào file schedules.json nội bộ."""
-        with open(self.file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        self._overwrite_stream(data)
 
-    def export_to_file(self, data, external_path):
+    def _overwrite_stream(self, records, batch_size=BATCH_SIZE):
         """
-        Xuất dữ liệu schedule ra một file JSON bất kỳ.
+        Ghi đè dữ liệu nội bộ từ 1 iterable (ghi dần theo batch)
+        
+        Ghi ra file tạm rồi os.replace: nếu records lỗi giữa chừng (VD: file
+        import hỏng) thì dữ liệu cũ giữ nguyên.
+        """
+        tmp_path = self.file_path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                write_json_array(f, records, batch_size)
+            os.replace(tmp_path, self.file_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def iter_all(self):
+        """Duyệt lần lượt các schedule (không nạp cả file vào bộ nhớ)"""
+        for _, schedule, _ in RecordReader(self.file_path):
+            yield schedule
+
+    def export_stream(self, external_path, records=None, progress=None, batch_size=BATCH_SIZE):
+        """
+        Xuất schedule ra file, ghi dần theo batch
+        
+        Định dạng theo phần mở rộng: .jsonl/.ndjson = JSON Lines, còn lại là
+        mảng JSON (indent=2, giống schedules.json).
         
         Args:
-            data (list): Danh sách schedules để xuất.
-            external_path (str): Đường dẫn file đích.
+            external_path (str): Đường dẫn file đích
+            records (iterable): Schedule cần xuất (None = toàn bộ, qua iter_all())
+            progress (callable): progress(số bản ghi đã ghi, tỉ lệ 0..1 hoặc None)
+            batch_size (int): Số bản ghi mỗi lần ghi
         
         Returns:
-            tuple: (success: bool, error_message: str hoặc None)
+            tuple: (số bản ghi đã xuất hoặc None, error_message hoặc None)
         """
+        if records is None:
+            records = self.iter_all()
+        total = len(records) if hasattr(records, '__len__') else None
+        on_batch = None
+        if progress:
+            on_batch = lambda count: progress(count, count / total if total else None)
+        
+        write = write_json_lines if is_jsonl_path(external_path) else write_json_array
+        tmp_path = external_path + '.tmp'
         try:
-            with open(external_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            return True, None
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                count = write(f, records, batch_size, on_batch)
+            os.replace(tmp_path, external_path)
+            return count, None
         except Exception as e:
-            return False, f"Lỗi khi xuất file: {e}"
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return None, f"Lỗi khi xuất file: {e}"
 
-    def import_from_file(self, external_path):
+    def import_stream(self, external_path, progress=None, batch_size=BATCH_SIZE):
         """
-        Nhập dữ liệu schedule từ một file JSON bất kỳ và ghi đè nội bộ.
+        Nhập schedule từ file (mảng JSON hoặc JSON Lines) và ghi đè nội bộ
+        
+        File được đọc và ghi dần theo batch nên bộ nhớ không phụ thuộc kích
+        thước file. Bản ghi không hợp lệ bị bỏ qua (ghi trong báo cáo); lỗi cú
+        pháp của mảng JSON thì hủy cả lần nhập, dữ liệu cũ giữ nguyên.
         
         Args:
-            external_path (str): Đường dẫn file nguồn.
-            
+            external_path (str): Đường dẫn file nguồn
+            progress (callable): progress(số bản ghi đã nhập, tỉ lệ file đã đọc 0..1)
+            batch_size (int): Số bản ghi mỗi lần ghi
+        
         Returns:
-            tuple: (imported_data: list hoặc None, error_message: str hoặc None)
+            tuple: (report hoặc None, error_message hoặc None)
+                report: {'format', 'imported', 'skipped',
+                         'errors': [(vị trí, lỗi)] (tối đa MAX_REPORTED_ERRORS)}
         """
         try:
-            with open(external_path, 'r', encoding='utf-8') as f:
-                imported_data = json.load(f)
+            reader = RecordReader(external_path)
+            report = {'format': None, 'imported': 0, 'skipped': 0, 'errors': []}
             
-            # Kiểm tra định dạng cơ bản
-            if not isinstance(imported_data, list):
-                return None, "Định dạng file không hợp lệ (File không chứa danh sách lịch trình)"
+            def valid_records():
+                for position, record, error in reader:
+                    error = error or validate_record(record)
+                    if error:
+                        report['skipped'] += 1
+                        if len(report['errors']) < MAX_REPORTED_ERRORS:
+                            report['errors'].append((position, error))
+                        continue
+                    report['imported'] += 1
+                    if progress and report['imported'] % batch_size == 0:
+                        progress(report['imported'], reader.fraction)
+                    yield record
+                
+                if report['skipped'] and not report['imported']:
+                    # Không có bản ghi hợp lệ nào: coi như sai file, không ghi đè
+                    raise ValueError(
+                        f"Không có lịch trình hợp lệ ({report['errors'][0][1]})"
+                    )
             
             # Ghi đè dữ liệu vào file gốc (nội bộ)
-            self._overwrite_internal(imported_data)
+            self._overwrite_stream(valid_records(), batch_size)
+            report['format'] = reader.format
+            if progress:
+                progress(report['imported'], 1.0)
+            self._emit(CHANGE_RESET)
             
-            return imported_data, None
+            return report, None
         except FileNotFoundError:
             return None, "File không tồn tại."
-        except json.JSONDecodeError:
-            return None, "Lỗi định dạng JSON: Nội dung file không hợp lệ."
+        except json.JSONDecodeError as e:
+            return None, f"Lỗi định dạng JSON: Nội dung file không hợp lệ ({e})."
         except Exception as e:
             return None, f"Lỗi khi nhập file: {e}"
 
+    def export_to_file(self, data, external_path):
+        """
+        Xuất dữ liệu schedule ra một file JSON bất kỳ.
+        
+        Args:
+            data (list): Danh sách schedules để xuất.
+            external_path (str): Đường dẫn file đích.
+        
+        Returns:
+            tuple: (success: bool, error_message: str hoặc None)
+        """
+        count, error = self.export_stream(external_path, data)
+        return count is not None, error
+
+    def import_from_file(self, external_path):
+        """
+        Nhập dữ liệu schedule từ một file JSON bất kỳ và ghi đè nội bộ.
+        
+        Xem import_stream() để nhập file lớn (không trả về toàn bộ dữ liệu).
+        
+        Args:
+            external_path (str): Đường dẫn file nguồn.
+            
+        Returns:
+            tuple: (imported_data: list hoặc None, error_message: str hoặc None)
+        """
+        report, error = self.import_stream(external_path)
+        if report is None:
+            return None, error
+        return self.load_all(), None
+
     def load_all(self):
         """Load tất cả schedules"""
         try:
@@ -80,6 +271,15 @@ class JSONStorage:
             print(f"Lỗi load: {e}")
             return []
     
+    def load_records(self):
+        """Load tất cả schedules dạng Schedule (start_time đã parse sẵn)"""
+        return [Schedule(s) for s in self.load_all()]
+    
+    def get(self, schedule_id):
+        """Lấy schedule theo ID (None nếu không có)"""
+        schedule_id = str(schedule_id)
+        return next((s for s in self.iter_all() if s.get('id') == schedule_id), None)
+    
     def save(self, schedule):
         """
         Lưu schedule mới
@@ -103,35 +303,81 @@ class JSONStorage:
         schedule['created_at'] = datetime.now().isoformat()
         
         # Add to list
-        schedules.append(schedule)
+        schedules.append(dict(schedule))
         
         # Save
         with open(self.file_path, 'w', encoding='utf-8') as f:
             json.dump(schedules, f, ensure_ascii=False, indent=2)
         
+        self._emit(CHANGE_INSERTED, schedule['id'], schedule)
         return schedule['id']
     
+    def save_many(self, schedules):
+        """
+        Lưu nhiều schedule mới trong 1 lần ghi file
+        
+        Args:
+            schedules (list): Các schedule object (được gán id/created_at tại chỗ)
+            
+        Returns:
+            list: ID của các schedule, theo thứ tự
+        """
+        schedules = list(schedules)
+        if not schedules:
+            return []
+        
+        existing = self.load_all()
+        max_id = max((int(s.get('id', 0)) for s in existing), default=0)
+        created_at = datetime.now().isoformat()
+        
+        for schedule in schedules:
+            max_id += 1
+            schedule['id'] = str(max_id)
+            schedule['created_at'] = created_at
+            existing.append(dict(schedule))
+        
+        # Save (1 lần, file tạm + os.replace)
+        self._overwrite_stream(existing)
+        
+        for schedule in schedules:
+            self._emit(CHANGE_INSERTED, schedule['id'], schedule)
+        return [schedule['id'] for schedule in schedules]
+    
     def delete(self, schedule_id):
         """Xóa schedule theo ID"""
         schedules = self.load_all()
-        schedules = [s for s in schedules if s.get('id') != str(schedule_id)]
+        remaining = [s for s in schedules if s.get('id') != str(schedule_id)]
         
         with open(self.file_path, 'w', encoding='utf-8') as f:
-            json.dump(schedules, f, ensure_ascii=False, indent=2)
+            json.dump(remaining, f, ensure_ascii=False, indent=2)
+        
+        if len(remaining) != len(schedules):
+            self._emit(CHANGE_DELETED, schedule_id)
     
     def update(self, schedule_id, updated_schedule):
-        """Cập nhật schedule"""
+        """
+        Cập nhật schedule (thay toàn bộ bản ghi)
+        
+        updated_schedule phải là bản ghi đầy đủ: field không có trong đó sẽ
+        không còn sau khi cập nhật (giống nhau ở mọi backend). Muốn sửa 1 vài
+        field thì get() rồi sửa trên bản ghi đó.
+        """
         schedules = self.load_all()
+        found = False
         
         for i, s in enumerate(schedules):
             if s.get('id') == str(schedule_id):
                 updated_schedule['id'] = str(schedule_id)
                 updated_schedule['updated_at'] = datetime.now().isoformat()
-                schedules[i] = updated_schedule
+                schedules[i] = dict(updated_schedule)
+                found = True
                 break
         
         with open(self.file_path, 'w', encoding='utf-8') as f:
             json.dump(schedules, f, ensure_ascii=False, indent=2)
+        
+        if found:
+            self._emit(CHANGE_UPDATED, schedule_id, updated_schedule)
     
     def search(self, keyword):
         """Tìm kiếm schedule"""
@@ -140,8 +386,8 @@ class JSONStorage:
         
         return [
             s for s in schedules
-            if keyword in s.get('event', '').lower() or
-               keyword in s.get('location', '').lower()
+            if keyword in (s.get('event') or '').lower() or
+               keyword in (s.get('location') or '').lower()
         ]
     def ensure_file_exists(self):
         """Đảm bảo file tồn tại"""
@@ -0,0 +1,152 @@
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+
+
+# Dấu tiếng Việt sau khi tách NFD (combining marks); đ/Đ không tách được nên thay riêng
+_COMBINING = re.compile('[\u0300-\u036f]')
+_D_TABLE = str.maketrans({'đ': 'd', 'Đ': 'd'})
+_TOKEN = re.compile(r'\w+')
+
+
+def fold_text(text):
+    """
+    Bỏ dấu tiếng Việt + lowercase
+
+    VD: "Họp ở Phòng Đào tạo" -> "hop o phong dao tao"
+    """
+    text = unicodedata.normalize('NFD', str(text).lower().translate(_D_TABLE))
+    return _COMBINING.sub('', text)
+
+
+def tokenize(text):
+    """Danh sách token (đã bỏ dấu) của text"""
+    return _TOKEN.findall(fold_text(text)) if text else []
+
+
+class SearchIndex:
+    """
+    Inverted index trong bộ nhớ trên token (bỏ dấu) của event và location
+
+    - put/remove cập nhật đúng schedule thay đổi (dùng với changefeed của storage)
+    - search(query): mỗi token của query khớp tiền tố của 1 token trong
+      event/location ("hop ph" tìm được "Họp nhóm phòng 302"); kết quả là
+      giao của các token, theo thứ tự thêm vào index
+    - Từ vựng giữ dạng list đã sắp xếp để tra tiền tố bằng bisect
+    """
+
+    FIELDS = ('event', 'location')
+
+    def __init__(self, schedules=None, key=None):
+        """
+        Args:
+            schedules (iterable): Schedule ban đầu
+            key (callable): schedule -> key (mặc định str(id))
+        """
+        self.key = key or (lambda schedule: str(schedule.get('id')))
+        self._postings = {}  # token -> set(key)
+        self._doc_tokens = {}  # key -> frozenset(token)
+        self._order = {}  # key -> thứ tự thêm (để trả kết quả ổn định)
+        self._vocab = []  # Token đã sắp xếp
+        self._seq = 0
+        self._lock = threading.Lock()
+        if schedules:
+            self.rebuild(schedules)
+
+    def __len__(self):
+        return len(self._doc_tokens)
+
+    def _tokens(self, schedule):
+        tokens = set()
+        for field in self.FIELDS:
+            tokens.update(tokenize(schedule.get(field)))
+        return frozenset(tokens)
+
+    def rebuild(self, schedules):
+        """Xây lại toàn bộ index"""
+        with self._lock:
+            self._postings = {}
+            self._doc_tokens = {}
+            self._order = {}
+            self._vocab = []
+            self._seq = 0
+            for schedule in schedules:
+                self._put(self.key(schedule), self._tokens(schedule))
+            self._vocab = sorted(self._postings)
+
+    def put(self, schedule):
+        """Thêm hoặc cập nhật 1 schedule"""
+        key = self.key(schedule)
+        tokens = self._tokens(schedule)
+        with self._lock:
+            for token in self._put(key, tokens):
+                insort(self._vocab, token)
+
+    def remove(self, key):
+        """Xóa 1 schedule theo key"""
+        with self._lock:
+            self._order.pop(key, None)
+            self._discard(key, self._doc_tokens.pop(key, frozenset()))
+
+    def _put(self, key, tokens):
+        """Cập nhật postings; trả về các token mới xuất hiện trong từ vựng"""
+        old = self._doc_tokens.get(key, frozenset())
+        self._discard(key, old - tokens)
+
+        new_tokens = []
+        for token in tokens - old:
+            keys = self._postings.get(token)
+            if keys is None:
+                keys = self._postings[token] = set()
+                new_tokens.append(token)
+            keys.add(key)
+
+        self._doc_tokens[key] = tokens
+        if key not in self._order:
+            self._seq += 1
+            self._order[key] = self._seq
+        return new_tokens
+
+    def _discard(self, key, tokens):
+        for token in tokens:
+            keys = self._postings.get(token)
+            if keys is None:
+                continue
+            keys.discard(key)
+            if not keys:
+                del self._postings[token]
+                index = bisect_left(self._vocab, token)
+                if index < len(self._vocab) and self._vocab[index] == token:
+                    del self._vocab[index]
+
+    def _prefix_keys(self, prefix):
+        """Tập key có token bắt đầu bằng prefix"""
+        vocab = self._vocab
+        index = bisect_left(vocab, prefix)
+        matched = set()
+        while index < len(vocab) and vocab[index].startswith(prefix):
+            matched |= self._postings[vocab[index]]
+            index += 1
+        return matched
+
+    def search(self, query):
+        """
+        Tìm schedule theo query (không phân biệt hoa thường và dấu)
+
+        Returns:
+            list: Key các schedule khớp, theo thứ tự thêm vào index
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        with self._lock:
+            # Token dài thường ít kết quả hơn: giao từ đó trước
+            result = None
+            for token in sorted(set(tokens), key=len, reverse=True):
+                keys = self._prefix_keys(token)
+                result = keys if result is None else result & keys
+                if not result:
+                    return []
+            return sorted(result, key=self._order.__getitem__)
@@ -0,0 +1,362 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+
+try:
+    from .json_storage import JSONStorage, CHANGE_INSERTED, CHANGE_UPDATED, CHANGE_DELETED
+    from .streaming import BATCH_SIZE
+except ImportError:
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+    from src.storage.json_storage import JSONStorage, CHANGE_INSERTED, CHANGE_UPDATED, CHANGE_DELETED
+    from src.storage.streaming import BATCH_SIZE
+
+
+# Các field có cột riêng; field khác được giữ trong cột extra (JSON)
+COLUMNS = ['event', 'start_time', 'end_time', 'location', 'reminder_minutes', 'created_at', 'updated_at']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS schedules (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    event TEXT,
+    start_time TEXT,
+    end_time TEXT,
+    location TEXT,
+    reminder_minutes INTEGER,
+    created_at TEXT,
+    updated_at TEXT,
+    extra TEXT,
+    -- Bản lowercase (Python str.lower, đúng với tiếng Việt) để tìm kiếm
+    event_lc TEXT,
+    location_lc TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_schedules_start_time ON schedules(start_time);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# FTS5 trigram cho phép tìm chuỗi con (giống `keyword in text` của JSONStorage)
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS schedules_fts USING fts5(
+    event_lc, location_lc,
+    content='schedules', content_rowid='id',
+    tokenize='trigram case_sensitive 1'
+);
+CREATE TRIGGER IF NOT EXISTS schedules_ai AFTER INSERT ON schedules BEGIN
+    INSERT INTO schedules_fts(rowid, event_lc, location_lc)
+    VALUES (new.id, new.event_lc, new.location_lc);
+END;
+CREATE TRIGGER IF NOT EXISTS schedules_ad AFTER DELETE ON schedules BEGIN
+    INSERT INTO schedules_fts(schedules_fts, rowid, event_lc, location_lc)
+    VALUES ('delete', old.id, old.event_lc, old.location_lc);
+END;
+CREATE TRIGGER IF NOT EXISTS schedules_au AFTER UPDATE ON schedules BEGIN
+    INSERT INTO schedules_fts(schedules_fts, rowid, event_lc, location_lc)
+    VALUES ('delete', old.id, old.event_lc, old.location_lc);
+    INSERT INTO schedules_fts(rowid, event_lc, location_lc)
+    VALUES (new.id, new.event_lc, new.location_lc);
+END;
+"""
+
+# Trigram cần keyword tối thiểu 3 ký tự
+FTS_MIN_KEYWORD = 3
+
+
+class SQLiteStorage(JSONStorage):
+    """
+    Quản lý lưu trữ schedule bằng SQLite (cùng API với JSONStorage)
+
+    - Index trên start_time cho truy vấn theo khoảng thời gian
+    - FTS5 (trigram) trên event/location cho tìm kiếm từ khóa
+    - Tự động chuyển dữ liệu 1 lần từ schedules.json cũ
+    """
+
+    def __init__(self, db_path=None, migrate_from=None):
+        """
+        Args:
+            db_path (str): File SQLite (None = data/schedules.db cạnh schedules.json)
+            migrate_from (str): File JSON cũ cần chuyển sang (None = schedules.json
+                mặc định khi dùng db_path mặc định)
+        """
+        if db_path is None:
+            # ensure_file_exists đặt self.file_path = data/schedules.json
+            self.ensure_file_exists()
+            migrate_from = migrate_from or self.file_path
+            db_path = os.path.join(os.path.dirname(self.file_path), 'schedules.db')
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.file_path = db_path
+        self._init_changefeed()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+
+        with self._conn:
+            self._conn.executescript(SCHEMA)
+        try:
+            with self._conn:
+                self._conn.executescript(FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError as e:
+            # SQLite cũ không có FTS5/trigram: tìm kiếm bằng quét bảng
+            print(f"⚠️ FTS5 trigram không khả dụng ({e}), dùng tìm kiếm tuần tự")
+            self.has_fts = False
+
+        if migrate_from:
+            self.migrate_from_json(migrate_from)
+
+    # ===== CHUYỂN ĐỔI DỮ LIỆU =====
+
+    @staticmethod
+    def _to_row(schedule):
+        """Chuyển schedule dict thành giá trị các cột"""
+        values = {column: schedule.get(column) for column in COLUMNS}
+        values['event_lc'] = str(schedule.get('event') or '').lower()
+        values['location_lc'] = str(schedule.get('location') or '').lower()
+
+        extra = {
+            key: value for key, value in schedule.items()
+            if key not in COLUMNS and key != 'id'
+        }
+        values['extra'] = json.dumps(extra, ensure_ascii=False) if extra else None
+        return values
+
+    @staticmethod
+    def _to_schedule(row):
+        """Chuyển 1 dòng SQLite về dạng dict như trong schedules.json"""
+        schedule = {
+            'event': row['event'],
+            'start_time': row['start_time'],
+            'end_time': row['end_time'],
+            'location': row['location'],
+            'reminder_minutes': row['reminder_minutes'],
+            'id': str(row['id']),
+        }
+        if row['created_at'] is not None:
+            schedule['created_at'] = row['created_at']
+        if row['updated_at'] is not None:
+            schedule['updated_at'] = row['updated_at']
+        if row['extra']:
+            schedule.update(json.loads(row['extra']))
+        return schedule
+
+    def _insert(self, schedule, schedule_id=None):
+        values = self._to_row(schedule)
+        values['id'] = schedule_id
+        columns = ['id'] + COLUMNS + ['extra', 'event_lc', 'location_lc']
+        cursor = self._conn.execute(
+            f"INSERT INTO schedules ({', '.join(columns)}) "
+            f"VALUES ({', '.join(':' + c for c in columns)})",
+            values
+        )
+        return cursor.lastrowid
+
+    def _insert_many(self, schedules):
+        """Chèn danh sách schedule, giữ id cũ nếu là số nguyên và chưa trùng"""
+        used_ids = set()
+        for schedule in schedules:
+            try:
+                schedule_id = int(schedule.get('id'))
+            except (TypeError, ValueError):
+                schedule_id = None
+            if schedule_id in used_ids:
+                schedule_id = None
+            used_ids.add(self._insert(schedule, schedule_id))
+
+    def migrate_from_json(self, json_path):
+        """
+        Chuyển dữ liệu từ file JSON cũ (chỉ thực hiện 1 lần)
+
+        Returns:
+            int: Số schedule đã chuyển (0 nếu đã chuyển trước đó)
+        """
+        with self._lock:
+            done = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'migrated_from_json'"
+            ).fetchone()
+            if done or not os.path.exists(json_path):
+                return 0
+
+            try:
+                with open(json_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except Exception as e:
+                print(f"Lỗi load: {e}")
+                return 0
+            if not isinstance(data, list):
+                return 0
+
+            with self._conn:
+                self._insert_many(data)
+                self._conn.execute(
+                    "INSERT INTO meta (key, value) VALUES ('migrated_from_json', ?)",
+                    (os.path.abspath(json_path),)
+                )
+
+        print(f"✅ Migrated {len(data)} schedules from {json_path}")
+        return len(data)
+
+    def _overwrite_stream(self, records, batch_size=BATCH_SIZE):
+        """Ghi đè toàn bộ dữ liệu từ 1 iterable (1 transaction, lỗi thì rollback)"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM schedules")
+            self._insert_many(records)
+
+    def close(self):
+        """Đóng kết nối SQLite"""
+        with self._lock:
+            self._conn.close()
+
+    # ===== API GIỐNG JSONSTORAGE =====
+
+    def load_all(self):
+        """Load tất cả schedules"""
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM schedules ORDER BY id").fetchall()
+        return [self._to_schedule(row) for row in rows]
+
+    def iter_all(self, batch_size=BATCH_SIZE):
+        """Duyệt lần lượt các schedule theo id, đọc từng batch"""
+        last_id = -1
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT * FROM schedules WHERE id > ? ORDER BY id LIMIT ?",
+                    (last_id, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield self._to_schedule(row)
+            last_id = rows[-1]['id']
+
+    def get(self, schedule_id):
+        """Lấy schedule theo ID (None nếu không có)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM schedules WHERE id = ?", (str(schedule_id),)
+            ).fetchone()
+        return self._to_schedule(row) if row else None
+
+    def save(self, schedule):
+        """
+        Lưu schedule mới
+
+        Args:
+            schedule (dict): Schedule object
+
+        Returns:
+            str: ID của schedule
+        """
+        schedule['created_at'] = datetime.now().isoformat()
+
+        with self._lock, self._conn:
+            schedule_id = self._insert(schedule)
+
+        schedule['id'] = str(schedule_id)
+        self._emit(CHANGE_INSERTED, schedule['id'], schedule)
+        return schedule['id']
+
+    def save_many(self, schedules):
+        """
+        Lưu nhiều schedule mới trong 1 transaction
+
+        Args:
+            schedules (list): Các schedule object (được gán id/created_at tại chỗ)
+
+        Returns:
+            list: ID của các schedule, theo thứ tự
+        """
+        schedules = list(schedules)
+        created_at = datetime.now().isoformat()
+        for schedule in schedules:
+            schedule['created_at'] = created_at
+
+        with self._lock, self._conn:
+            schedule_ids = [self._insert(schedule) for schedule in schedules]
+
+        for schedule, schedule_id in zip(schedules, schedule_ids):
+            schedule['id'] = str(schedule_id)
+            self._emit(CHANGE_INSERTED, schedule['id'], schedule)
+        return [schedule['id'] for schedule in schedules]
+
+    def delete(self, schedule_id):
+        """Xóa schedule theo ID"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM schedules WHERE id = ?", (str(schedule_id),))
+
+        if cursor.rowcount:
+            self._emit(CHANGE_DELETED, schedule_id)
+
+    def update(self, schedule_id, updated_schedule):
+        """
+        Cập nhật schedule (thay toàn bộ bản ghi, xem JSONStorage.update)
+
+        updated_schedule phải là bản ghi đầy đủ: field không có trong đó sẽ
+        không còn sau khi cập nhật.
+        """
+        updated_schedule['id'] = str(schedule_id)
+        updated_schedule['updated_at'] = datetime.now().isoformat()
+
+        values = self._to_row(updated_schedule)
+        values['id'] = str(schedule_id)
+        columns = COLUMNS + ['extra', 'event_lc', 'location_lc']
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                f"UPDATE schedules SET {', '.join(f'{c} = :{c}' for c in columns)} "
+                f"WHERE id = :id",
+                values
+            )
+
+        if cursor.rowcount:
+            self._emit(CHANGE_UPDATED, schedule_id, updated_schedule)
+
+    def search(self, keyword):
+        """Tìm kiếm schedule (chuỗi con, không phân biệt hoa thường)"""
+        keyword = keyword.lower()
+
+        with self._lock:
+            if self.has_fts and len(keyword) >= FTS_MIN_KEYWORD:
+                # Phrase trigram = tìm chuỗi con trong event_lc hoặc location_lc
+                phrase = '"' + keyword.replace('"', '""') + '"'
+                rows = self._conn.execute(
+                    "SELECT * FROM schedules WHERE id IN "
+                    "(SELECT rowid FROM schedules_fts WHERE schedules_fts MATCH ?) "
+                    "ORDER BY id",
+                    (phrase,)
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT * FROM schedules "
+                    "WHERE instr(event_lc, :kw) > 0 OR instr(location_lc, :kw) > 0 "
+                    "ORDER BY id",
+                    {'kw': keyword}
+                ).fetchall()
+
+        return [self._to_schedule(row) for row in rows]
+
+    def get_between(self, start_time, end_time):
+        """
+        Lấy các schedule có start_time trong [start_time, end_time) (dùng index)
+
+        Args:
+            start_time (str): ISO datetime (VD: "2025-12-01T00:00:00")
+            end_time (str): ISO datetime
+
+        Returns:
+            list: Schedules sắp xếp theo start_time
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM schedules WHERE start_time >= ? AND start_time < ? "
+                "ORDER BY start_time",
+                (start_time, end_time)
+            ).fetchall()
+        return [self._to_schedule(row) for row in rows]
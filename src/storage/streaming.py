@@ -0,0 +1,272 @@
+import codecs
+import json
+import os
+from datetime import datetime
+
+
+# Kích thước mỗi lần đọc file (byte) và số bản ghi mỗi lần ghi
+CHUNK_SIZE = 64 * 1024
+BATCH_SIZE = 500
+
+# Kích thước tối đa 1 bản ghi trong mảng JSON (ký tự); vượt quá thì coi như
+# file hỏng thay vì đọc tiếp cả phần còn lại vào bộ nhớ
+MAX_RECORD_SIZE = 4 * 1024 * 1024
+
+# Lỗi parse nằm trong khoảng này ở cuối buffer có thể chỉ do bản ghi bị cắt
+# giữa 2 chunk (VD: "tru" của true, "1." của 1.5) -> đọc thêm rồi thử lại
+_INCOMPLETE_TAIL = 16
+
+# Phần mở rộng file được coi là JSON Lines (1 object/dòng)
+JSONL_EXTENSIONS = ('.jsonl', '.ndjson')
+
+_WHITESPACE = ' \t\r\n'
+_TIME_FIELDS = ('start_time', 'end_time', 'created_at', 'updated_at')
+_TEXT_FIELDS = ('event', 'location')
+
+
+def is_jsonl_path(path):
+    """File có phần mở rộng JSON Lines không"""
+    return os.path.splitext(path)[1].lower() in JSONL_EXTENSIONS
+
+
+def validate_record(record):
+    """
+    Kiểm tra 1 bản ghi schedule khi import
+
+    Returns:
+        str hoặc None: Lỗi (None nếu hợp lệ)
+    """
+    if not isinstance(record, dict):
+        return "Bản ghi không phải object"
+
+    for field in _TEXT_FIELDS:
+        value = record.get(field)
+        if value is not None and not isinstance(value, str):
+            return f"'{field}' phải là chuỗi"
+
+    for field in _TIME_FIELDS:
+        value = record.get(field)
+        if value is None:
+            continue
+        try:
+            datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+        except ValueError:
+            return f"'{field}' không phải thời gian ISO: {value!r}"
+
+    reminder_minutes = record.get('reminder_minutes')
+    if reminder_minutes is not None and (
+            isinstance(reminder_minutes, bool) or not isinstance(reminder_minutes, int)):
+        return "'reminder_minutes' phải là số nguyên"
+
+    return None
+
+
+class RecordReader:
+    """
+    Đọc dần từng bản ghi từ file JSON (mảng) hoặc JSON Lines
+
+    Chỉ giữ trong bộ nhớ 1 chunk + bản ghi đang đọc, nên dùng được với file
+    rất lớn. Định dạng: theo phần mở rộng (.jsonl/.ndjson), ngược lại theo ký
+    tự đầu tiên ('[' = mảng JSON, '{' = JSON Lines).
+
+    Duyệt ra (vị trí, bản ghi, lỗi):
+        - vị trí: chỉ số trong mảng (từ 0) hoặc số dòng (từ 1) với JSON Lines
+        - lỗi: chuỗi nếu dòng JSON Lines không parse được (bản ghi = None)
+    Lỗi cú pháp trong mảng JSON raise json.JSONDecodeError (không đọc tiếp được).
+    """
+
+    def __init__(self, path, chunk_size=CHUNK_SIZE):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.total_bytes = os.path.getsize(path)
+        self.bytes_read = 0
+        self.format = 'jsonl' if is_jsonl_path(path) else None
+        self._sniffed = False
+
+    @property
+    def fraction(self):
+        """Tỉ lệ file đã đọc (0..1)"""
+        if not self.total_bytes:
+            return 1.0
+        return min(self.bytes_read / self.total_bytes, 1.0)
+
+    def __iter__(self):
+        with open(self.path, 'rb') as f:
+            if self.format is None:
+                self.format = self._sniff(f)
+                self._sniffed = True
+            if self.format == 'jsonl':
+                yield from self._iter_lines(f)
+            else:
+                yield from self._iter_array(f)
+
+    def _sniff(self, f):
+        head = f.read(self.chunk_size).lstrip(codecs.BOM_UTF8).lstrip()
+        f.seek(0)
+        if head.startswith(b'['):
+            return 'json'
+        if head.startswith(b'{'):
+            return 'jsonl'
+        if not head:
+            raise ValueError("File rỗng")
+        raise ValueError("Định dạng file không hợp lệ (cần mảng JSON hoặc JSON Lines)")
+
+    def _iter_lines(self, f):
+        first = True
+        for line_no, raw_line in enumerate(f, 1):
+            self.bytes_read += len(raw_line)
+            line = raw_line.decode('utf-8-sig' if line_no == 1 else 'utf-8').strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                if first and self._sniffed:
+                    # VD: 1 object JSON nhiều dòng, không phải JSON Lines
+                    raise ValueError(
+                        "Định dạng file không hợp lệ (File không chứa danh sách lịch trình)"
+                    ) from e
+                yield line_no, None, f"JSON không hợp lệ: {e}"
+            else:
+                yield line_no, record, None
+            first = False
+
+    def _iter_array(self, f):
+        decoder = json.JSONDecoder()
+        text_decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        buf = ''
+        pos = 0
+        eof = False
+
+        def fill():
+            nonlocal buf, pos, eof
+            chunk = f.read(self.chunk_size)
+            self.bytes_read += len(chunk)
+            if not chunk:
+                eof = True
+                buf = buf[pos:] + text_decoder.decode(b'', final=True)
+            else:
+                # Bỏ phần đã đọc để bộ nhớ không tăng theo kích thước file
+                buf = buf[pos:] + text_decoder.decode(chunk)
+            pos = 0
+
+        def skip_whitespace():
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in _WHITESPACE:
+                    pos += 1
+                if pos < len(buf) or eof:
+                    return
+                fill()
+
+        def syntax_error(message):
+            return json.JSONDecodeError(message, buf, pos)
+
+        skip_whitespace()
+        if pos >= len(buf):
+            return  # File rỗng = không có bản ghi
+        if buf[pos] != '[':
+            raise syntax_error("Cần '[' ở đầu mảng")
+        pos += 1
+
+        index = 0
+        skip_whitespace()
+        if pos < len(buf) and buf[pos] == ']':
+            pos += 1
+            skip_whitespace()
+            if pos < len(buf):
+                raise syntax_error("Dữ liệu thừa sau ']'")
+            return
+
+        while True:
+            skip_whitespace()
+            while True:
+                try:
+                    record, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError as e:
+                    if eof or not self._maybe_incomplete(e, len(buf)):
+                        raise  # Lỗi cú pháp thật: báo ngay, không đọc hết file
+                    if len(buf) - pos > MAX_RECORD_SIZE:
+                        raise syntax_error(
+                            f"Bản ghi vượt quá {MAX_RECORD_SIZE} ký tự (file hỏng?)"
+                        ) from e
+                    fill()  # Bản ghi chưa đọc hết
+                    continue
+                if end == len(buf) and not eof:
+                    # Giá trị vô hướng ở cuối buffer có thể còn tiếp (VD: số)
+                    fill()
+                    continue
+                break
+            pos = end
+            yield index, record, None
+            index += 1
+
+            skip_whitespace()
+            if pos >= len(buf):
+                raise syntax_error("Thiếu ']' ở cuối mảng")
+            if buf[pos] == ',':
+                pos += 1
+            elif buf[pos] == ']':
+                pos += 1
+                skip_whitespace()
+                if pos < len(buf):
+                    raise syntax_error("Dữ liệu thừa sau ']'")
+                return
+            else:
+                raise syntax_error("Cần ',' hoặc ']'")
+
+
+    @staticmethod
+    def _maybe_incomplete(error, buffer_length):
+        """Lỗi decode có thể chỉ do buffer chưa chứa hết bản ghi không"""
+        if error.msg.startswith('Unterminated string'):
+            return True  # Vị trí lỗi là đầu chuỗi, không phải chỗ bị cắt
+        return error.pos >= buffer_length - _INCOMPLETE_TAIL
+
+
+def _batches(records, batch_size):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def write_json_array(f, records, batch_size=BATCH_SIZE, on_batch=None):
+    """
+    Ghi dần các bản ghi thành mảng JSON (giống json.dump(..., indent=2))
+
+    Args:
+        f: File text đang mở để ghi
+        records (iterable): Bản ghi (dict)
+        on_batch (callable): Gọi on_batch(số bản ghi đã ghi) sau mỗi batch
+
+    Returns:
+        int: Số bản ghi đã ghi
+    """
+    count = 0
+    for batch in _batches(records, batch_size):
+        parts = []
+        for record in batch:
+            item = json.dumps(record, ensure_ascii=False, indent=2).replace('\n', '\n  ')
+            parts.append(('[\n  ' if count == 0 else ',\n  ') + item)
+            count += 1
+        f.write(''.join(parts))
+        if on_batch:
+            on_batch(count)
+    f.write('\n]' if count else '[]')
+    return count
+
+
+def write_json_lines(f, records, batch_size=BATCH_SIZE, on_batch=None):
+    """Ghi dần các bản ghi dạng JSON Lines; tham số như write_json_array"""
+    count = 0
+    for batch in _batches(records, batch_size):
+        f.write(''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in batch))
+        count += len(batch)
+        if on_batch:
+            on_batch(count)
+    return count
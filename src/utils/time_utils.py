@@ -1,10 +1,81 @@
+from collections import OrderedDict
 from datetime import datetime, timedelta
+import threading
 import pytz
 
 
 # Timezone Việt Nam
 VN_TZ = pytz.timezone('Asia/Ho_Chi_Minh')
 
+# ============= BẢNG TRA CỨU (dùng chung, src/nlp/patterns.py dùng lại) =============
+
+# Tên thứ -> weekday() (0 = thứ hai)
+WEEKDAY_NUMBERS = {
+    'thứ hai': 0, 'thứ 2': 0, 't2': 0, 'thu 2': 0,
+    'thứ ba': 1, 'thứ 3': 1, 't3': 1, 'thu 3': 1,
+    'thứ tư': 2, 'thứ 4': 2, 't4': 2, 'thứ bốn': 2, 'thu 4': 2,
+    'thứ năm': 3, 'thứ 5': 3, 't5': 3, 'thu 5': 3,
+    'thứ sáu': 4, 'thứ 6': 4, 't6': 4, 'thu 6': 4,
+    'thứ bảy': 5, 'thứ 7': 5, 't7': 5, 'thu 7': 5,
+    'chủ nhật': 6, 'cn': 6, 'sunday': 6,
+}
+
+# Từ tương đối -> số ngày so với hôm nay
+RELATIVE_DAY_OFFSETS = {
+    'hôm nay': 0,
+    'nay': 0,
+    'ngày hôm nay': 0,
+    'hôm qua': -1,
+    'hqua': -1,
+    'mai': 1,
+    'ngày mai': 1,
+    'mốt': 2,
+    'ngày mốt': 2,
+    'ngày kia': 2,
+    'tuần này': 0,
+    'tuần sau': 7,
+    'tuần tới': 7,
+    'tháng này': 0,
+    'tháng sau': 30,
+    'tháng tới': 30,
+    'năm sau': 365,
+    'năm tới': 365,
+}
+
+# Buổi -> giờ mặc định khi không có giờ cụ thể
+PERIOD_DEFAULT_HOURS = {
+    'sáng': 9,
+    'buổi sáng': 9,
+    'sáng sớm': 7,
+    'trưa': 12,
+    'buổi trưa': 12,
+    'chiều': 14,
+    'buổi chiều': 14,
+    'tối': 19,
+    'buổi tối': 19,
+    'tối muộn': 21,
+    'đêm': 22,
+    'khuya': 23,
+    'nửa đêm': 0,
+}
+
+# Buổi -> khoảng giờ (bắt đầu, kết thúc)
+PERIOD_HOUR_RANGES = {
+    'sáng': (6, 11),
+    'buổi sáng': (6, 11),
+    'sáng sớm': (6, 8),
+    'trưa': (11, 13),
+    'buổi trưa': (11, 13),
+    'chiều': (13, 18),
+    'buổi chiều': (13, 18),
+    'tối': (18, 22),
+    'buổi tối': (18, 22),
+    'tối muộn': (20, 23),
+    'đêm': (22, 6),
+    'nửa đêm': (0, 2),
+    'khuya': (22, 2),
+}
+
 
 def get_current_datetime():
     """
@@ -16,39 +87,105 @@ def get_current_datetime():
     return datetime.now(VN_TZ)
 
 
-def get_weekday_offset(weekday_name):
+class DayTable:
+    """
+    Bảng tra cứu ngày cho 1 ngày cụ thể
+    
+    Thứ trong tuần được đổi sẵn thành offset so với ngày đó, nên việc xác
+    định thứ chỉ còn 1 lần tra dict. Từ tương đối không phụ thuộc ngày nên
+    tra thẳng RELATIVE_DAY_OFFSETS (get_relative_day_offset).
+    """
+    
+    def __init__(self, day):
+        """
+        Args:
+            day (date): Ngày tham chiếu (hôm nay)
+        """
+        self.day = day
+        
+        self.weekday_offsets = {}
+        for name, target_weekday in WEEKDAY_NUMBERS.items():
+            # Cùng thứ với hôm nay -> lấy tuần sau
+            self.weekday_offsets[name] = (target_weekday - day.weekday()) % 7 or 7
+
+
+# Bảng của các ngày gần đây (ngày đổi sau nửa đêm -> bảng mới được dựng)
+_DAY_TABLE_LIMIT = 8
+_day_tables = OrderedDict()
+_day_tables_lock = threading.Lock()
+
+
+def get_day_table(day=None):
+    """
+    Bảng tra cứu của ngày (dựng 1 lần mỗi ngày, có nhớ)
+    
+    Args:
+        day (date): Ngày tham chiếu (None = hôm nay theo giờ VN)
+        
+    Returns:
+        DayTable: Bảng của ngày đó
+    """
+    if day is None:
+        day = get_current_datetime().date()
+    
+    with _day_tables_lock:
+        table = _day_tables.get(day)
+        if table is None:
+            table = _day_tables[day] = DayTable(day)
+            while len(_day_tables) > _DAY_TABLE_LIMIT:
+                _day_tables.popitem(last=False)
+        return table
+
+
+def get_weekday_offset(weekday_name, reference=None):
     """
     Tính offset từ hôm nay đến thứ được chỉ định
     
+    Không có reference thì phải đọc đồng hồ để biết hôm nay; trong pipeline
+    dùng ReferenceClock.weekday_offset() (bảng của ngày đã lấy sẵn).
+    
     Args:
         weekday_name (str): Tên thứ (VD: "thứ hai", "thứ 2")
+        reference (datetime): Thời điểm tham chiếu (None = hiện tại)
         
     Returns:
         int: Số ngày cần cộng thêm
     """
-    weekday_map = {
-        'thứ hai': 0, 'thứ 2': 0, 't2': 0,
-        'thứ ba': 1, 'thứ 3': 1, 't3': 1,
-        'thứ tư': 2, 'thứ 4': 2, 't4': 2, 'thứ bốn': 2,
-        'thứ năm': 3, 'thứ 5': 3, 't5': 3,
-        'thứ sáu': 4, 'thứ 6': 4, 't6': 4,
-        'thứ bảy': 5, 'thứ 7': 5, 't7': 5,
-        'chủ nhật': 6, 'cn': 6,
-    }
-    
-    target_weekday = weekday_map.get(weekday_name.lower())
-    if target_weekday is None:
-        return 0
+    day = reference.date() if reference else None
+    return get_day_table(day).weekday_offsets.get(weekday_name.lower(), 0)
+
+
+class ReferenceClock:
+    """
+    Mốc thời gian dùng chung cho 1 request hoặc 1 lô câu
     
-    current = get_current_datetime()
-    current_weekday = current.weekday()
+    Lấy giờ hệ thống 1 lần, các bước parse/validate đều tính theo cùng mốc
+    này nên kết quả nhất quán (kể cả khi chạy qua nửa đêm). Bảng tra cứu
+    ngày (DayTable) là bảng đã dựng sẵn của ngày tham chiếu.
+    """
+    
+    def __init__(self, now=None):
+        """
+        Args:
+            now (datetime): Thời điểm tham chiếu (None = hiện tại; naive = giờ VN)
+        """
+        if now is None:
+            now = get_current_datetime()
+        elif now.tzinfo is None:
+            now = VN_TZ.localize(now)
+        
+        self.now = now
+        self.today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        self.day_table = get_day_table(now.date())
+        self.weekday_offsets = self.day_table.weekday_offsets
     
-    # Tính số ngày cần cộng
-    offset = (target_weekday - current_weekday) % 7
-    if offset == 0:
-        offset = 7  # Nếu cùng thứ, lấy tuần sau
+    def weekday_offset(self, weekday_name):
+        """Như get_weekday_offset() nhưng tính theo ngày tham chiếu"""
+        return self.weekday_offsets.get(weekday_name.lower(), 0)
     
-    return offset
+    def relative_day_offset(self, relative_term):
+        """Như get_relative_day_offset()"""
+        return get_relative_day_offset(relative_term)
 
 
 def get_relative_day_offset(relative_term):
@@ -58,26 +195,7 @@ def get_relative_day_offset(relative_term):
     if not relative_term:  # Thêm check None
         return 0
     
-    relative_map = {
-        'hôm nay': 0,
-        'nay': 0,  # THÊM DÒNG NÀY
-        'ngày hôm nay': 0,
-        'hôm qua': -1,
-        'hqua': -1,
-        'mai': 1,
-        'ngày mai': 1,
-        'mốt': 2,
-        'ngày mốt': 2,
-        'ngày kia': 2,
-        'tuần này': 0,
-        'tuần sau': 7,
-        'tuần tới': 7,
-        'tháng này': 0,
-        'tháng sau': 30,
-        'tháng tới': 30,
-    }
-    
-    return relative_map.get(str(relative_term).lower(), 0)
+    return RELATIVE_DAY_OFFSETS.get(str(relative_term).lower(), 0)
 
 
 def parse_period_to_hour(period):
@@ -90,23 +208,7 @@ def parse_period_to_hour(period):
     Returns:
         int: Giờ mặc định
     """
-    period_hour_map = {
-        'sáng': 9,
-        'buổi sáng': 9,
-        'sáng sớm': 7,
-        'trưa': 12,
-        'buổi trưa': 12,
-        'chiều': 14,
-        'buổi chiều': 14,
-        'tối': 19,
-        'buổi tối': 19,
-        'tối muộn': 21,
-        'đêm': 22,
-        'khuya': 23,
-        'nửa đêm': 0,
-    }
-    
-    return period_hour_map.get(period.lower(), 9)
+    return PERIOD_DEFAULT_HOURS.get(period.lower(), 9)
 
 
 def format_datetime(dt, format_str='%Y-%m-%d %H:%M:%S'):
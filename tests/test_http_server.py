@@ -0,0 +1,42 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.server.http_server import ScheduleAPI
+from src.storage.journal_storage import JournalStorage
+
+
+class ScheduleSearchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.storage = JournalStorage(os.path.join(self.directory, 'schedules.json'), fsync=False)
+        self.storage.save({'event': 'đi chợ', 'start_time': '2030-01-01T08:00:00', 'location': None})
+        self.api = ScheduleAPI(assistant=None, storage=self.storage)
+
+    def tearDown(self):
+        self.storage.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def search(self, keyword):
+        status, schedules = self.api.dispatch('GET', '/schedules', {'q': [keyword]}, None)
+        self.assertEqual(status, 200)
+        return [s['event'] for s in schedules]
+
+    def test_search_skips_records_without_location(self):
+        self.assertEqual(self.search('họp'), [])
+        self.assertEqual(self.storage.search('họp'), [])
+
+    def test_search_ignores_diacritics_and_follows_changes(self):
+        self.storage.save({'event': 'họp nhóm', 'start_time': '2030-01-01T09:00:00',
+                           'location': 'phòng 302'})
+        self.assertEqual(self.search('hop'), ['họp nhóm'])
+        self.assertEqual(self.search('phong 30'), ['họp nhóm'])
+
+        self.storage.delete('2')
+        self.assertEqual(self.search('hop'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
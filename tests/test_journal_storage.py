@@ -0,0 +1,56 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.storage.journal_storage import JournalStorage, StorageLockedError
+
+
+class JournalStorageTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'schedules.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def open(self):
+        return JournalStorage(self.path, fsync=False)
+
+    def test_deleted_max_id_not_reused_after_compaction(self):
+        storage = self.open()
+        storage.save({'event': 'a', 'start_time': '2030-01-01T09:00:00'})
+        last_id = storage.save({'event': 'b', 'start_time': '2030-01-01T10:00:00'})
+        storage.delete(last_id)
+        storage.close()  # compaction: snapshot chỉ còn id 1
+
+        storage = self.open()
+        storage.compact()
+        storage.close()
+
+        storage = self.open()
+        new_id = storage.save({'event': 'c', 'start_time': '2030-01-01T11:00:00'})
+        storage.close()
+        self.assertEqual(new_id, '3')
+
+    def test_second_writer_is_rejected(self):
+        storage = self.open()
+        with self.assertRaises(StorageLockedError):
+            self.open()
+        storage.close()
+
+        # Đóng rồi thì mở lại được
+        self.open().close()
+
+    def test_import_does_not_reuse_ids(self):
+        storage = self.open()
+        for hour in range(9, 12):
+            storage.save({'event': 'x', 'start_time': f'2030-01-01T{hour:02d}:00:00'})
+        storage._overwrite_stream([{'event': 'y', 'id': '1'}])
+        self.assertEqual(storage.save({'event': 'z'}), '4')
+        storage.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+
+from src.nlp.preprocessor import Preprocessor
+from src.nlp.rule_extractor import RuleExtractor
+
+
+class NormalizeTermsTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.preprocessor = Preprocessor()
+        cls.rule_extractor = RuleExtractor()
+
+    def location(self, text):
+        normalized = self.preprocessor.normalize_terms(self.preprocessor.clean_text(text))
+        return normalized, self.rule_extractor.extract_location_components(normalized)
+
+    def test_vp_before_number_is_not_a_room(self):
+        normalized, location = self.location("họp vp 5")
+        self.assertEqual(normalized, "họp vp 5")
+        self.assertIsNone(location['room'])
+
+    def test_room_abbreviation_before_number(self):
+        normalized, location = self.location("họp p302 lúc 9h")
+        self.assertEqual(normalized, "họp phòng 302 lúc 9 giờ")
+        self.assertEqual(location['room'], "phòng 302")
+
+    def test_minute_unit_is_not_a_room(self):
+        self.assertEqual(self.location("nhắc trước 15p")[0], "nhắc trước 15 phút")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+from datetime import datetime, timedelta
+
+from src.reminder.reminder_service import ReminderService
+
+
+class _Storage:
+    def __init__(self, schedules):
+        self.schedules = schedules
+
+    def load_all(self):
+        return list(self.schedules)
+
+
+class ReminderHeapTest(unittest.TestCase):
+
+    def setUp(self):
+        self.now = datetime.now().replace(microsecond=0)
+        start_time = (self.now + timedelta(minutes=15, seconds=10)).isoformat()
+        self.schedule = {'id': '1', 'event': 'họp nhóm', 'start_time': start_time,
+                         'reminder_minutes': 15}
+        self.service = ReminderService(_Storage([self.schedule]))
+        self.fired = []
+        self.service._show_notification = lambda schedule: self.fired.append(schedule['event'])
+        self.service._rebuild_heap()
+
+    def test_update_without_changing_start_time(self):
+        updated = dict(self.schedule, event='họp nhóm (đổi phòng)')
+        self.service._on_storage_change({'type': 'updated', 'id': '1', 'schedule': updated})
+        self.service._apply_pending()
+
+        self.service._fire_due(self.now + timedelta(seconds=20))
+        self.assertEqual(self.fired, ['họp nhóm (đổi phòng)'])
+        self.assertEqual(self.service._heap, [])
+
+    def test_deleted_schedule_does_not_fire(self):
+        self.service._on_storage_change({'type': 'deleted', 'id': '1', 'schedule': None})
+        self.service._apply_pending()
+
+        self.service._fire_due(self.now + timedelta(seconds=20))
+        self.assertEqual(self.fired, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
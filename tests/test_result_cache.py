@@ -0,0 +1,120 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from src.core.scheduler import PersonalScheduleAssistant, ResultCache
+from src.utils.time_utils import ReferenceClock
+
+
+class ResultCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'cache.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_hits_misses_and_lru_eviction(self):
+        cache = ResultCache(max_size=2)
+        cache.put('a', {'v': 1})
+        cache.put('b', {'v': 2})
+        self.assertEqual(cache.get('a'), {'v': 1})  # 'a' mới dùng: 'b' bị loại trước
+        cache.put('c', {'v': 3})
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), {'v': 3})
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['evictions'], stats['size']),
+                         (2, 1, 1, 2))
+
+    def test_ttl_expiry(self):
+        cache = ResultCache(ttl=60)
+        with mock.patch('src.core.scheduler.time.time', return_value=1000.0):
+            cache.put('a', {'v': 1})
+        with mock.patch('src.core.scheduler.time.time', return_value=1059.0):
+            self.assertEqual(cache.get('a'), {'v': 1})
+        with mock.patch('src.core.scheduler.time.time', return_value=1061.0):
+            self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats()['size'], 0)
+
+    def test_save_load_round_trip(self):
+        cache = ResultCache(file_path=self.path)
+        cache.put('họp nhóm', {'v': 'phòng 302'})
+        self.assertEqual(cache.save(), (True, None))
+        self.assertEqual(os.listdir(self.directory), ['cache.json'])  # không còn file tạm
+
+        loaded = ResultCache(file_path=self.path)
+        self.assertEqual(loaded.get('họp nhóm'), {'v': 'phòng 302'})
+
+    def test_load_skips_malformed_entries(self):
+        data = [
+            ['ok', 1e12, {'v': 1}],
+            ['truncated', 1e12],
+            [['họp', '2026-10-18'], 1e12, {'success': True}],  # định dạng cũ
+            {'key': 'dict'},
+            ['bad time', 'x', {'v': 2}],
+        ]
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+        cache = ResultCache(file_path=self.path)
+        self.assertEqual(cache.stats()['size'], 1)
+        self.assertEqual(cache.get('ok'), {'v': 1})
+
+    def test_load_ignores_wrong_top_level_shape(self):
+        for content in ('{"a": 1}', '[1, 2', ''):
+            with open(self.path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            self.assertEqual(ResultCache(file_path=self.path).stats()['size'], 0)
+
+
+class AssistantCacheTest(unittest.TestCase):
+    TEXT = "họp nhóm 9h ở phòng 302"
+
+    @classmethod
+    def setUpClass(cls):
+        cls.assistant = PersonalScheduleAssistant()
+
+    def setUp(self):
+        self.assistant.cache.clear()
+
+    def test_time_rollover_uses_request_clock(self):
+        before = ReferenceClock(datetime(2026, 10, 18, 8, 0))
+        after = ReferenceClock(datetime(2026, 10, 18, 10, 0))
+
+        first = self.assistant.process(self.TEXT, before)
+        second = self.assistant.process(self.TEXT, after)
+        uncached = PersonalScheduleAssistant(cache_size=0).process(self.TEXT, after)
+
+        self.assertTrue(first['schedule']['start_time'].startswith('2026-10-18T09:00'))
+        self.assertEqual(second['debug_info']['stages'][0], 'cache')
+        self.assertEqual(second['schedule']['start_time'], uncached['schedule']['start_time'])
+        self.assertTrue(second['schedule']['start_time'].startswith('2026-10-19T09:00'))
+
+        batch = self.assistant.process_batch([self.TEXT], clock=after)
+        self.assertEqual(batch[0]['debug_info']['stages'][0], 'cache')
+        self.assertEqual(batch[0]['schedule']['start_time'], uncached['schedule']['start_time'])
+
+    def test_results_do_not_share_cached_state(self):
+        clock = ReferenceClock(datetime(2026, 10, 18, 8, 0))
+        first = self.assistant.process(self.TEXT, clock)
+        first['schedule']['reminder_minutes'] = 30  # như ingest
+        first['debug_info']['rule_result']['location_components']['full_location'] = 'x'
+
+        for result in (self.assistant.process(self.TEXT, clock),
+                       self.assistant.process_batch([self.TEXT], clock=clock)[0]):
+            self.assertEqual(result['debug_info']['stages'][0], 'cache')
+            self.assertEqual(result['schedule']['reminder_minutes'], 15)
+            self.assertEqual(result['schedule']['location'], first['schedule']['location'])
+            result['schedule']['reminder_minutes'] = 45
+
+        self.assertEqual(self.assistant.process(self.TEXT, clock)['schedule']['reminder_minutes'], 15)
+
+
+if __name__ == '__main__':
+    unittest.main()
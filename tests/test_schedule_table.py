@@ -0,0 +1,89 @@
+import unittest
+
+from gui.schedule_table import ScheduleTable
+
+
+class _Tree:
+    """Treeview giả: chỉ những gì ScheduleTable dùng (không cần display)"""
+
+    def __init__(self, height_rows=15, pixel_height=1):
+        self.options = {'height': height_rows, 'show': 'headings', 'style': ''}
+        self.pixel_height = pixel_height
+        self.items = []
+        self.idle = []
+        self.on_configure = None
+
+    def configure(self, **kwargs):
+        pass
+
+    def bind(self, sequence, callback, add=None):
+        self.on_configure = callback
+
+    def cget(self, option):
+        return self.options[option]
+
+    def winfo_height(self):
+        return self.pixel_height
+
+    def after_idle(self, callback, *args):
+        self.idle.append((callback, args))
+
+    def run_idle(self):
+        idle, self.idle = self.idle, []
+        for callback, args in idle:
+            callback(*args)
+
+    def get_children(self):
+        return tuple(self.items)
+
+    def delete(self, *keys):
+        for key in keys:
+            self.items.remove(key)
+
+    def insert(self, parent, index, iid, values):
+        self.items.insert(len(self.items) if index == 'end' else index, iid)
+
+    def exists(self, key):
+        return key in self.items
+
+    def item(self, key, values):
+        pass
+
+    def yview_moveto(self, fraction):
+        pass
+
+
+class _Scrollbar:
+    def configure(self, **kwargs):
+        pass
+
+    def set(self, first, last):
+        self.position = (first, last)
+
+
+class ScheduleTableResizeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tree = _Tree()
+        self.table = ScheduleTable(self.tree, _Scrollbar(), lambda s: (s['id'],), buffer=10)
+        self.table._row_height = 20
+        self.table.set_rows([{'id': str(i)} for i in range(1000)])
+
+    def test_unmapped_tree_uses_height_option(self):
+        self.assertEqual(self.table._visible(), 15)
+        self.assertEqual(len(self.tree.items), 15 + 10)
+
+    def test_resize_grows_window(self):
+        # 820px: 1 dòng tiêu đề + 40 dòng dữ liệu
+        self.tree.pixel_height = 820
+        self.tree.on_configure(None)
+        self.tree.on_configure(None)
+        self.assertEqual(len(self.tree.idle), 1)
+
+        self.tree.run_idle()
+        self.assertEqual(self.table._visible(), 40)
+        self.assertEqual(len(self.tree.items), 40 + 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.storage.journal_storage import JournalStorage
+from src.storage.json_storage import JSONStorage
+from src.storage.sqlite_storage import SQLiteStorage
+
+
+class _TempJSONStorage(JSONStorage):
+    """JSONStorage ở file tạm (ensure_file_exists luôn trỏ về thư mục data mặc định)"""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write('[]')
+        self._init_changefeed()
+
+    def close(self):
+        pass
+
+
+class UpdateReplacesRecordTest(unittest.TestCase):
+    """update() thay toàn bộ bản ghi, giống nhau ở mọi backend"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def backends(self):
+        path = os.path.join(self.directory, 'schedules')
+        return [
+            _TempJSONStorage(path + '.json'),
+            JournalStorage(path + '-journal.json', fsync=False),
+            SQLiteStorage(path + '.db'),
+        ]
+
+    def test_partial_update_behaves_the_same(self):
+        stored = []
+        for storage in self.backends():
+            schedule_id = storage.save({'event': 'họp', 'start_time': '2030-01-01T09:00:00',
+                                        'location': 'phòng 302', 'reminder_minutes': 15})
+            storage.update(schedule_id, {'event': 'họp lại', 'start_time': '2030-01-01T10:00:00'})
+            schedule = storage.get(schedule_id)
+            storage.close()
+            stored.append({key: value for key, value in schedule.items()
+                           if value is not None and key != 'updated_at'})
+
+        self.assertEqual(stored[0], {'event': 'họp lại', 'start_time': '2030-01-01T10:00:00',
+                                     'id': '1'})
+        self.assertEqual(stored[1], stored[0])
+        self.assertEqual(stored[2], stored[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
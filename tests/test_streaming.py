@@ -0,0 +1,59 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.storage.streaming import RecordReader, write_json_array
+
+
+def _record(i):
+    return {'event': f'sự kiện {i}', 'start_time': '2030-01-01T09:00:00',
+            'location': None, 'reminder_minutes': 15, 'id': str(i)}
+
+
+class RecordReaderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'schedules.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def write(self, text):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def test_round_trip_across_chunks(self):
+        records = [_record(i) for i in range(500)]
+        with open(self.path, 'w', encoding='utf-8') as f:
+            write_json_array(f, records)
+        with open(self.path, encoding='utf-8') as f:
+            self.assertEqual(json.load(f), records)
+
+        reader = RecordReader(self.path, chunk_size=97)
+        self.assertEqual([record for _, record, _ in reader], records)
+
+    def test_syntax_error_is_reported_without_reading_rest_of_file(self):
+        good = json.dumps(_record(0), ensure_ascii=False)
+        broken = '{"event": "x", "start_time": tru}'
+        self.write('[' + ',\n'.join([good] * 5 + [broken] + [good] * 20000) + ']')
+
+        reader = RecordReader(self.path, chunk_size=1024)
+        with self.assertRaises(json.JSONDecodeError):
+            for _ in reader:
+                pass
+        self.assertLess(reader.bytes_read, 8 * 1024)
+
+    def test_values_split_between_chunks(self):
+        records = [{'flag': True, 'value': 1.5e3, 'text': 'a\\u00e9' * 40, 'n': None}] * 50
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(records, f)
+        for chunk_size in (1, 3, 7, 64):
+            reader = RecordReader(self.path, chunk_size=chunk_size)
+            self.assertEqual([record for _, record, _ in reader], records)
+
+
+if __name__ == '__main__':
+    unittest.main()